@@ -0,0 +1,199 @@
+import hashlib
+import threading
+from collections import namedtuple, OrderedDict
+from jinja2.utils import htmlsafe_json_dumps
+from sqlalchemy import func
+from extensions import db
+from grading_engine import extract_answer_key
+
+# ===================================================================
+# KUWAMEDYA - AKADEMİ ÖNBELLEKLERİ (academy_cache.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, AKADEMİNİN EN SIK ÇAĞRILAN YOLLARINDA (kurs kataloğu vb.)
+# TEKRAR TEKRAR HESAPLANAN VERİLERİ SÜREÇ (PROCESS) İÇİNDE SAKLAR.
+#
+# 1.  KURS KATALOĞU SÜRÜMÜ VE ETAG:
+#     - Katalog sürümü = (kurs sayısı, en son 'updated_at'). Bir kurs
+#       eklendiğinde, düzenlendiğinde, silindiğinde veya kursa ders
+#       eklendiğinde/silindiğinde (lesson_count güncellemesi 'updated_at'i
+#       de günceller) sürüm değişir.
+#     - '/academy/data' ETag'i; sürüm, kullanıcının ilerleme durumu ve
+#       istek parametrelerinden üretilir. Sayfalama ve faset önbelleği
+#       'academy_catalog.py' içindedir.
+#
+# 2.  KURS ANA HATLARI (OUTLINE) ÖNBELLEĞİ:
+#     - Her kurs için sıralı (lesson_id, order, title, lesson_type) dizisi
+#       ve lesson_id -> konum sözlüğü tutulur. Önceki/sonraki ders bulma
+#       O(1)'dir ve sorgu gerektirmez.
+#     - 'add_lesson', 'edit_lesson', 'delete_lesson' rotaları önbelleği
+#       temizler. Ayrıca kursun 'updated_at' değeri sürüm olarak saklanır;
+#       başka bir süreçte ders eklendiğinde, silindiğinde veya başlığı /
+#       tipi / sırası düzenlendiğinde ('lesson_touch_course_outline'
+#       olayı kursun 'updated_at' değerini yeniler) önbellek yenilenir.
+#
+# 3.  DERLENMİŞ QUIZ ÖNBELLEĞİ:
+#     - Quiz soruları ('QuizQuestion' / 'QuizOption') her sınav açılışında
+#       ve her cevap gönderiminde yeniden okunmaz. (quiz.id, quiz.updated_at)
+#       anahtarıyla; soru listesi, cevap anahtarı
+#       ('grading_engine.AnswerKey') ve 'quiz.html' için önceden
+#       üretilmiş JSON saklanır.
+#     - Önbellek LRU (en az kullanılan atılır) mantığıyla sınırlıdır.
+#     - 'add_quiz', 'edit_quiz', 'delete_quiz' rotaları önbelleği temizler.
+#       Tek bir soru düzenlendiğinde 'quiz.updated_at' değişir ve önbellek
+#       kendiliğinden yenilenir.
+# ===================================================================
+
+def get_catalog_version():
+    """Katalog sürümünü (kurs sayısı, en son güncelleme zamanı) tek sorguda döndürür."""
+    from models import Course
+    count, last_updated = db.session.query(func.count(Course.id), func.max(Course.updated_at)).one()
+    return (count, last_updated.isoformat() if last_updated else '')
+
+
+def get_user_progress_map(user_id):
+    """Kullanıcının kayıtlı olduğu kurslar için {course_id: completed_count} sözlüğünü döndürür."""
+    from models import Enrollment
+    rows = db.session.query(Enrollment.course_id, Enrollment.completed_count)\
+        .filter(Enrollment.user_id == user_id).all()
+    return {row.course_id: row.completed_count or 0 for row in rows}
+
+
+def catalog_etag(version, progress_map, query_string=b''):
+    """Katalog sürümü, kullanıcının ilerleme durumu ve istek parametrelerinden bir ETag üretir."""
+    digest = hashlib.md5()
+    digest.update(repr(version).encode('utf-8'))
+    digest.update(repr(sorted(progress_map.items())).encode('utf-8'))
+    digest.update(query_string)
+    return digest.hexdigest()
+
+
+# ===================================================================
+# KURS ANA HATLARI (OUTLINE)
+# ===================================================================
+OutlineEntry = namedtuple('OutlineEntry', ['id', 'order', 'title', 'lesson_type'])
+
+
+class CourseOutline:
+    """Bir kursun sıralı ders listesi ve O(1) konum haritası."""
+    __slots__ = ('course_id', 'version', 'lessons', 'position')
+
+    def __init__(self, course_id, version, lessons):
+        self.course_id = course_id
+        self.version = version
+        self.lessons = tuple(lessons)
+        self.position = {entry.id: index for index, entry in enumerate(self.lessons)}
+
+    def __len__(self):
+        return len(self.lessons)
+
+    def next_of(self, lesson_id):
+        """Verilen dersten sonraki dersi döndürür (son dersse None)."""
+        index = self.position.get(lesson_id)
+        if index is None or index + 1 >= len(self.lessons):
+            return None
+        return self.lessons[index + 1]
+
+    def prev_of(self, lesson_id):
+        """Verilen dersten önceki dersi döndürür (ilk dersse None)."""
+        index = self.position.get(lesson_id)
+        if not index:
+            return None
+        return self.lessons[index - 1]
+
+    def first_incomplete(self, completed_ids):
+        """Tamamlanmamış ilk dersi (sıraya göre) döndürür."""
+        for entry in self.lessons:
+            if entry.id not in completed_ids:
+                return entry
+        return None
+
+
+_outline_lock = threading.Lock()
+_outline_cache = {}
+
+
+def get_course_outline(course):
+    """
+    Kursun ana hatlarını önbellekten döndürür; yoksa veya kursun
+    'updated_at' değeri değişmişse tek bir sorgu ile yeniden oluşturur.
+    """
+    from models import Lesson
+    version = course.updated_at
+    with _outline_lock:
+        outline = _outline_cache.get(course.id)
+    if outline is not None and outline.version == version:
+        return outline
+
+    rows = db.session.query(Lesson.id, Lesson.order, Lesson.title, Lesson.lesson_type)\
+        .filter(Lesson.course_id == course.id)\
+        .order_by(Lesson.order.asc()).all()
+    outline = CourseOutline(course.id, version, (OutlineEntry(*row) for row in rows))
+    with _outline_lock:
+        _outline_cache[course.id] = outline
+    return outline
+
+
+def invalidate_course_outline(course_id):
+    """Bir kursun ana hat önbelleğini temizler (ders ekleme/düzenleme/silme sonrası)."""
+    with _outline_lock:
+        _outline_cache.pop(course_id, None)
+
+
+# ===================================================================
+# DERLENMİŞ QUIZ ÖNBELLEĞİ
+# ===================================================================
+QUIZ_CACHE_SIZE = 256
+
+
+class CompiledQuiz:
+    """Bir quizin parse edilmiş soruları, cevap anahtarı ve şablon verisi."""
+    __slots__ = ('quiz_id', 'version', 'questions', 'answer_key', 'questions_json')
+
+    def __init__(self, quiz_id, version, questions):
+        self.quiz_id = quiz_id
+        self.version = version
+        self.questions = tuple(questions)
+        self.answer_key = extract_answer_key(self.questions)
+        # 'quiz.html' içindeki <script> bloğuna doğrudan basılabilen (HTML-güvenli) JSON
+        self.questions_json = htmlsafe_json_dumps(list(self.questions))
+
+    def __len__(self):
+        return len(self.questions)
+
+
+_quiz_lock = threading.Lock()
+_quiz_cache = OrderedDict()
+
+
+def get_compiled_quiz(quiz):
+    """
+    Quizin derlenmiş halini önbellekten döndürür; yoksa veya quiz
+    güncellenmişse sorularını tek sorguda okuyup yeniden derler.
+    """
+    from quiz_store import load_question_dicts
+    key = (quiz.id, quiz.updated_at)
+    with _quiz_lock:
+        compiled = _quiz_cache.get(key)
+        if compiled is not None:
+            _quiz_cache.move_to_end(key)
+            return compiled
+
+    compiled = CompiledQuiz(quiz.id, quiz.updated_at, load_question_dicts(quiz.id))
+
+    with _quiz_lock:
+        # Aynı quizin eski sürümlerini at
+        for stale_key in [k for k in _quiz_cache if k[0] == quiz.id and k != key]:
+            del _quiz_cache[stale_key]
+        _quiz_cache[key] = compiled
+        _quiz_cache.move_to_end(key)
+        while len(_quiz_cache) > QUIZ_CACHE_SIZE:
+            _quiz_cache.popitem(last=False)
+    return compiled
+
+
+def invalidate_compiled_quiz(quiz_id):
+    """Bir quizin derlenmiş önbelleğini temizler (quiz ekleme/düzenleme/silme sonrası)."""
+    with _quiz_lock:
+        for key in [k for k in _quiz_cache if k[0] == quiz_id]:
+            del _quiz_cache[key]
@@ -0,0 +1,208 @@
+import base64
+import json
+import threading
+from collections import namedtuple, OrderedDict
+from sqlalchemy import func, case, and_, or_, tuple_
+from extensions import db
+
+# ===================================================================
+# KUWAMEDYA - AKADEMİ KURS KATALOĞU (academy_catalog.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, '/academy/data' ROTASININ FİLTRELEME, SIRALAMA VE SAYFALAMA
+# MANTIĞINI İÇERİR. ESKİDEN TÜM KATALOG TARAYICIYA GÖNDERİLİP 'main.js'
+# İÇİNDE FİLTRELENİYORDU; ARTIK BU İŞLER VERİTABANINDA YAPILIR.
+#
+# 1.  FİLTRELER: 'q' (başlık/açıklama araması), 'category', 'difficulty'.
+#     'Course.category', 'Course.difficulty' ve 'Course.title' indekslidir.
+#
+# 2.  SIRALAMA: 'title-asc', 'title-desc', 'progress-desc', 'progress-asc'.
+#     İlerleme sıralaması kullanıcının kaydı ile tek sorguda (LEFT JOIN)
+#     hesaplanır.
+#
+# 3.  KEYSET (İMLEÇ) SAYFALAMA:
+#     OFFSET yerine son satırın (sıralama değeri, id) çifti 'cursor'
+#     olarak döndürülür; sonraki sayfa "bu çiftten sonrası" olarak
+#     sorgulanır. Sayfa ne kadar derinde olursa olsun maliyet sabittir.
+#
+# 4.  FASET SAYILARI:
+#     Kategori ve seviye başına kurs sayıları (diğer filtreler uygulanmış
+#     halde) katalog sürümüne göre önbellekte tutulur.
+# ===================================================================
+
+DEFAULT_PAGE_SIZE = 12
+MAX_PAGE_SIZE = 100
+MAX_SEARCH_LENGTH = 100
+SORT_OPTIONS = ('title-asc', 'title-desc', 'progress-desc', 'progress-asc')
+# İlerleme sıralama anahtarı, yüzde yerine on binde bir hassasiyetle tutulur (tamsayı)
+PROGRESS_SCALE = 10000
+
+CatalogQuery = namedtuple('CatalogQuery', ['search', 'category', 'difficulty', 'sort', 'cursor', 'limit'])
+
+
+def _clean_filter(value):
+    """Boş veya 'all' değerlerini filtresiz (None) kabul eder."""
+    value = (value or '').strip()
+    return None if value in ('', 'all') else value
+
+
+def parse_catalog_args(args):
+    """
+    İstek parametrelerinden 'CatalogQuery' oluşturur.
+    Geçersiz sıralama veya imleçte 'ValueError' fırlatır.
+    """
+    sort = (args.get('sort') or 'title-asc').strip()
+    if sort == 'default':
+        sort = 'title-asc'
+    if sort not in SORT_OPTIONS:
+        raise ValueError(f"Geçersiz sıralama: {sort}")
+
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        limit = DEFAULT_PAGE_SIZE
+    limit = max(1, min(MAX_PAGE_SIZE, limit))
+
+    search = _clean_filter(args.get('q'))
+    cursor = args.get('cursor') or None
+    return CatalogQuery(
+        search=search[:MAX_SEARCH_LENGTH] if search else None,
+        category=_clean_filter(args.get('category')),
+        difficulty=_clean_filter(args.get('difficulty')),
+        sort=sort,
+        cursor=decode_cursor(cursor) if cursor else None,
+        limit=limit)
+
+
+def encode_cursor(sort_value, course_id):
+    """(sıralama değeri, kurs id) çiftini URL-güvenli bir imlece çevirir."""
+    raw = json.dumps([sort_value, course_id], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """İmleci (sıralama değeri, kurs id) çiftine çözer; bozuksa 'ValueError' fırlatır."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, course_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        return sort_value, int(course_id)
+    except Exception:
+        raise ValueError("Geçersiz sayfa imleci.")
+
+
+def _apply_filters(query, params, skip=None):
+    """Arama ve faset filtrelerini uygular ('skip' ile bir faset filtresi atlanabilir)."""
+    from models import Course
+    if params.search:
+        pattern = f"%{params.search}%"
+        query = query.filter(or_(Course.title.ilike(pattern), Course.description.ilike(pattern)))
+    if params.category and skip != 'category':
+        query = query.filter(Course.category == params.category)
+    if params.difficulty and skip != 'difficulty':
+        query = query.filter(Course.difficulty == params.difficulty)
+    return query
+
+
+def fetch_catalog_page(params, user_id):
+    """
+    Filtrelenmiş ve sıralanmış katalogdan bir sayfa döndürür.
+    (kurs sözlükleri listesi, sonraki sayfanın imleci veya None)
+    """
+    from models import Course, Enrollment
+
+    progress_key = case(
+        (Course.lesson_count > 0,
+         func.coalesce(Enrollment.completed_count, 0) * PROGRESS_SCALE / Course.lesson_count),
+        else_=0)
+    sort_column = Course.title if params.sort.startswith('title') else progress_key
+    descending = params.sort.endswith('desc')
+
+    query = db.session.query(
+        Course.id, Course.title, Course.category, Course.difficulty,
+        Course.duration_hours, Course.cover_image, Course.lesson_count,
+        func.substr(Course.description, 1, 100).label('description_preview'),
+        func.length(Course.description).label('description_length'),
+        Enrollment.completed_count, Enrollment.id.label('enrollment_id'),
+        sort_column.label('sort_value'),
+    ).outerjoin(Enrollment, and_(Enrollment.course_id == Course.id, Enrollment.user_id == user_id))
+    query = _apply_filters(query, params)
+
+    if params.cursor:
+        after = tuple_(sort_column, Course.id)
+        boundary = tuple_(*params.cursor)
+        query = query.filter(after < boundary if descending else after > boundary)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), Course.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Course.id.asc())
+
+    rows = query.limit(params.limit + 1).all()
+    has_more = len(rows) > params.limit
+    rows = rows[:params.limit]
+
+    courses = []
+    for row in rows:
+        description = row.description_preview or ''
+        if (row.description_length or 0) > 100:
+            description += '...'
+        is_enrolled = row.enrollment_id is not None
+        courses.append({
+            "id": row.id,
+            "title": row.title,
+            "category": row.category,
+            "difficulty": row.difficulty,
+            "duration_hours": row.duration_hours,
+            "cover_image": row.cover_image or 'course_default.png',
+            "description": description,
+            "lesson_count": row.lesson_count or 0,
+            "enrollment": {
+                "is_enrolled": is_enrolled,
+                "progress": Enrollment.calculate_progress(row.completed_count, row.lesson_count) if is_enrolled else 0
+            },
+        })
+
+    next_cursor = encode_cursor(rows[-1].sort_value, rows[-1].id) if has_more and rows else None
+    return courses, next_cursor
+
+
+# ===================================================================
+# FASET SAYILARI (KATALOG SÜRÜMÜNE GÖRE ÖNBELLEKLİ)
+# ===================================================================
+FACET_CACHE_SIZE = 128
+
+_facet_lock = threading.Lock()
+_facet_cache = OrderedDict()
+
+
+def _count_by(column, params, skip):
+    query = _apply_filters(db.session.query(column, func.count()), params, skip=skip)
+    return {value: count for value, count in query.group_by(column).all() if value is not None}
+
+
+def get_catalog_facets(params, version):
+    """
+    Kategori ve seviye başına kurs sayılarını ve filtrelenmiş toplamı döndürür.
+    Her faset, kendi filtresi hariç diğer filtreler uygulanarak sayılır.
+    """
+    from models import Course
+    key = (version, params.search, params.category, params.difficulty)
+    with _facet_lock:
+        cached = _facet_cache.get(key)
+        if cached is not None:
+            _facet_cache.move_to_end(key)
+            return cached
+
+    categories = _count_by(Course.category, params, skip='category')
+    difficulties = _count_by(Course.difficulty, params, skip='difficulty')
+    if params.category:
+        total = categories.get(params.category, 0)
+    else:
+        total = sum(categories.values())
+    facets = {"category": categories, "difficulty": difficulties, "total": total}
+
+    with _facet_lock:
+        _facet_cache[key] = facets
+        while len(_facet_cache) > FACET_CACHE_SIZE:
+            _facet_cache.popitem(last=False)
+    return facets
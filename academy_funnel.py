@@ -0,0 +1,98 @@
+from collections import namedtuple
+from sqlalchemy import func, select
+from extensions import db
+
+# ===================================================================
+# KUWAMEDYA - KURS HUNİSİ ANALİZİ (academy_funnel.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, YÖNETİCİLERİN ÖĞRENCİLERİN BİR KURSTA HANGİ DERSTE
+# BIRAKTIĞINI GÖRMESİNİ SAĞLAYAN HUNİ (FUNNEL) VERİSİNİ HAZIRLAR.
+#
+# 1.  ARTIMLI SAYAÇLAR:
+#     - 'Course.enrollment_count': Kurs hunisinin ilk adımı (kayıt).
+#     - 'LessonFunnelStat.completion_count': Dersi tamamlayan öğrenci
+#       sayısı. 'models.py' içindeki olaylar (LessonCompletion
+#       after_insert/after_delete, Enrollment after_insert/after_delete) bu
+#       sayaçları aynı işlem içinde günceller.
+#     - Huni sayfası kayıt veya tamamlama tablolarını TARAMAZ; yalnızca
+#       kursun ders sayısı kadar satır okur.
+#
+# 2.  YENİDEN HESAPLAMA:
+#     - 'flask academy rebuild-funnel' sayaçları küme tabanlı (set-based)
+#       SQL ile kaynak tablolardan baştan hesaplar.
+# ===================================================================
+
+FunnelStep = namedtuple('FunnelStep', [
+    'lesson_id', 'order', 'title', 'lesson_type', 'completions', 'rate', 'drop_off'])
+
+CourseFunnel = namedtuple('CourseFunnel', ['course_id', 'enrolled', 'steps'])
+
+
+def _percent(part, whole):
+    return round(part * 100 / whole, 1) if whole else 0.0
+
+
+def build_course_funnel(course):
+    """Kursun huni adımlarını (ders sırasıyla) saklanan sayaçlardan oluşturur."""
+    from models import Lesson, LessonFunnelStat
+    rows = db.session.query(
+        Lesson.id, Lesson.order, Lesson.title, Lesson.lesson_type,
+        func.coalesce(LessonFunnelStat.completion_count, 0).label('completions'),
+    ).outerjoin(LessonFunnelStat, LessonFunnelStat.lesson_id == Lesson.id)\
+     .filter(Lesson.course_id == course.id)\
+     .order_by(Lesson.order.asc())\
+     .all()
+
+    enrolled = course.enrollment_count or 0
+    steps = []
+    previous = enrolled
+    for row in rows:
+        steps.append(FunnelStep(
+            lesson_id=row.id, order=row.order, title=row.title, lesson_type=row.lesson_type,
+            completions=row.completions,
+            rate=_percent(row.completions, enrolled),
+            # Bir önceki adıma göre kayıp (dersler sırasız tamamlanabildiği için negatif olmaz)
+            drop_off=_percent(max(previous - row.completions, 0), previous)))
+        previous = row.completions
+    return CourseFunnel(course_id=course.id, enrolled=enrolled, steps=tuple(steps))
+
+
+def rebuild_funnel_stats(course_id=None):
+    """
+    Huni sayaçlarını kaynak tablolardan küme tabanlı SQL ile yeniden hesaplar.
+    'course_id' verilirse yalnızca o kurs işlenir. (ders sayısı, kurs sayısı) döndürür.
+    Çağıran taraf commit etmelidir.
+    """
+    from models import Course, Lesson, Enrollment, LessonCompletion, LessonFunnelStat
+    funnel_table = LessonFunnelStat.__table__
+    lesson_table = Lesson.__table__
+    course_table = Course.__table__
+    completion_table = LessonCompletion.__table__
+
+    delete = funnel_table.delete()
+    lesson_filter = []
+    course_filter = []
+    if course_id is not None:
+        delete = delete.where(funnel_table.c.course_id == course_id)
+        lesson_filter.append(lesson_table.c.course_id == course_id)
+        course_filter.append(course_table.c.id == course_id)
+    db.session.execute(delete)
+
+    completions = select(func.count(completion_table.c.id))\
+        .where(completion_table.c.lesson_id == lesson_table.c.id)\
+        .scalar_subquery()
+    lessons = db.session.execute(funnel_table.insert().from_select(
+        ['lesson_id', 'course_id', 'completion_count'],
+        select(lesson_table.c.id, lesson_table.c.course_id, completions).where(*lesson_filter)
+    )).rowcount
+
+    enrolled = select(func.count(Enrollment.id))\
+        .where(Enrollment.course_id == course_table.c.id)\
+        .scalar_subquery()
+    courses = db.session.execute(
+        course_table.update()
+        .where(*course_filter)
+        .values(enrollment_count=enrolled, updated_at=course_table.c.updated_at)
+    ).rowcount
+    return lessons, courses
@@ -1,20 +1,13 @@
 import json
 import os
 import secrets
-from datetime import datetime
-from io import BytesIO
 from PIL import Image
 from flask import (Blueprint, render_template, url_for, flash, redirect,
-                   request, abort, current_app, jsonify, make_response)
+                   request, abort, current_app, jsonify, make_response, send_file,
+                   stream_with_context)
 from flask_login import current_user, login_required
 from sqlalchemy import desc, exc
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.units import cm
-from reportlab.pdfgen import canvas
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as RLImage, Table, TableStyle
-from reportlab.lib.enums import TA_CENTER
+from sqlalchemy.orm import defer
 
 from extensions import db
 # ===================================================================
@@ -55,10 +48,16 @@ from extensions import db
 #       `academy.academy_home` rotasına geri yönlendirir.
 #     - Bu, mimarinin kusursuz ve güvenli çalıştığını kanıtlar.
 # ===================================================================
-from utils import log_activity, save_picture
+from utils import log_activity, save_picture, remove_uploads_later
 # GÜNCELLEME (v6.0): Sadece 'Admin' rotalarını korumak için
 # 'admin_required' import edilir.
 from decorators import admin_required
+from academy_cache import (get_course_outline, invalidate_course_outline,
+                           get_compiled_quiz, invalidate_compiled_quiz)
+import grading_engine
+from certificates import certificate_data_for, store_certificate, queue_certificate
+from quiz_analysis import get_item_analysis, invalidate_item_analysis
+import lesson_ordering
 
 academy = Blueprint('academy', __name__, url_prefix='/academy')
 
@@ -78,40 +77,81 @@ def academy_home():
 @academy.route("/data")
 @login_required # Gerekli: Kullanıcı, Personel, Admin
 def get_courses_data():
-    """Kurs listesi için JSON verisi sağlar (JavaScript tarafından kullanılır)."""
-    from models import Course, Enrollment
+    """
+    Kurs listesi için JSON verisi sağlar (JavaScript tarafından kullanılır).
+    'q', 'category', 'difficulty', 'sort', 'cursor' ve 'limit' parametreleriyle
+    veritabanında filtrelenmiş, sıralanmış ve keyset ile sayfalanmış bir
+    sayfa ve faset sayıları döndürür. Veri değişmediyse tarayıcıya 304 döner.
+    """
+    from academy_cache import get_catalog_version, get_user_progress_map, catalog_etag
+    from academy_catalog import parse_catalog_args, fetch_catalog_page, get_catalog_facets
 
     try:
-        all_courses = Course.query.order_by(Course.title.asc()).all()
-        # Veri, 'current_user'a (rolü ne olursa olsun) göre çekilir.
-        user_enrollments = {enrollment.course_id: enrollment for enrollment in
-                            Enrollment.query.filter_by(user_id=current_user.id).all()}
+        params = parse_catalog_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        courses_list = []
-        for course in all_courses:
-            enrollment = user_enrollments.get(course.id)
-            
-            course_dict = {
-                "id": course.id,
-                "title": course.title,
-                "category": course.category,
-                "difficulty": course.difficulty,
-                "duration_hours": course.duration_hours,
-                "cover_image": course.cover_image or 'course_default.png',
-                "description": course.description[:100] + '...' if course.description else '',
-                "enrollment": {
-                    "is_enrolled": enrollment is not None,
-                    "progress": enrollment.get_progress() if enrollment else 0
-                }
-            }
-            courses_list.append(course_dict)
-
-        return jsonify(courses_list)
+    try:
+        version = get_catalog_version()
+        # Veri, 'current_user'a (rolü ne olursa olsun) göre çekilir.
+        progress_map = get_user_progress_map(current_user.id)
+        etag = catalog_etag(version, progress_map, request.query_string)
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            courses, next_cursor = fetch_catalog_page(params, current_user.id)
+            facets = get_catalog_facets(params, version)
+            response = jsonify({
+                "courses": courses,
+                "next_cursor": next_cursor,
+                "total": facets["total"],
+                "facets": {"category": facets["category"], "difficulty": facets["difficulty"]},
+            })
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
 
     except Exception as e:
         current_app.logger.error(f"Akademi JSON verisi oluşturulurken hata: {e}")
         return jsonify({"error": "Kurs verileri alınamadı. Lütfen daha sonra tekrar deneyin."}), 500
 
+@academy.route("/search")
+@login_required # Gerekli: Kullanıcı, Personel, Admin
+def search_content():
+    """
+    Kurs başlık/açıklamaları ve ders başlık/içeriklerinde tam metin araması
+    yapar. Sonuçlar alaka düzeyine göre sıralı ve vurgulu alıntılı döner.
+    """
+    import search_index
+
+    query = (request.args.get('q') or '').strip()
+    limit = max(1, min(50, request.args.get('limit', 20, type=int) or 20))
+    if not search_index.query_terms(query):
+        return jsonify({"query": query, "results": []})
+
+    try:
+        hits = search_index.search(query, limit=limit)
+    except Exception as e:
+        current_app.logger.error(f"Akademi araması başarısız ('{query}'): {e}")
+        return jsonify({"error": "Arama şu anda yapılamıyor. Lütfen daha sonra tekrar deneyin."}), 500
+
+    results = []
+    for hit in hits:
+        if hit.doc_type == 'lesson':
+            url = url_for('academy.lesson_view', lesson_id=hit.doc_id)
+        else:
+            url = url_for('academy.course_detail', course_id=hit.doc_id)
+        results.append({
+            "type": hit.doc_type,
+            "id": hit.doc_id,
+            "course_id": hit.course_id,
+            "title": hit.title,
+            "snippet": search_index.render_snippet(hit.snippet),
+            "url": url,
+        })
+    return jsonify({"query": query, "results": results})
+
 # ==========================================================================
 # 2.0 - KURS VE DERS DETAY SAYFALARI (TÜM GİRİŞ YAPAN KULLANICILAR)
 # ==========================================================================
@@ -119,17 +159,21 @@ def get_courses_data():
 @academy.route("/course/<int:course_id>")
 @login_required # Gerekli: Kullanıcı, Personel, Admin
 def course_detail(course_id):
-    """Bir kursun detay sayfasını gösterir."""
-    from models import Course
-    course = Course.query.get_or_404(course_id)
-    enrollment = current_user.get_enrollment_for_course(course_id)
-    completed_lesson_ids = enrollment.get_completed_ids_set() if enrollment else set()
-    
+    """
+    Bir kursun detay sayfasını gösterir.
+    Şablona ORM nesneleri yerine önceden hesaplanmış görünüm modeli
+    gönderilir (kurs + dersler + kayıt durumu toplam en fazla 2 sorgu).
+    """
+    from academy_viewmodels import build_course_detail_view
+    view = build_course_detail_view(course_id, current_user.id)
+    if view is None:
+        abort(404)
+
     return render_template('panel/course_detail.html',
-                           title=course.title,
-                           course=course,
-                           enrollment=enrollment,
-                           completed_lesson_ids=completed_lesson_ids)
+                           title=view.course.title,
+                           course=view.course,
+                           lessons=view.lessons,
+                           enrollment=view.enrollment)
 
 @academy.route("/enroll/<int:course_id>", methods=['POST'])
 @login_required # Gerekli: Kullanıcı, Personel, Admin
@@ -158,43 +202,42 @@ def enroll(course_id):
 def lesson_view(lesson_id):
     """Bir dersin izleme/sınav sayfasını gösterir."""
     from models import Lesson
-    lesson = Lesson.query.get_or_404(lesson_id)
+    # Ham içerik yüklenmez; şablon kayıt anında işlenmiş alanları kullanır
+    lesson = Lesson.query.options(defer(Lesson.content), defer(Lesson.recommended_videos))\
+        .filter_by(id=lesson_id).first_or_404()
     enrollment = current_user.get_enrollment_for_course(lesson.course_id)
     if not enrollment:
         flash('Bu dersi görmek için önce kursa kaydolmalısınız.', 'warning')
         return redirect(url_for('academy.course_detail', course_id=lesson.course_id))
 
     completed_lesson_ids = enrollment.get_completed_ids_set()
-    quiz_questions = []
-    recommended_videos_list = []
-    
-    # Parse recommended videos JSON if exists
-    if lesson.recommended_videos:
-        try:
-            recommended_videos_list = json.loads(lesson.recommended_videos)
-        except json.JSONDecodeError:
-            current_app.logger.warning(f"Recommended videos JSON parse error for lesson {lesson.id}")
-    
+
     if lesson.lesson_type == 'Quiz' and lesson.quiz:
-        try:
-            quiz_questions = json.loads(lesson.quiz.questions)
-            return render_template('panel/quiz.html',
-                                   title=f"Sınav: {lesson.title}",
-                                   lesson=lesson,
-                                   course=lesson.course,
-                                   quiz=lesson.quiz, 
-                                   questions=quiz_questions) 
-        except json.JSONDecodeError:
-             flash('Sınav soruları yüklenirken bir hata oluştu.', 'danger')
-             return redirect(url_for('academy.course_detail', course_id=lesson.course_id))
+        # Sorular ve şablon JSON'u derlenmiş quiz önbelleğinden gelir
+        compiled_quiz = get_compiled_quiz(lesson.quiz)
+        if not compiled_quiz.questions:
+            flash('Bu sınava henüz soru eklenmemiş.', 'warning')
+            return redirect(url_for('academy.course_detail', course_id=lesson.course_id))
+        return render_template('panel/quiz.html',
+                               title=f"Sınav: {lesson.title}",
+                               lesson=lesson,
+                               course=lesson.course,
+                               quiz=lesson.quiz, 
+                               questions=compiled_quiz.questions,
+                               questions_json=compiled_quiz.questions_json) 
     
+    # Önceki/sonraki ders ve müfredat listesi, önbellekteki kurs ana hatlarından gelir
+    outline = get_course_outline(lesson.course)
     return render_template('panel/lesson.html',
                            title=f"Ders: {lesson.title}",
                            lesson=lesson,
                            course=lesson.course,
                            enrollment=enrollment,
                            completed_lesson_ids=completed_lesson_ids,
-                           recommended_videos=recommended_videos_list)
+                           outline=outline,
+                           prev_lesson=outline.prev_of(lesson.id),
+                           next_lesson=outline.next_of(lesson.id),
+                           recommended_videos=lesson.recommended_video_id_list)
 
 
 @academy.route("/lesson/complete/<int:lesson_id>", methods=['POST'])
@@ -213,13 +256,15 @@ def complete_lesson(lesson_id):
             log_activity(current_user._get_current_object(), f"'{lesson.title}' dersini tamamladı.", lesson)
             db.session.commit()
             flash(f'"{lesson.title}" dersini başarıyla tamamladın!', 'success')
+            if enrollment.get_progress() == 100:
+                queue_certificate(certificate_data_for(enrollment)) # Sertifikayı arka planda hazırla
     except Exception as e:
          db.session.rollback()
          current_app.logger.error(f"Ders tamamlama hatası (user={current_user.id}, lesson={lesson_id}): {e}")
          flash("Ders tamamlanırken bir hata oluştu.", "danger")
          return redirect(url_for('academy.lesson_view', lesson_id=lesson.id))
 
-    next_lesson = lesson.course.get_next_lesson(lesson.order)
+    next_lesson = get_course_outline(lesson.course).next_of(lesson.id)
     if next_lesson:
         return redirect(url_for('academy.lesson_view', lesson_id=next_lesson.id))
     else:
@@ -246,42 +291,24 @@ def submit_quiz(quiz_id):
     enrollment = current_user.get_enrollment_for_course(quiz.lesson.course_id)
     if not enrollment: abort(403)
 
-    try:
-        questions = json.loads(quiz.questions)
-    except json.JSONDecodeError:
-        flash('Sınav soruları yüklenemedi.', 'danger')
+    compiled_quiz = get_compiled_quiz(quiz)
+    if not compiled_quiz.questions:
+        flash('Bu sınava henüz soru eklenmemiş.', 'warning')
         return redirect(url_for('academy.lesson_view', lesson_id=quiz.lesson_id))
 
-    score = 0
-    total = len(questions)
-    user_answers = {}
-
-    for i, question in enumerate(questions):
-        user_answer_index = request.form.get(f'question-{i}')
-        user_answers[i] = user_answer_index
-        try:
-            if user_answer_index is not None:
-                # Seçilen seçeneğin metnini al (frontend'den gönderiliyor)
-                selected_option_text = request.form.get(f'question-{i}-text', '').strip()
-                if selected_option_text:
-                    # Seçilen seçenek metni ile doğru cevabın metnini karşılaştır
-                    correct_option_text = question.get('options', [])[question.get('correct_index', 0)]
-                    if selected_option_text == correct_option_text:
-                        score += 1
-                else:
-                    # Fallback: Eğer metin gelmediyse, orijinal indeks yöntemini kullan (eski sistem)
-                    # Bu durumda frontend'den gelen indeks karıştırılmış dizideki indeks,
-                    # ama backend'de orijinal diziyi kullanıyoruz, bu yüzden bu yöntem çalışmayabilir
-                    # Ancak geriye dönük uyumluluk için bırakıyoruz
-                    pass
-        except (ValueError, TypeError, IndexError, KeyError):
-             pass
+    # Seçenekler istemcide karıştırıldığı için frontend seçilen seçeneğin METNİNİ
+    # gönderir ('question-{i}-text'); motor bunu orijinal indekse çevirip
+    # derlenmiş cevap anahtarıyla karşılaştırır.
+    total = len(compiled_quiz)
+    selections = grading_engine.encode_form(compiled_quiz.answer_key, request.form)
+    score = int(grading_engine.grade_submission(compiled_quiz.answer_key, selections).sum())
 
     try:
         attempt = QuizAttempt(user_id=current_user.id,
                               quiz_id=quiz.id,
                               score=score,
-                              total_questions=total)
+                              total_questions=total,
+                              answers=grading_engine.pack_answers(selections))
         db.session.add(attempt)
         log_activity(current_user._get_current_object(), f"'{quiz.lesson.title}' sınavını tamamladı. Sonuç: {score}/{total}", quiz)
 
@@ -289,8 +316,10 @@ def submit_quiz(quiz_id):
         required_score = max(18, int(total * 0.9))  # En az 18 veya toplamın %90'ı
         passed = score >= required_score
         
+        course_completed = False
         if passed and not enrollment.is_lesson_completed(quiz.lesson_id):
              enrollment.add_completed_lesson(quiz.lesson_id)
+             course_completed = enrollment.get_progress() == 100
              log_activity(current_user._get_current_object(), f"'{quiz.lesson.title}' dersini (quiz ile başarıyla) tamamladı. Skor: {score}/{total}", quiz.lesson)
              flash(f'Tebrikler! Sınavı başarıyla tamamladınız. Sonucun: {score}/{total} (Geçme: {required_score}/{total})', 'success')
         elif not passed:
@@ -299,6 +328,8 @@ def submit_quiz(quiz_id):
             flash(f'Sınav tamamlandı! Sonucun: {score}/{total}', 'info')
 
         db.session.commit()
+        if course_completed:
+            queue_certificate(certificate_data_for(enrollment)) # Sertifikayı arka planda hazırla
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Quiz sonucu kaydetme hatası (user={current_user.id}, quiz={quiz_id}): {e}")
@@ -310,10 +341,10 @@ def submit_quiz(quiz_id):
 @academy.route("/certificate/<int:course_id>")
 @login_required
 def download_certificate(course_id):
-    """Kursu tamamlayan kullanıcı için PDF sertifika oluşturur ve indirir."""
-    from models import Course, Enrollment
+    """Kursu tamamlayan kullanıcının PDF sertifikasını (disk önbelleğinden) indirir."""
+    from models import Course
     
-    course = Course.query.get_or_404(course_id)
+    Course.query.get_or_404(course_id)
     enrollment = current_user.get_enrollment_for_course(course_id)
     
     if not enrollment:
@@ -324,260 +355,28 @@ def download_certificate(course_id):
         flash('Sertifika almak için kursu tamamlamanız gerekiyor.', 'warning')
         return redirect(url_for('academy.course_detail', course_id=course_id))
     
+    # 'db.session.close()' sonrası 'current_user' oturumdan kopar; hata logu için id önceden alınır
+    user_id = current_user.id
     try:
-        # PDF oluştur - daha geniş kenar boşlukları
-        buffer = BytesIO()
-        
-        # PageTemplate ile dekoratif arka plan eklemek için canvas kullanacağız
-        def draw_page(canvas, doc):
-            """Her sayfaya dekoratif öğeler ekler"""
-            width, height = A4
-            border_margin = 1.5*cm
-            
-            # Dış çerçeve (turuncu kalın)
-            canvas.setStrokeColor(colors.HexColor('#ff6b35'))
-            canvas.setLineWidth(4)
-            canvas.rect(border_margin, border_margin, 
-                       width - 2*border_margin, 
-                       height - 2*border_margin)
-            
-            # İç çerçeve (altın)
-            inner_margin = 0.4*cm
-            canvas.setStrokeColor(colors.HexColor('#ffa726'))
-            canvas.setLineWidth(2)
-            canvas.rect(border_margin + inner_margin, 
-                       border_margin + inner_margin,
-                       width - 2*(border_margin + inner_margin), 
-                       height - 2*(border_margin + inner_margin))
-            
-            # Köşe dekorasyonları - yıldızlar
-            corner_size = 1.2*cm
-            corner_positions = [
-                (border_margin + inner_margin + 0.2*cm, height - border_margin - inner_margin - 0.2*cm - corner_size),
-                (width - border_margin - inner_margin - 0.2*cm - corner_size, height - border_margin - inner_margin - 0.2*cm - corner_size),
-                (border_margin + inner_margin + 0.2*cm, border_margin + inner_margin + 0.2*cm),
-                (width - border_margin - inner_margin - 0.2*cm - corner_size, border_margin + inner_margin + 0.2*cm),
-            ]
-            
-            for x, y in corner_positions:
-                # Dekoratif rozet (daire)
-                canvas.setFillColor(colors.HexColor('#ff6b35'))
-                canvas.setStrokeColor(colors.HexColor('#ff6b35'))
-                canvas.setLineWidth(1.5)
-                canvas.circle(x + corner_size/2, y + corner_size/2, corner_size/3, fill=1, stroke=1)
-                canvas.setFillColor(colors.white)
-                canvas.circle(x + corner_size/2, y + corner_size/2, corner_size/5, fill=1)
-            
-            # Üst ve alt dekoratif çizgiler
-            line_y_top = height - border_margin - inner_margin - 3*cm
-            line_y_bottom = border_margin + inner_margin + 3*cm
-            
-            for line_y in [line_y_top, line_y_bottom]:
-                canvas.setStrokeColor(colors.HexColor('#ff6b35'))
-                canvas.setLineWidth(1)
-                line_start = border_margin + inner_margin + 2.5*cm
-                line_end = width - border_margin - inner_margin - 2.5*cm
-                canvas.line(line_start, line_y, line_end, line_y)
-                # Çizginin üzerinde dekoratif noktalar
-                for i in range(5):
-                    dot_x = line_start + (line_end - line_start) * i / 4
-                    canvas.setFillColor(colors.HexColor('#ff6b35'))
-                    canvas.circle(dot_x, line_y, 0.12*cm, fill=1)
-        
-        doc = SimpleDocTemplate(buffer, pagesize=A4,
-                              rightMargin=1.5*cm, leftMargin=1.5*cm,
-                              topMargin=1.5*cm, bottomMargin=1.5*cm,
-                              onFirstPage=draw_page,
-                              onLaterPages=draw_page)
-        
-        # İçerik listesi
-        story = []
-        
-        # Stiller
-        styles = getSampleStyleSheet()
-        
-        # Başlık stili - daha büyük ve etkileyici
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=36,
-            textColor=colors.HexColor('#ff6b35'),
-            spaceAfter=40,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold',
-            leading=42
-        )
-        
-        # Alt başlık stili
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Normal'],
-            fontSize=14,
-            textColor=colors.HexColor('#4a4a4a'),
-            spaceAfter=25,
-            alignment=TA_CENTER,
-            fontName='Helvetica'
-        )
-        
-        # İsim stili - çok vurgulu
-        name_style = ParagraphStyle(
-            'NameStyle',
-            parent=styles['Heading2'],
-            fontSize=32,
-            textColor=colors.HexColor('#ff6b35'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold',
-            leading=38
-        )
-        
-        # Kurs başlık stili
-        course_title_style = ParagraphStyle(
-            'CourseTitleStyle',
-            parent=styles['Heading2'],
-            fontSize=22,
-            textColor=colors.HexColor('#2c2c2c'),
-            spaceAfter=35,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold',
-            leading=28
-        )
-        
-        # Detay stili
-        details_style = ParagraphStyle(
-            'DetailsStyle',
-            parent=styles['Normal'],
-            fontSize=13,
-            textColor=colors.HexColor('#4a4a4a'),
-            spaceAfter=8,
-            alignment=TA_CENTER,
-            fontName='Helvetica'
-        )
-        
-        # Tarih stili
-        date_style = ParagraphStyle(
-            'DateStyle',
-            parent=styles['Normal'],
-            fontSize=12,
-            textColor=colors.HexColor('#6b6b6b'),
-            alignment=TA_CENTER,
-            fontName='Helvetica-Oblique'
-        )
-        
-        # İmza stili
-        signature_style = ParagraphStyle(
-            'SignatureStyle',
-            parent=styles['Normal'],
-            fontSize=14,
-            textColor=colors.HexColor('#2c2c2c'),
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        # Başlık - daha fazla boşluk
-        story.append(Spacer(1, 4*cm))
-        story.append(Paragraph("SERTİFİKA", title_style))
-        story.append(Spacer(1, 0.8*cm))
-        
-        # Dekoratif çizgi
-        story.append(Paragraph("<hr width='400' color='#ff6b35'/>", subtitle_style))
-        story.append(Spacer(1, 0.8*cm))
-        
-        # Alt başlık
-        story.append(Paragraph("Bu belge, aşağıda adı geçen kişinin", subtitle_style))
-        story.append(Spacer(1, 0.5*cm))
-        
-        # Kullanıcı adı - büyük ve vurgulu
-        user_name = current_user.name or current_user.username
-        story.append(Paragraph(f"<b>{user_name.upper()}</b>", name_style))
-        story.append(Spacer(1, 0.6*cm))
-        
-        # Kurs bilgisi
-        story.append(Paragraph("aşağıdaki kursu başarıyla tamamladığını belgeler:", subtitle_style))
-        story.append(Spacer(1, 0.6*cm))
-        
-        # Kurs başlığı - vurgulu
-        course_title_style = ParagraphStyle(
-            'CourseTitleStyle',
-            parent=styles['Heading2'],
-            fontSize=22,
-            textColor=colors.HexColor('#2c2c2c'),
-            spaceAfter=35,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold',
-            leading=28
-        )
-        story.append(Paragraph(f"<b>{course.title}</b>", course_title_style))
-        story.append(Spacer(1, 0.5*cm))
-        
-        # Kurs detayları - daha düzenli ve güzel
-        details_data = [
-            ['Eğitmen:', course.instructor_name or 'KUWAMEDYA Ekibi'],
-            ['Seviye:', course.difficulty],
-            ['Ders Sayısı:', str(course.get_lesson_count())],
-            ['Süre:', f'{course.duration_hours} Saat']
-        ]
-        
-        details_table = Table(details_data, colWidths=[4*cm, 6*cm])
-        details_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 13),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#4a4a4a')),
-            ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#2c2c2c')),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        story.append(details_table)
-        story.append(Spacer(1, 1.5*cm))
-        
-        # Tarih
-        date_str = datetime.now().strftime('%d %B %Y')
-        # Türkçe ay isimleri
-        month_tr = {
-            'January': 'Ocak', 'February': 'Şubat', 'March': 'Mart', 'April': 'Nisan',
-            'May': 'Mayıs', 'June': 'Haziran', 'July': 'Temmuz', 'August': 'Ağustos',
-            'September': 'Eylül', 'October': 'Ekim', 'November': 'Kasım', 'December': 'Aralık'
-        }
-        for en, tr in month_tr.items():
-            date_str = date_str.replace(en, tr)
-        
-        date_text = f"<i>Tarih: {date_str}</i>"
-        story.append(Paragraph(date_text, date_style))
-        story.append(Spacer(1, 2.5*cm))
-        
-        # İmza alanı - daha profesyonel
-        signature_text = """
-        <table width='500' align='center'>
-        <tr><td align='center'><hr width='250' color='#ff6b35'/></td></tr>
-        <tr><td align='center' style='padding-top: 10px;'><b>KUWAMEDYA Akademi</b></td></tr>
-        <tr><td align='center' style='padding-top: 5px; font-size: 11px; color: #6b6b6b;'>Eğitim ve Sertifikasyon Merkezi</td></tr>
-        </table>
-        """
-        story.append(Paragraph(signature_text, signature_style))
-        
-        # PDF'i oluştur - önce canvas'ı birleştir
-        # Not: ReportLab'de canvas ve SimpleDocTemplate'i birleştirmek için
-        # farklı bir yaklaşım kullanmamız gerekiyor
-        # Basit bir çözüm: story'ye canvas eklemek yerine, arka planı story içinde çizelim
-        
-        # PDF'i oluştur
-        doc.build(story)
-        buffer.seek(0)
-        
-        # Response oluştur
-        response = make_response(buffer.getvalue())
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'attachment; filename=sertifika_{course.id}_{current_user.id}.pdf'
-        
-        return response
+        data = certificate_data_for(enrollment)
+        if db.session.is_modified(enrollment):
+            db.session.commit() # Eski kayıtlar için tamamlanma tarihi ilk kez işlendi
+        # PDF üretimi (gerekirse) veritabanı oturumu açık tutulmadan yapılır
+        db.session.close()
+
+        path = store_certificate(data)
+        return send_file(path,
+                         mimetype='application/pdf',
+                         as_attachment=True,
+                         download_name=f'sertifika_{data.course_id}_{data.user_id}.pdf',
+                         conditional=True,
+                         etag=True,
+                         last_modified=data.completed_at,
+                         max_age=0)
         
     except Exception as e:
-        current_app.logger.error(f"Sertifika oluşturma hatası (user={current_user.id}, course={course_id}): {e}")
+        db.session.rollback()
+        current_app.logger.error(f"Sertifika oluşturma hatası (user={user_id}, course={course_id}): {e}")
         flash('Sertifika oluşturulurken bir hata oluştu.', 'danger')
         return redirect(url_for('academy.course_detail', course_id=course_id))
 
@@ -602,7 +401,46 @@ def manage_courses():
          flash("Kurslar listelenirken bir hata oluştu.", "danger")
          courses_pagination = None
 
-    return render_template('admin/manage_courses.html', title="Kurs Yönetimi", courses_pagination=courses_pagination)
+    from forms import CourseImportForm
+    return render_template('admin/manage_courses.html', title="Kurs Yönetimi",
+                           courses_pagination=courses_pagination, import_form=CourseImportForm())
+
+@academy.route("/admin/course/<int:course_id>/export")
+@admin_required # SADECE Admin
+def export_course(course_id):
+    """Kursu (dersleri, quizleri ve kapak görseliyle) ZIP paketi olarak akıtır."""
+    from models import Course
+    from course_bundle import iter_bundle
+    course = Course.query.get_or_404(course_id)
+    response = current_app.response_class(stream_with_context(iter_bundle([course.id])), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename=kurs-{course.id}.zip'
+    return response
+
+@academy.route("/admin/course/import", methods=['POST'])
+@admin_required # SADECE Admin
+def import_courses():
+    """Bir kurs paketini (ZIP) tek işlemde içe aktarır."""
+    from forms import CourseImportForm
+    from course_bundle import import_bundle
+    form = CourseImportForm()
+    if form.validate_on_submit():
+        try:
+            # Aktivite logu, içe aktarmayla aynı işlemde 'import_bundle' içinde yazılır
+            result = import_bundle(form.bundle.data.stream, skip_existing=form.skip_existing.data,
+                                   user=current_user._get_current_object())
+            flash(f'{result.courses} kurs, {result.lessons} ders ve {result.quizzes} quiz içe aktarıldı'
+                  + (f' ({result.skipped} mevcut kurs atlandı).' if result.skipped else '.'), 'success')
+        except ValueError as ve:
+            flash(str(ve), 'danger')
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Kurs paketi içe aktarılırken hata: {e}")
+            flash(f"Kurs paketi içe aktarılırken bir hata oluştu: {e}", "danger")
+    else:
+        for field, errors in form.errors.items():
+            for error in errors:
+                flash(f"İçe Aktarma Hatası - {getattr(form, field).label.text}: {error}", 'danger')
+    return redirect(url_for('academy.manage_courses'))
 
 @academy.route("/admin/course/add", methods=['GET', 'POST'])
 @admin_required # SADECE Admin
@@ -686,14 +524,21 @@ def edit_course(course_id):
 @academy.route("/admin/course/<int:course_id>/delete", methods=['POST'])
 @admin_required # SADECE Admin
 def delete_course(course_id):
-    """Bir kursu ve ona bağlı tüm dersleri, quizleri, kayıtları siler."""
+    """
+    Bir kursu ve ona bağlı tüm dersleri, quizleri, kayıtları siler.
+    Alt kayıtlar belleğe yüklenmez; veritabanı 'ON DELETE CASCADE' ile siler.
+    """
     from models import Course
     course = Course.query.get_or_404(course_id)
     try:
         title = course.title
+        cover_image = course.cover_image
         db.session.delete(course)
         log_activity(current_user._get_current_object(), f"<strong>{title}</strong> kursunu sistemden sildi.")
         db.session.commit()
+        # Kopyalanan kurslar kapak dosyasını paylaşır; başka kurs kullanmıyorsa dosya silinir
+        if cover_image and not db.session.query(Course.query.filter(Course.cover_image == cover_image).exists()).scalar():
+            remove_uploads_later([cover_image])
         flash(f'"{title}" adlı kurs ve ilişkili tüm veriler kalıcı olarak silindi.', 'success')
     except Exception as e:
         db.session.rollback()
@@ -702,12 +547,32 @@ def delete_course(course_id):
     return redirect(url_for('academy.manage_courses'))
 
 
+@academy.route("/admin/course/<int:course_id>/clone", methods=['POST'])
+@admin_required # SADECE Admin
+def clone_course(course_id):
+    """Kursu tüm dersleri ve quizleriyle sunucu tarafında kopyalar."""
+    from models import Course
+    import course_clone
+    course = Course.query.get_or_404(course_id)
+    try:
+        new_course_id = course_clone.clone_course(course)
+        log_activity(current_user._get_current_object(), f"<strong>{course.title}</strong> kursunun bir kopyasını oluşturdu.", course)
+        db.session.commit()
+        flash(f'"{course.title}" kursu tüm dersleri ve quizleriyle kopyalandı.', 'success')
+        return redirect(url_for('academy.manage_lessons', course_id=new_course_id))
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Kurs {course_id} kopyalanırken hata: {e}")
+        flash(f"Kurs kopyalanırken bir hata oluştu: {e}", "danger")
+    return redirect(url_for('academy.manage_courses'))
+
+
 @academy.route("/admin/course/<int:course_id>/lessons")
 @admin_required # SADECE Admin
 def manage_lessons(course_id):
     """Bir kursa ait dersleri yönetme sayfası."""
     from models import Course, Lesson
-    from forms import LessonForm, QuizForm
+    from forms import LessonForm, QuizForm, LessonReorderForm
     course = Course.query.get_or_404(course_id)
     try:
         lessons = course.lessons.order_by(Lesson.order.asc()).all()
@@ -718,13 +583,57 @@ def manage_lessons(course_id):
 
     lesson_form = LessonForm()
     quiz_form = QuizForm()
+    reorder_form = LessonReorderForm()
     
     return render_template('admin/manage_lessons.html',
                            title=f"Ders Yönetimi: {course.title}",
                            course=course,
                            lessons=lessons,
                            lesson_form=lesson_form,
-                           quiz_form=quiz_form) 
+                           quiz_form=quiz_form,
+                           reorder_form=reorder_form) 
+
+@academy.route("/admin/course/<int:course_id>/lessons/reorder", methods=['POST'])
+@admin_required # SADECE Admin
+def reorder_lessons(course_id):
+    """
+    Sürükle-bırak ile belirlenen yeni ders sırasını tek işlemde uygular (JSON döner).
+    Yalnızca yeri değişen derslerin sıralama anahtarı güncellenir.
+    """
+    from models import Course
+    from forms import LessonReorderForm
+    course = Course.query.get_or_404(course_id)
+    form = LessonReorderForm()
+    if not form.validate_on_submit():
+        errors = [error for field_errors in form.errors.values() for error in field_errors]
+        return jsonify({"error": errors[0] if errors else "Geçersiz istek."}), 400
+
+    try:
+        changed = lesson_ordering.reorder_lessons(course, form.lesson_id_list())
+        log_activity(current_user._get_current_object(), f"<strong>{course.title}</strong> kursunun ders sırasını değiştirdi.", course)
+        db.session.commit()
+        invalidate_course_outline(course.id)
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Kurs {course_id} dersleri sıralanırken hata: {e}")
+        return jsonify({"error": "Ders sırası kaydedilemedi. Lütfen sayfayı yenileyip tekrar deneyin."}), 500
+    return jsonify({"changed": changed})
+
+@academy.route("/admin/course/<int:course_id>/funnel")
+@admin_required # SADECE Admin
+def course_funnel(course_id):
+    """Kursun huni (funnel) sayfası: Öğrencilerin hangi derste bıraktığını gösterir."""
+    from models import Course
+    from academy_funnel import build_course_funnel
+    course = Course.query.get_or_404(course_id)
+    funnel = build_course_funnel(course)
+    return render_template('admin/course_funnel.html',
+                           title=f"Kurs Hunisi: {course.title}",
+                           course=course,
+                           funnel=funnel)
 
 @academy.route("/admin/course/<int:course_id>/add_lesson", methods=['POST'])
 @admin_required # SADECE Admin
@@ -736,12 +645,15 @@ def add_lesson(course_id):
     form = LessonForm()
     if form.validate_on_submit():
         try:
+            order_key = lesson_ordering.order_key_for_position(course.id, form.order.data)
             lesson = Lesson(course_id=course.id)
             form.populate_obj(lesson)
+            lesson.order = order_key
             db.session.add(lesson)
             db.session.flush()
             log_activity(current_user._get_current_object(), f"<strong>{course.title}</strong> kursuna yeni ders ekledi: '{lesson.title}'.", lesson)
             db.session.commit()
+            invalidate_course_outline(course.id)
             flash('Yeni ders başarıyla eklendi!', 'success')
         except exc.IntegrityError:
             db.session.rollback()
@@ -769,9 +681,16 @@ def edit_lesson(lesson_id):
     if form.validate_on_submit(): # POST isteği
         try:
             original_title = lesson.title
+            # Konum değişmediyse mevcut sıralama anahtarı korunur
+            if form.order.data and form.order.data != lesson_ordering.lesson_position(lesson):
+                order_key = lesson_ordering.order_key_for_position(lesson.course_id, form.order.data, exclude_id=lesson.id)
+            else:
+                order_key = lesson.order
             form.populate_obj(lesson)
+            lesson.order = order_key
             log_activity(current_user._get_current_object(), f"'{original_title}' dersini güncelledi.", lesson)
             db.session.commit()
+            invalidate_course_outline(lesson.course_id)
             flash('Ders başarıyla güncellendi!', 'success')
             return redirect(url_for('academy.manage_lessons', course_id=lesson.course_id))
         except exc.IntegrityError:
@@ -789,7 +708,7 @@ def edit_lesson(lesson_id):
         'lesson_type': lesson.lesson_type,
         'content': lesson.content,
         'video_url': lesson.video_url,
-        'order': lesson.order,
+        'order': lesson_ordering.lesson_position(lesson),
         'form_action': url_for('academy.edit_lesson', lesson_id=lesson.id)
     })
 
@@ -805,6 +724,7 @@ def delete_lesson(lesson_id):
         db.session.delete(lesson)
         log_activity(current_user._get_current_object(), f"'{title}' dersini sildi.")
         db.session.commit()
+        invalidate_course_outline(course_id)
         flash(f'"{title}" adlı ders silindi.', 'success')
     except Exception as e:
         db.session.rollback()
@@ -817,7 +737,7 @@ def delete_lesson(lesson_id):
 @admin_required # SADECE Admin
 def add_quiz(lesson_id):
     """Bir derse yeni bir quiz ekler."""
-    from models import Lesson, Quiz
+    from models import Lesson, Quiz, QuizQuestion
     from forms import QuizForm
     lesson = Lesson.query.get_or_404(lesson_id)
     if lesson.quiz:
@@ -827,15 +747,18 @@ def add_quiz(lesson_id):
     form = QuizForm()
     if form.validate_on_submit():
         try:
-            questions_json = form.questions_json.data
-            json.loads(questions_json) 
+            # İlk oluşturma toplu JSON ile yapılır; sonraki düzenlemeler soru bazındadır
+            questions = json.loads(form.questions_json.data)
 
-            quiz = Quiz(lesson_id=lesson.id, title=form.title.data, questions=questions_json)
+            quiz = Quiz(lesson_id=lesson.id, title=form.title.data,
+                        questions=QuizQuestion.from_dicts(questions))
             db.session.add(quiz)
             lesson.lesson_type = 'Quiz' 
             db.session.flush()
             log_activity(current_user._get_current_object(), f"'{lesson.title}' dersine quiz ekledi: '{quiz.title}'.", quiz)
             db.session.commit()
+            invalidate_course_outline(lesson.course_id) # Ders tipi 'Quiz' oldu
+            invalidate_compiled_quiz(quiz.id)
             flash('Quiz başarıyla eklendi!', 'success')
         except json.JSONDecodeError:
             flash("Sorular geçerli bir JSON formatında değil.", "danger")
@@ -850,28 +773,40 @@ def add_quiz(lesson_id):
     return redirect(url_for('academy.manage_lessons', course_id=lesson.course_id))
 
 
+@academy.route("/admin/quiz/<int:quiz_id>/analysis")
+@admin_required # SADECE Admin
+def quiz_analysis(quiz_id):
+    """Quizin madde analizi raporu: Soru güçlüğü, ayırt edicilik ve çeldirici frekansları."""
+    from models import Quiz
+    quiz = Quiz.query.get_or_404(quiz_id)
+    course_id = quiz.lesson.course_id
+    report = get_item_analysis(quiz)
+    return render_template('admin/quiz_analysis.html',
+                           title=f"Madde Analizi: {quiz.title}",
+                           quiz=quiz,
+                           course_id=course_id,
+                           report=report)
+
 @academy.route("/admin/quiz/<int:quiz_id>/edit", methods=['GET', 'POST'])
 @admin_required # SADECE Admin
 def edit_quiz(quiz_id):
-    """Mevcut bir quizi düzenler (GET ile modal'ı doldurur, POST ile günceller)."""
+    """
+    Quizin başlığını düzenler (GET ile modal'ı doldurur, POST ile günceller).
+    Sorular bu formla değil, 'manage_quiz_questions' sayfasında tek tek düzenlenir.
+    """
     from models import Quiz
-    from forms import QuizForm
+    from forms import QuizEditForm
     quiz = Quiz.query.get_or_404(quiz_id)
-    form = QuizForm(obj=quiz)
+    form = QuizEditForm(obj=quiz)
     
     if form.validate_on_submit(): 
         try:
             original_title = quiz.title
-            questions_json = form.questions_json.data
-            json.loads(questions_json) 
-
             quiz.title = form.title.data
-            quiz.questions = questions_json
             log_activity(current_user._get_current_object(), f"'{original_title}' quizini güncelledi.", quiz)
             db.session.commit()
+            invalidate_compiled_quiz(quiz.id)
             flash('Quiz başarıyla güncellendi!', 'success')
-        except json.JSONDecodeError:
-            flash("Sorular geçerli bir JSON formatında değil.", "danger")
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Quiz {quiz_id} düzenlenirken hata: {e}")
@@ -880,10 +815,107 @@ def edit_quiz(quiz_id):
 
     return jsonify({
         'title': quiz.title,
-        'questions_json': quiz.questions, 
+        'question_count': quiz.question_count,
+        'questions_url': url_for('academy.manage_quiz_questions', quiz_id=quiz.id),
         'form_action': url_for('academy.edit_quiz', quiz_id=quiz.id)
     })
 
+@academy.route("/admin/quiz/<int:quiz_id>/questions")
+@admin_required # SADECE Admin
+def manage_quiz_questions(quiz_id):
+    """Quizin sorularını tek tek düzenleme sayfası."""
+    from models import Quiz
+    from forms import QuizQuestionForm
+    from quiz_store import load_question_dicts
+    quiz = Quiz.query.get_or_404(quiz_id)
+    question_forms = [
+        (question, QuizQuestionForm(formdata=None,
+                                    question=question['question'],
+                                    options='\n'.join(question['options']),
+                                    correct_option=question['correct_index'] + 1))
+        for question in load_question_dicts(quiz.id)
+    ]
+    return render_template('admin/quiz_questions.html',
+                           title=f"Quiz Soruları: {quiz.title}",
+                           quiz=quiz,
+                           course_id=quiz.lesson.course_id,
+                           question_forms=question_forms,
+                           new_question_form=QuizQuestionForm(formdata=None))
+
+def _question_form_errors(form, prefix):
+    for field, errors in form.errors.items():
+        for error in errors:
+            flash(f"{prefix} - {getattr(form, field).label.text}: {error}", 'danger')
+
+@academy.route("/admin/quiz/<int:quiz_id>/questions/add", methods=['POST'])
+@admin_required # SADECE Admin
+def add_quiz_question(quiz_id):
+    """Quizin sonuna tek bir soru ekler."""
+    from models import Quiz
+    from forms import QuizQuestionForm
+    from quiz_store import add_question
+    quiz = Quiz.query.get_or_404(quiz_id)
+    form = QuizQuestionForm()
+    if form.validate_on_submit():
+        try:
+            add_question(quiz, form.question.data, form.option_list(), form.correct_option.data - 1)
+            log_activity(current_user._get_current_object(), f"'{quiz.title}' quizine yeni soru ekledi.", quiz)
+            db.session.commit()
+            invalidate_compiled_quiz(quiz.id)
+            flash('Soru eklendi.', 'success')
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Quiz {quiz_id} için soru eklenirken hata: {e}")
+            flash(f"Soru eklenirken bir hata oluştu: {e}", "danger")
+    else:
+        _question_form_errors(form, 'Soru Ekleme Hatası')
+    return redirect(url_for('academy.manage_quiz_questions', quiz_id=quiz.id))
+
+@academy.route("/admin/quiz/question/<int:question_id>/edit", methods=['POST'])
+@admin_required # SADECE Admin
+def edit_quiz_question(question_id):
+    """Tek bir quiz sorusunu günceller; quizin diğer soruları okunmaz veya yazılmaz."""
+    from models import QuizQuestion
+    from forms import QuizQuestionForm
+    from quiz_store import update_question
+    question = QuizQuestion.query.get_or_404(question_id)
+    quiz_id = question.quiz_id
+    form = QuizQuestionForm()
+    if form.validate_on_submit():
+        try:
+            update_question(question, form.question.data, form.option_list(), form.correct_option.data - 1)
+            log_activity(current_user._get_current_object(), f"'{question.quiz.title}' quizinin bir sorusunu güncelledi.", question.quiz)
+            db.session.commit()
+            invalidate_compiled_quiz(quiz_id)
+            flash('Soru güncellendi.', 'success')
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Quiz sorusu {question_id} güncellenirken hata: {e}")
+            flash(f"Soru güncellenirken bir hata oluştu: {e}", "danger")
+    else:
+        _question_form_errors(form, 'Soru Güncelleme Hatası')
+    return redirect(url_for('academy.manage_quiz_questions', quiz_id=quiz_id) + f'#question-{question_id}')
+
+@academy.route("/admin/quiz/question/<int:question_id>/delete", methods=['POST'])
+@admin_required # SADECE Admin
+def delete_quiz_question(question_id):
+    """Tek bir quiz sorusunu siler."""
+    from models import QuizQuestion
+    from quiz_store import delete_question
+    question = QuizQuestion.query.get_or_404(question_id)
+    quiz = question.quiz
+    try:
+        delete_question(question)
+        log_activity(current_user._get_current_object(), f"'{quiz.title}' quizinden bir soru sildi.", quiz)
+        db.session.commit()
+        invalidate_compiled_quiz(quiz.id)
+        flash('Soru silindi.', 'success')
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Quiz sorusu {question_id} silinirken hata: {e}")
+        flash(f"Soru silinirken bir hata oluştu: {e}", "danger")
+    return redirect(url_for('academy.manage_quiz_questions', quiz_id=quiz.id))
+
 @academy.route("/admin/quiz/<int:quiz_id>/delete", methods=['POST'])
 @admin_required # SADECE Admin
 def delete_quiz(quiz_id):
@@ -899,6 +931,9 @@ def delete_quiz(quiz_id):
             lesson.lesson_type = 'Metin' 
         log_activity(current_user._get_current_object(), f"'{title}' quizini sildi.")
         db.session.commit()
+        invalidate_course_outline(course_id) # Ders tipi 'Metin'e döndü
+        invalidate_compiled_quiz(quiz_id)
+        invalidate_item_analysis(quiz_id)
         flash(f'"{title}" adlı quiz silindi.', 'success')
     except Exception as e:
         db.session.rollback()
@@ -0,0 +1,100 @@
+from collections import namedtuple
+from sqlalchemy import and_
+from extensions import db
+
+# ===================================================================
+# KUWAMEDYA - AKADEMİ GÖRÜNÜM MODELLERİ (academy_viewmodels.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, ŞABLONLARA ORM NESNELERİ YERİNE ÖNCEDEN HESAPLANMIŞ,
+# DÜZ (PLAIN) VERİ YAPILARI HAZIRLAR.
+#
+# NEDEN?
+# - 'course_detail.html' eskiden 'course.lessons.all()',
+#   'course.lessons.order_by(...)', 'get_lesson_count()' ve
+#   'enrollment.get_progress()' gibi çağrılarla şablon içinden
+#   onlarca sorgu tetikliyordu.
+# - Artık kurs + sıralı dersler (+ quiz var mı bilgisi) TEK sorguda,
+#   kullanıcının kayıt durumu + tamamlanan dersleri TEK sorguda
+#   yüklenir. Şablon hiçbir sorgu tetiklemez (toplam en fazla 2 sorgu).
+# ===================================================================
+
+CourseSummary = namedtuple('CourseSummary', [
+    'id', 'title', 'description', 'category', 'difficulty', 'duration_hours',
+    'cover_image', 'instructor_name', 'lesson_count'])
+
+LessonRow = namedtuple('LessonRow', [
+    'id', 'order', 'title', 'lesson_type', 'has_quiz', 'is_completed'])
+
+EnrollmentState = namedtuple('EnrollmentState', [
+    'id', 'progress', 'completed_count', 'next_lesson'])
+
+CourseDetailView = namedtuple('CourseDetailView', ['course', 'lessons', 'enrollment'])
+
+
+def _load_course_with_lessons(course_id):
+    """1. sorgu: Kurs bilgileri + sıralı dersler + her dersin quizi olup olmadığı."""
+    from models import Course, Lesson, Quiz
+    return db.session.query(
+        Course.id, Course.title, Course.description, Course.category, Course.difficulty,
+        Course.duration_hours, Course.cover_image, Course.instructor_name,
+        Lesson.id.label('lesson_id'), Lesson.order.label('lesson_order'),
+        Lesson.title.label('lesson_title'), Lesson.lesson_type,
+        Quiz.id.label('quiz_id'),
+    ).outerjoin(Lesson, Lesson.course_id == Course.id)\
+     .outerjoin(Quiz, Quiz.lesson_id == Lesson.id)\
+     .filter(Course.id == course_id)\
+     .order_by(Lesson.order.asc())\
+     .all()
+
+
+def _load_enrollment_state(course_id, user_id):
+    """2. sorgu: Kullanıcının kaydı + tamamladığı derslerin ID'leri."""
+    from models import Enrollment, LessonCompletion
+    return db.session.query(
+        Enrollment.id, Enrollment.completed_count, LessonCompletion.lesson_id,
+    ).outerjoin(LessonCompletion, and_(LessonCompletion.user_id == Enrollment.user_id,
+                                       LessonCompletion.course_id == Enrollment.course_id))\
+     .filter(Enrollment.user_id == user_id, Enrollment.course_id == course_id)\
+     .all()
+
+
+def build_course_detail_view(course_id, user_id):
+    """
+    Kurs detay sayfası için görünüm modelini oluşturur.
+    Kurs bulunamazsa None döndürür. Toplam en fazla 2 sorgu çalıştırır.
+    """
+    from models import Enrollment
+
+    course_rows = _load_course_with_lessons(course_id)
+    if not course_rows:
+        return None
+
+    enrollment_rows = _load_enrollment_state(course_id, user_id)
+    completed_ids = {row.lesson_id for row in enrollment_rows if row.lesson_id is not None}
+
+    first = course_rows[0]
+    lessons = tuple(
+        LessonRow(id=row.lesson_id, order=row.lesson_order, title=row.lesson_title,
+                  lesson_type=row.lesson_type, has_quiz=row.quiz_id is not None,
+                  is_completed=row.lesson_id in completed_ids)
+        for row in course_rows if row.lesson_id is not None
+    )
+    course = CourseSummary(
+        id=first.id, title=first.title, description=first.description,
+        category=first.category, difficulty=first.difficulty,
+        duration_hours=first.duration_hours,
+        cover_image=first.cover_image or 'course_default.png',
+        instructor_name=first.instructor_name, lesson_count=len(lessons))
+
+    enrollment = None
+    if enrollment_rows:
+        completed_count = enrollment_rows[0].completed_count or 0
+        next_lesson = next((lesson for lesson in lessons if not lesson.is_completed), None)
+        enrollment = EnrollmentState(
+            id=enrollment_rows[0].id,
+            progress=Enrollment.calculate_progress(completed_count, len(lessons)),
+            completed_count=completed_count,
+            next_lesson=next_lesson)
+
+    return CourseDetailView(course=course, lessons=lessons, enrollment=enrollment)
@@ -1,22 +1,18 @@
 import os
 import secrets
-import json
 from PIL import Image
 from flask import (Blueprint, render_template, url_for, flash, redirect,
-                   request, abort, current_app)
+                   request, abort, current_app, jsonify)
 from flask_login import current_user, login_required
 from extensions import db, bcrypt
-from utils import log_activity, save_picture
+from utils import log_activity, save_picture, remove_uploads_later
+from dashboard_stats import get_dashboard_snapshot, recent_activities as dashboard_recent_activities
 from decorators import admin_required, staff_required
 
 # Tarih/Zaman ve Veritabanı Fonksiyonları
-from datetime import datetime, date
-# ===================================================================
-# GÜNCELLEME (v6.2 - Hata Düzeltmesi)
-# "relativedelativedelta" yazım hatası düzeltildi.
-# ===================================================================
-from dateutil.relativedelta import relativedelta
-from sqlalchemy import func, extract, desc
+from datetime import datetime
+from sqlalchemy import extract, desc
+from sqlalchemy.orm import joinedload
 
 admin = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -47,32 +43,15 @@ def dashboard():
 @admin.route("/admin_dashboard")
 @admin_required # SADECE Admin görebilir
 def admin_dashboard():
-    """Yöneticinin göreceği, tüm istatistikleri içeren ana kontrol paneli."""
-    from models import User, Sale, Commission, Course, ActivityLog
-
+    """
+    Yöneticinin göreceği, tüm istatistikleri içeren ana kontrol paneli.
+    Sayılar tek sorguda hesaplanır ve önbellekte tutulur (bkz. 'dashboard_stats.py').
+    """
     try:
-        today = date.today()
-        start_of_month = today.replace(day=1)
-
-        # is_staff bir property olduğu için SQL sorgusunda kullanılamaz, role kullanmalıyız
-        total_personnel = User.query.filter(User.role == 'Personel').count() # v6.2
-        total_admins = User.query.filter_by(role='Admin').count() # v6.2
-        total_users = User.query.filter_by(role='normal').count() # v7.0
-        monthly_revenue = db.session.query(func.coalesce(func.sum(Sale.amount), 0.0)).filter(Sale.date_posted >= start_of_month).scalar()
-        monthly_commission = db.session.query(func.coalesce(func.sum(Commission.amount), 0.0)).join(Sale).filter(Sale.date_posted >= start_of_month).scalar()
-        active_courses = Course.query.count()
-
-        recent_activities = ActivityLog.query.order_by(desc(ActivityLog.timestamp)).limit(5).all()
-        # v6.2: En yeni personelleri göster (Personel ve Admin) - is_staff property olduğu için role kullanıyoruz
-        latest_users = User.query.filter(User.role.in_(['Admin', 'Personel'])).order_by(desc(User.date_created)).limit(5).all()
-
-        stats = {
-            'total_staff': total_personnel + total_admins, # v6.2 (Personel + Admin)
-            'total_users': total_users, # v6.0 (Sadece Öğrenciler)
-            'monthly_revenue': monthly_revenue,
-            'monthly_commission': monthly_commission,
-            'active_courses': active_courses,
-        }
+        snapshot = get_dashboard_snapshot()
+        stats = snapshot.stats
+        latest_users = snapshot.latest_users
+        recent_activities = dashboard_recent_activities()
     except Exception as e:
         current_app.logger.error(f"Admin dashboard verileri çekilirken hata: {e}")
         flash("Dashboard verileri yüklenirken bir hata oluştu.", "danger")
@@ -188,7 +167,11 @@ def edit_user(user_id):
 @admin.route("/delete_user/<int:user_id>", methods=['POST'])
 @admin_required # SADECE Admin görebilir
 def delete_user(user_id):
-    """Bir kullanıcıyı sistemden kalıcı olarak siler."""
+    """
+    Bir kullanıcıyı sistemden kalıcı olarak siler. Kayıtları, quiz denemeleri,
+    ders tamamlamaları, satışları (primleriyle) ve aktivite logları veritabanı
+    tarafında ('ON DELETE CASCADE') silinir.
+    """
     from models import User
 
     user_to_delete = User.query.get_or_404(user_id)
@@ -198,9 +181,11 @@ def delete_user(user_id):
 
     try:
         username = user_to_delete.username
+        image_file = user_to_delete.image_file
         db.session.delete(user_to_delete)
         log_activity(current_user._get_current_object(), f"<strong>{username}</strong> adlı kullanıcıyı sistemden sildi.")
         db.session.commit()
+        remove_uploads_later([image_file])
         flash(f'"{username}" adlı kullanıcı başarıyla silindi.', 'success')
     except Exception as e:
         db.session.rollback()
@@ -213,32 +198,30 @@ def delete_user(user_id):
 # 3.0 - PROFİL SAYFALARI
 # ==========================================================================
 
-def get_monthly_sales_data(user_id):
-    """(Yardımcı Fonksiyon) Belirli bir kullanıcı için son 6 aylık satış verisini Chart.js formatında döndürür."""
-    from models import Sale
-
-    today = date.today()
-    labels = []
-    data = []
-    
+@admin.route("/api/sales-series")
+@staff_required # Admin ve Personel
+def sales_series_api():
+    """
+    Satış zaman serisi (JSON). Parametreler: 'granularity' (day/week/month),
+    'start' / 'end' (YYYY-MM-DD, İstanbul saati), 'user_id'.
+    Personel yalnızca kendi satışlarını görebilir; Admin 'user_id' vermezse
+    tüm satışlar döner. Profil ve panel grafikleri bu rotayı sonradan çağırır.
+    """
+    import sales_series
     try:
-        for i in range(5, -1, -1):
-            month_start = (today - relativedelta(months=i)).replace(day=1)
-            month_end = month_start + relativedelta(months=1)
-            month_name = month_start.strftime("%B") 
-            labels.append(month_name)
-
-            monthly_sale = db.session.query(func.coalesce(func.sum(Sale.amount), 0.0))\
-                .filter(Sale.user_id == user_id,
-                        Sale.date_posted >= month_start,
-                        Sale.date_posted < month_end)\
-                .scalar()
-            data.append(monthly_sale)
+        granularity = request.args.get('granularity', 'month')
+        start = sales_series.parse_date(request.args.get('start'))
+        end = sales_series.parse_date(request.args.get('end'))
+        user_id = request.args.get('user_id', type=int)
+        if not current_user.is_admin:
+            user_id = current_user.id
+        series = sales_series.sales_series(granularity, start, end, user_id=user_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-         current_app.logger.error(f"Aylık satış verisi alınırken hata (user_id={user_id}): {e}")
-         return {"labels": ["Hata"]*6, "data": [0]*6}
-
-    return {"labels": labels, "data": data}
+        current_app.logger.error(f"Satış zaman serisi alınırken hata: {e}")
+        return jsonify({"error": "Satış verileri alınamadı."}), 500
+    return jsonify(sales_series.series_to_json(series))
 
 @admin.route("/profile", methods=['GET', 'POST'])
 @login_required # v6.0: Artık tüm roller (Kullanıcı, Personel, Admin) kendi profilini görebilir
@@ -299,21 +282,22 @@ def profile():
         # v6.0: Sadece 'staff' (çalışan) ise satış/prim verilerini çek.
         if user.is_staff:
             sales_page = request.args.get('sales_page', 1, type=int)
-            sales_pagination = Sale.query.filter_by(author=user).order_by(desc(Sale.date_posted)).paginate(page=page, per_page=5, error_out=False)
+            sales_pagination = Sale.query.filter_by(author=user).order_by(desc(Sale.date_posted)).paginate(page=sales_page, per_page=5, error_out=False)
             total_sales_amount = user.get_total_sales_amount()
             total_commission = user.get_total_commission()
-            monthly_sales_json = json.dumps(get_monthly_sales_data(user.id))
         else:
-            sales_pagination, total_sales_amount, total_commission, monthly_sales_json = None, 0.0, 0.0, json.dumps({"labels": [], "data": []})
+            sales_pagination, total_sales_amount, total_commission = None, 0.0, 0.0
 
         # Akademi verileri herkes için çekilebilir
-        enrollments = user.enrollments.order_by(Enrollment.date_enrolled.desc()).all()
+        # Kurs bilgisi (ders sayısı dahil) tek sorguda birlikte yüklenir (N+1 yok)
+        enrollments = user.enrollments.options(joinedload(Enrollment.course))\
+            .order_by(Enrollment.date_enrolled.desc()).all()
         completed_courses_count = sum(1 for en in enrollments if en.get_progress() == 100)
         
     except Exception as e:
          current_app.logger.error(f"Profil sayfası verileri çekilirken hata (user_id={user.id}): {e}")
          flash("Profil verileri yüklenirken bir hata oluştu.", "danger")
-         sales_pagination, total_sales_amount, total_commission, enrollments, completed_courses_count, monthly_sales_json = None, 0.0, 0.0, [], 0, json.dumps({"labels": [], "data": []})
+         sales_pagination, total_sales_amount, total_commission, enrollments, completed_courses_count = None, 0.0, 0.0, [], 0
 
     # v6.0: profile.html şablonu artık 'user.is_staff' kontrolü yapıyor.
     return render_template('panel/profile.html', title=f'{user.name} | Profilim',
@@ -325,8 +309,7 @@ def profile():
                            total_sales_amount=total_sales_amount,
                            total_commission=total_commission,
                            enrollments=enrollments,
-                           completed_courses_count=completed_courses_count,
-                           monthly_sales_data=monthly_sales_json)
+                           completed_courses_count=completed_courses_count)
 
 
 @admin.route("/profile/<string:username>")
@@ -343,17 +326,18 @@ def view_user_profile(username):
             sales_pagination = Sale.query.filter_by(author=user).order_by(desc(Sale.date_posted)).paginate(page=sales_page, per_page=5, error_out=False)
             total_sales_amount = user.get_total_sales_amount()
             total_commission = user.get_total_commission()
-            monthly_sales_json = json.dumps(get_monthly_sales_data(user.id))
         else:
-            sales_pagination, total_sales_amount, total_commission, monthly_sales_json = None, 0.0, 0.0, json.dumps({"labels": [], "data": []})
+            sales_pagination, total_sales_amount, total_commission = None, 0.0, 0.0
 
-        enrollments = user.enrollments.order_by(Enrollment.date_enrolled.desc()).all()
+        # Kurs bilgisi (ders sayısı dahil) tek sorguda birlikte yüklenir (N+1 yok)
+        enrollments = user.enrollments.options(joinedload(Enrollment.course))\
+            .order_by(Enrollment.date_enrolled.desc()).all()
         completed_courses_count = sum(1 for en in enrollments if en.get_progress() == 100)
         
     except Exception as e:
         current_app.logger.error(f"Başkasının profili görüntülenirken hata (username={username}): {e}")
         flash("Profil verileri yüklenirken bir hata oluştu.", "danger")
-        sales_pagination, total_sales_amount, total_commission, enrollments, completed_courses_count, monthly_sales_json = None, 0.0, 0.0, [], 0, json.dumps({"labels": [], "data": []})
+        sales_pagination, total_sales_amount, total_commission, enrollments, completed_courses_count = None, 0.0, 0.0, [], 0
 
     return render_template('panel/profile.html', title=f"{user.name} Profili",
                            user=user,
@@ -364,8 +348,7 @@ def view_user_profile(username):
                            total_sales_amount=total_sales_amount,
                            total_commission=total_commission,
                            enrollments=enrollments,
-                           completed_courses_count=completed_courses_count,
-                           monthly_sales_data=monthly_sales_json)
+                           completed_courses_count=completed_courses_count)
 
 # ==========================================================================
 # 4.0 - SATIŞ YÖNETİMİ
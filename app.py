@@ -83,6 +83,16 @@ def register_extensions(app):
         from models import User 
         return User.query.get(int(user_id))
 
+    # Kurs/ders tam metin arama indeksini ORM olaylarına bağla
+    from search_index import register_events
+    register_events()
+    # Yönetici paneli önbelleğini oturum (commit) olaylarına bağla
+    import dashboard_stats
+    dashboard_stats.register_events()
+    # Günlük satış özet tablosunu satış/prim olaylarına bağla
+    import sales_rollup
+    sales_rollup.register_events()
+
 def register_blueprints(app):
     """Uygulamanın modüllerini (Blueprint'leri) kaydeder."""
     from auth_routes import auth as auth_blueprint
@@ -126,8 +136,8 @@ def register_errorhandlers(app):
 def register_commands(app):
     """'flask seed' gibi özel terminal komutlarını ekler."""
     import click
-    from flask.cli import with_appcontext
-    
+    from flask.cli import with_appcontext, AppGroup
+
     @click.command('seed')
     @with_appcontext
     def seed_command():
@@ -164,6 +174,339 @@ def register_commands(app):
             click.echo(f'Admin oluşturulurken hata: {e}', err=True)
     app.cli.add_command(create_admin_command)
 
+    # --- AKADEMİ BAKIM KOMUTLARI (flask academy ...) ---
+    academy_cli = AppGroup('academy', help='Akademi bakım komutları.')
+
+    @academy_cli.command('reconcile-counts')
+    def reconcile_counts_command():
+        """Saklanan ders ve tamamlama sayaçlarını kaynak tablolarla eşitler."""
+        from sqlalchemy import func, select
+        from models import Course, Lesson, Enrollment, LessonCompletion
+
+        course_table = Course.__table__
+        enrollment_table = Enrollment.__table__
+        lesson_total = select(func.count(Lesson.id))\
+            .where(Lesson.course_id == course_table.c.id)\
+            .scalar_subquery()
+        completion_total = select(func.count(LessonCompletion.id))\
+            .where(LessonCompletion.user_id == enrollment_table.c.user_id,
+                   LessonCompletion.course_id == enrollment_table.c.course_id)\
+            .scalar_subquery()
+
+        try:
+            fixed_courses = db.session.execute(
+                course_table.update()
+                .where(course_table.c.lesson_count != lesson_total)
+                .values(lesson_count=lesson_total)
+            ).rowcount
+            fixed_enrollments = db.session.execute(
+                enrollment_table.update()
+                .where(enrollment_table.c.completed_count != completion_total)
+                .values(completed_count=completion_total)
+            ).rowcount
+            db.session.commit()
+            click.echo(f'{fixed_courses} kursun ders sayacı ve {fixed_enrollments} kaydın tamamlama sayacı düzeltildi.')
+        except Exception as e:
+            db.session.rollback()
+            click.echo(f'Sayaçlar düzeltilirken hata: {e}', err=True)
+
+    @academy_cli.command('render-lessons')
+    @click.option('--all', 'render_all', is_flag=True, help='Güncel olanlar dahil tüm dersleri yeniden işle.')
+    @click.option('--batch-size', default=200, show_default=True, help='Tek işlemde (commit) işlenecek ders sayısı.')
+    def render_lessons_command(render_all, batch_size):
+        """Ders içeriklerini ve video ID'lerini (lesson_renderer) yeniden üretir."""
+        from lesson_renderer import RENDER_VERSION, render_lesson
+        from models import Lesson
+
+        query = Lesson.query.order_by(Lesson.id)
+        if not render_all:
+            query = query.filter(Lesson.render_version != RENDER_VERSION)
+
+        rendered = 0
+        last_id = 0
+        try:
+            while True:
+                lessons = query.filter(Lesson.id > last_id).limit(batch_size).all()
+                if not lessons:
+                    break
+                for lesson in lessons:
+                    render_lesson(lesson)
+                db.session.commit()
+                rendered += len(lessons)
+                last_id = lessons[-1].id
+            click.echo(f'{rendered} ders işlendi (işleme sürümü: {RENDER_VERSION}).')
+        except Exception as e:
+            db.session.rollback()
+            click.echo(f'Dersler işlenirken hata: {e}', err=True)
+
+    @academy_cli.command('rebuild-funnel')
+    @click.option('--course', 'course_id', type=int, default=None, help='Sadece bu kursun sayaçlarını yeniden hesapla.')
+    def rebuild_funnel_command(course_id):
+        """Kurs hunisi sayaçlarını (kayıt ve ders tamamlama) yeniden hesaplar."""
+        from academy_funnel import rebuild_funnel_stats
+        try:
+            lessons, courses = rebuild_funnel_stats(course_id)
+            db.session.commit()
+            click.echo(f'{courses} kursun kayıt sayacı ve {lessons} dersin tamamlama sayacı yeniden hesaplandı.')
+        except Exception as e:
+            db.session.rollback()
+            click.echo(f'Huni sayaçları hesaplanırken hata: {e}', err=True)
+
+    @academy_cli.command('export')
+    @click.argument('output', type=click.Path(dir_okay=False, writable=True))
+    @click.option('--course', 'course_ids', type=int, multiple=True, help='Sadece bu kursu dışa aktar (birden çok verilebilir).')
+    def export_command(output, course_ids):
+        """Kursları (dersler, quizler, kapak görselleri) ZIP paketine aktarır."""
+        from course_bundle import iter_bundle
+        try:
+            with open(output, 'wb') as target:
+                for chunk in iter_bundle(list(course_ids) or None):
+                    target.write(chunk)
+            click.echo(f'Kurs paketi yazıldı: {output}')
+        except Exception as e:
+            click.echo(f'Kurslar dışa aktarılırken hata: {e}', err=True)
+
+    @academy_cli.command('import')
+    @click.argument('bundle_path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--skip-existing', is_flag=True, help='Aynı başlıklı kursları hata vermek yerine atla.')
+    def import_command(bundle_path, skip_existing):
+        """'flask academy export' ile üretilen paketi tek işlemde içe aktarır."""
+        from course_bundle import import_bundle
+        try:
+            result = import_bundle(bundle_path, skip_existing=skip_existing)
+            click.echo(f'{result.courses} kurs, {result.lessons} ders, {result.quizzes} quiz ve '
+                       f'{result.questions} soru içe aktarıldı ({result.skipped} kurs atlandı).')
+        except Exception as e:
+            click.echo(f'Kurs paketi içe aktarılırken hata: {e}', err=True)
+
+    app.cli.add_command(academy_cli)
+
+    # --- QUIZ BAKIM KOMUTLARI (flask quizzes ...) ---
+    quizzes_cli = AppGroup('quizzes', help='Quiz bakım komutları.')
+
+    @quizzes_cli.command('regrade')
+    @click.option('--quiz-id', type=int, default=None, help='Sadece bu quizin denemelerini yeniden puanla.')
+    @click.option('--batch-size', type=int, default=1000, show_default=True, help='Tek seferde işlenecek deneme sayısı.')
+    def regrade_command(quiz_id, batch_size):
+        """Geçmiş quiz denemelerini güncel cevap anahtarıyla yeniden puanlar."""
+        import numpy as np
+        import grading_engine
+        from academy_cache import get_compiled_quiz
+        from models import Quiz, QuizAttempt
+
+        quizzes = Quiz.query.filter_by(id=quiz_id).all() if quiz_id else Quiz.query.order_by(Quiz.id).all()
+        if quiz_id and not quizzes:
+            click.echo(f'Quiz bulunamadı: {quiz_id}', err=True)
+            return
+
+        total_changed = 0
+        for quiz in quizzes:
+            answer_key = get_compiled_quiz(quiz).answer_key
+            question_count = len(answer_key)
+
+            skipped = QuizAttempt.query.filter(QuizAttempt.quiz_id == quiz.id, QuizAttempt.answers.is_(None)).count()
+            changed = 0
+            last_id = 0
+            try:
+                while True:
+                    rows = db.session.query(QuizAttempt.id, QuizAttempt.score,
+                                            QuizAttempt.total_questions, QuizAttempt.answers)\
+                        .filter(QuizAttempt.quiz_id == quiz.id, QuizAttempt.id > last_id,
+                                QuizAttempt.answers.isnot(None))\
+                        .order_by(QuizAttempt.id).limit(batch_size).all()
+                    if not rows:
+                        break
+                    matrix = np.stack([grading_engine.unpack_answers(row.answers, question_count) for row in rows]) \
+                        if question_count else np.empty((len(rows), 0), dtype=grading_engine.ANSWER_DTYPE)
+                    _, scores = grading_engine.grade_batch(answer_key, matrix)
+                    updates = [{'id': row.id, 'score': int(score), 'total_questions': question_count}
+                               for row, score in zip(rows, scores)
+                               if row.score != score or row.total_questions != question_count]
+                    if updates:
+                        db.session.bulk_update_mappings(QuizAttempt, updates)
+                    changed += len(updates)
+                    last_id = rows[-1].id
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                click.echo(f'Quiz {quiz.id} yeniden puanlanırken hata: {e}', err=True)
+                continue
+
+            total_changed += changed
+            click.echo(f'Quiz {quiz.id}: {changed} denemenin skoru güncellendi'
+                       + (f', cevabı saklanmayan {skipped} eski deneme atlandı.' if skipped else '.'))
+        click.echo(f'Toplam {total_changed} deneme yeniden puanlandı.')
+
+    app.cli.add_command(quizzes_cli)
+
+    # --- SERTİFİKA KOMUTLARI (flask certificates ...) ---
+    certificates_cli = AppGroup('certificates', help='Sertifika komutları.')
+
+    @certificates_cli.command('benchmark')
+    @click.option('--iterations', type=int, default=50, show_default=True, help='Ölçüm için üretilecek sertifika sayısı.')
+    def certificates_benchmark_command(iterations):
+        """Örnek bir sertifikanın üretim süresini ve PDF boyutunu ölçer."""
+        from datetime import datetime
+        from certificates import CertificateData, benchmark_render
+
+        sample = CertificateData(user_id=0, user_name='Örnek Kullanıcı', course_id=0,
+                                 course_title='Dijital Pazarlama Temelleri', instructor_name='KUWAMEDYA Ekibi',
+                                 difficulty='Başlangıç', lesson_count=12, duration_hours=8,
+                                 completed_at=datetime.utcnow())
+        avg_ms, size = benchmark_render(sample, iterations)
+        click.echo(f'{iterations} sertifika: ortalama {avg_ms:.2f} ms/sertifika, PDF boyutu {size} bayt.')
+
+    @certificates_cli.command('build')
+    @click.option('--course', 'course_id', type=int, required=True, help='Sertifikaları üretilecek kursun ID\'si.')
+    @click.option('--workers', type=int, default=None, help='Paralel işlem sayısı (varsayılan: CPU çekirdek sayısı).')
+    @click.option('--zip', 'zip_path', type=click.Path(dir_okay=False, writable=True), default=None,
+                  help='Üretilen sertifikaları tek bir ZIP arşivinde de topla.')
+    def certificates_build_command(course_id, workers, zip_path):
+        """Kursu tamamlayan herkesin sertifikasını paralel olarak üretir."""
+        import time
+        import zipfile
+        from concurrent.futures import ProcessPoolExecutor
+        from certificates import completed_certificate_data, store_certificate
+        from models import Course
+
+        course = Course.query.get(course_id)
+        if not course:
+            click.echo(f'Kurs bulunamadı: {course_id}', err=True)
+            return
+
+        certificates = completed_certificate_data(course_id)
+        # Üretim için veritabanına ihtiyaç yok; alt süreçlere sadece düz veri gönderilir
+        db.session.close()
+        if not certificates:
+            click.echo(f"'{course.title}' kursunu tamamlayan kayıt bulunamadı.")
+            return
+
+        folder = app.config['CERTIFICATE_FOLDER']
+        workers = workers or os.cpu_count() or 1
+        click.echo(f"'{course.title}': {len(certificates)} sertifika {workers} işlemle üretiliyor...")
+
+        started = time.perf_counter()
+        archive = zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_STORED) if zip_path else None
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunksize = max(1, len(certificates) // (workers * 4))
+                paths = executor.map(store_certificate, certificates,
+                                     [folder] * len(certificates), chunksize=chunksize)
+                for data, path in zip(certificates, paths):
+                    if archive:
+                        archive.write(path, arcname=f'sertifika_{data.course_id}_{data.user_id}.pdf')
+        except Exception as e:
+            click.echo(f'Sertifikalar üretilirken hata: {e}', err=True)
+            return
+        finally:
+            if archive:
+                archive.close()
+
+        elapsed = time.perf_counter() - started
+        click.echo(f'{len(certificates)} sertifika {elapsed:.2f} sn içinde hazırlandı '
+                   f'({len(certificates) / elapsed:.1f} sertifika/sn).')
+        if zip_path:
+            click.echo(f'ZIP arşivi: {zip_path}')
+
+    app.cli.add_command(certificates_cli)
+
+    # --- ARAMA İNDEKSİ KOMUTLARI (flask search ...) ---
+    search_cli = AppGroup('search', help='Akademi arama indeksi komutları.')
+
+    @search_cli.command('rebuild')
+    def search_rebuild_command():
+        """Kurs ve ders arama indeksini baştan oluşturur."""
+        from search_index import rebuild
+        try:
+            count = rebuild()
+            db.session.commit()
+            click.echo(f'Arama indeksi yeniden oluşturuldu: {count} belge.')
+        except Exception as e:
+            db.session.rollback()
+            click.echo(f'Arama indeksi oluşturulurken hata: {e}', err=True)
+
+    app.cli.add_command(search_cli)
+
+    # --- SATIŞ ÖZETİ KOMUTLARI (flask rollups ...) ---
+    rollups_cli = AppGroup('rollups', help='Satış özet tablosu komutları.')
+
+    @rollups_cli.command('rebuild')
+    @click.option('--chunk-size', default=5000, show_default=True, help='Tek seferde okunacak satış sayısı.')
+    def rollups_rebuild_command(chunk_size):
+        """Günlük satış özet tablosunu tüm satışlardan yeniden hesaplar."""
+        from sales_rollup import rebuild
+        try:
+            count = rebuild(chunk_size=chunk_size)
+            db.session.commit()
+            click.echo(f'Günlük satış özeti yeniden hesaplandı: {count} satış.')
+        except Exception as e:
+            db.session.rollback()
+            click.echo(f'Satış özeti hesaplanırken hata: {e}', err=True)
+
+    @rollups_cli.command('reconcile')
+    @click.option('--fix', is_flag=True, help='Sapan personel toplamlarını gerçek değerlerle düzeltir.')
+    def rollups_reconcile_command(fix):
+        """Saklanan personel satış/prim toplamlarını kaynak tablolarla karşılaştırır (gece çalıştırılması önerilir)."""
+        from sales_rollup import reconcile_user_totals
+        try:
+            drifts = reconcile_user_totals(fix=fix)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            click.echo(f'Personel toplamları karşılaştırılırken hata: {e}', err=True)
+            return
+
+        for drift in drifts:
+            message = (f"Sapma: kullanıcı {drift.user_id} ({drift.username}) "
+                       f"saklanan tutar/adet/prim={drift.stored[0]:.2f}/{drift.stored[1]}/{drift.stored[2]:.2f}, "
+                       f"gerçek={drift.actual[0]:.2f}/{drift.actual[1]}/{drift.actual[2]:.2f}")
+            app.logger.warning(message)
+            click.echo(message, err=True)
+        if not drifts:
+            click.echo('Personel toplamları kaynak tablolarla uyumlu.')
+        elif fix:
+            click.echo(f'{len(drifts)} kullanıcının toplamları düzeltildi.')
+        else:
+            click.echo(f'{len(drifts)} kullanıcıda sapma bulundu (düzeltmek için --fix).', err=True)
+            # Zamanlanmış (cron) çalıştırmalarda sapma, çıkış kodu ile de bildirilir
+            raise SystemExit(1)
+
+    app.cli.add_command(rollups_cli)
+
+    # --- PRİM KOMUTLARI (flask commissions ...) ---
+    commissions_cli = AppGroup('commissions', help='Prim hesaplama komutları.')
+
+    @commissions_cli.command('recompute')
+    @click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+                  help='Sadece bu tarihten (YYYY-MM-DD, İstanbul saati) itibaren yapılan satışlar.')
+    @click.option('--user', 'user_id', type=int, default=None, help='Sadece bu personelin (kullanıcı ID) satışları.')
+    @click.option('--chunk-size', default=5000, show_default=True, help='Tek seferde işlenecek satış sayısı.')
+    def commissions_recompute_command(since, user_id, chunk_size):
+        """Primleri güncel orana göre toplu yeniden hesaplar, eksik primleri ekler (ödenmiş primler korunur)."""
+        import time
+        from commission_engine import RecomputeStats, recompute_commissions, merge_stats, log_recompute_result
+
+        totals = RecomputeStats(0, 0, 0, 0, 0, 0)
+        started = time.perf_counter()
+        try:
+            # Her grup ayrı commit edilir; hata olursa önceki gruplar korunur
+            for chunk in recompute_commissions(since=since.date() if since else None, user_id=user_id,
+                                               chunk_size=chunk_size):
+                db.session.commit()
+                totals = merge_stats(totals, chunk)
+                click.echo(f'... {totals.sales} satış işlendi (son satış ID {chunk.last_sale_id}).')
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f'Primler yeniden hesaplanırken hata (son tamamlanan satış ID {totals.last_sale_id}): {e}')
+            click.echo(f'Primler yeniden hesaplanırken hata: {e}', err=True)
+
+        per_second = log_recompute_result(totals, time.perf_counter() - started)
+        click.echo(f'{totals.sales} satış: {totals.inserted} prim eklendi, {totals.updated} güncellendi, '
+                   f'{totals.unchanged} değişmedi, ödenmiş {totals.skipped_paid} prim atlandı '
+                   f'({per_second:.0f} satış/sn).')
+
+    app.cli.add_command(commissions_cli)
+
     app.logger.info("CLI komutları başarıyla kaydedildi.")
 
 
@@ -0,0 +1,380 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.units import cm
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.enums import TA_CENTER
+from flask import current_app
+from extensions import db
+
+# ===================================================================
+# KUWAMEDYA - SERTİFİKA OLUŞTURMA VE DİSK ÖNBELLEĞİ (certificates.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, 'academy_routes.download_certificate' İÇİNDE HER TIKLAMADA
+# SIFIRDAN YAPILAN PDF ÜRETİMİNİ DİSKTEKİ BİR SERTİFİKA DEPOSUNA TAŞIR.
+#
+# 1.  DİSK ÖNBELLEĞİ:
+#     - Sertifikalar 'CERTIFICATE_FOLDER' altında
+#       '<kurs_id>/<kullanıcı_id>_<tamamlanma_tarihi>_v<şablon_sürümü>.pdf'
+#       yolunda saklanır. Anahtar (kullanıcı, kurs, tamamlanma tarihi,
+#       şablon sürümü) değişmedikçe PDF bir daha üretilmez.
+#     - Şablon (tasarım) değiştiğinde 'TEMPLATE_VERSION' artırılır;
+#       eski dosyalar kendiliğinden kullanılmaz hale gelir.
+#     - Dosyalar önce geçici bir dosyaya yazılır, ardından 'os.replace'
+#       ile atomik olarak yerine taşınır (yarım PDF sunulmaz).
+#
+# 2.  VERİTABANINDAN BAĞIMSIZ ÜRETİM:
+#     - PDF üretimi için gereken her şey 'CertificateData' içinde düz
+#       veri olarak toplanır; üretim sırasında veritabanı oturumu
+#       (session) açık tutulmaz.
+#
+# 3.  ARKA PLANDA ÖN-ÜRETİM:
+#     - Kurs %100 tamamlandığında ('complete_lesson', 'submit_quiz')
+#       sertifika arka plandaki bir iş parçacığında üretilir; kullanıcı
+#       "indir" dediğinde dosya genellikle hazırdır.
+#
+# 4.  YENİDEN KULLANILABİLİR ŞABLON:
+#     - 'ParagraphStyle' nesneleri, detay tablosu stili ve arka plan
+#       geometrisi süreç başına bir kez oluşturulur.
+#     - Arka plan (çerçeveler, köşe rozetleri, noktalı çizgiler) PDF içinde
+#       bir form XObject olarak tanımlanır ve sayfadan referans verilir.
+#     - Ölçüm: 'flask certificates benchmark'.
+# ===================================================================
+
+# Sertifika tasarımı değiştiğinde artırılmalıdır (disk önbelleği anahtarının parçası).
+TEMPLATE_VERSION = 2
+
+CertificateData = namedtuple('CertificateData', [
+    'user_id', 'user_name', 'course_id', 'course_title', 'instructor_name',
+    'difficulty', 'lesson_count', 'duration_hours', 'completed_at'])
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='certificates')
+_pending_lock = threading.Lock()
+_pending = set()
+
+
+def resolve_completed_at(enrollment):
+    """
+    Kaydın tamamlanma tarihini döndürür. v7.1 öncesinden kalan veya ders
+    silinerek %100'e ulaşmış kayıtlarda tarih, son tamamlanan dersten
+    alınır ve kayda işlenir (commit çağırana aittir).
+    """
+    if enrollment.completed_at is None:
+        from sqlalchemy import func
+        from models import LessonCompletion
+        last_completion = db.session.query(func.max(LessonCompletion.completed_at))\
+            .filter(LessonCompletion.user_id == enrollment.user_id,
+                    LessonCompletion.course_id == enrollment.course_id).scalar()
+        enrollment.completed_at = last_completion or enrollment.date_enrolled
+    return enrollment.completed_at
+
+
+def certificate_data_for(enrollment):
+    """Bir kayıttan (Enrollment) sertifika için gereken düz veriyi oluşturur."""
+    user = enrollment.student
+    course = enrollment.course
+    return CertificateData(
+        user_id=user.id,
+        user_name=user.name or user.username,
+        course_id=course.id,
+        course_title=course.title,
+        instructor_name=course.instructor_name,
+        difficulty=course.difficulty,
+        lesson_count=course.get_lesson_count(),
+        duration_hours=course.duration_hours,
+        completed_at=resolve_completed_at(enrollment))
+
+
+def completed_certificate_data(course_id):
+    """
+    Kursu %100 tamamlamış tüm kayıtlar için 'CertificateData' listesini TEK
+    sorguda döndürür (toplu üretim için). Tamamlanma tarihi boş olan eski
+    kayıtlarda tarih, 'resolve_completed_at' ile aynı kurala göre seçilir.
+    """
+    from sqlalchemy import func
+    from models import User, Course, Enrollment, LessonCompletion
+
+    last_completion = db.session.query(func.max(LessonCompletion.completed_at))\
+        .filter(LessonCompletion.user_id == Enrollment.user_id,
+                LessonCompletion.course_id == Enrollment.course_id)\
+        .scalar_subquery()
+    rows = db.session.query(
+        User.id, User.name, User.username,
+        Course.id, Course.title, Course.instructor_name, Course.difficulty,
+        Course.lesson_count, Course.duration_hours,
+        func.coalesce(Enrollment.completed_at, last_completion, Enrollment.date_enrolled),
+    ).join(User, User.id == Enrollment.user_id)\
+     .join(Course, Course.id == Enrollment.course_id)\
+     .filter(Enrollment.course_id == course_id,
+             Course.lesson_count > 0,
+             Enrollment.completed_count >= Course.lesson_count)\
+     .order_by(Enrollment.id).all()
+
+    return [CertificateData(
+        user_id=user_id, user_name=name or username, course_id=c_id, course_title=title,
+        instructor_name=instructor_name, difficulty=difficulty, lesson_count=lesson_count,
+        duration_hours=duration_hours, completed_at=completed_at)
+        for (user_id, name, username, c_id, title, instructor_name, difficulty,
+             lesson_count, duration_hours, completed_at) in rows]
+
+
+def certificate_path(data, folder=None):
+    """Sertifikanın diskteki yolunu (önbellek anahtarı) döndürür."""
+    folder = folder or current_app.config['CERTIFICATE_FOLDER']
+    stamp = data.completed_at.strftime('%Y%m%d%H%M%S')
+    return os.path.join(folder, str(data.course_id),
+                        f"{data.user_id}_{stamp}_v{TEMPLATE_VERSION}.pdf")
+
+
+# ===================================================================
+# ŞABLON (SÜREÇ BAŞINA BİR KEZ HAZIRLANIR)
+# Stiller, tablo stili ve arka plan geometrisi modül yüklenirken
+# oluşturulur; her sertifikada sadece değişken metinler (isim, kurs,
+# tarih, detay tablosu) yerleştirilir.
+# ===================================================================
+PRIMARY_COLOR = colors.HexColor('#ff6b35')
+ACCENT_COLOR = colors.HexColor('#ffa726')
+
+MONTHS_TR = ('Ocak', 'Şubat', 'Mart', 'Nisan', 'Mayıs', 'Haziran',
+             'Temmuz', 'Ağustos', 'Eylül', 'Ekim', 'Kasım', 'Aralık')
+
+_sample_styles = getSampleStyleSheet()
+
+STYLES = {
+    # Başlık stili - daha büyük ve etkileyici
+    'title': ParagraphStyle('CustomTitle', parent=_sample_styles['Heading1'], fontSize=36,
+                            textColor=PRIMARY_COLOR, spaceAfter=40, alignment=TA_CENTER,
+                            fontName='Helvetica-Bold', leading=42),
+    # Alt başlık stili
+    'subtitle': ParagraphStyle('CustomSubtitle', parent=_sample_styles['Normal'], fontSize=14,
+                               textColor=colors.HexColor('#4a4a4a'), spaceAfter=25,
+                               alignment=TA_CENTER, fontName='Helvetica'),
+    # İsim stili - çok vurgulu
+    'name': ParagraphStyle('NameStyle', parent=_sample_styles['Heading2'], fontSize=32,
+                           textColor=PRIMARY_COLOR, spaceAfter=30, alignment=TA_CENTER,
+                           fontName='Helvetica-Bold', leading=38),
+    # Kurs başlık stili
+    'course_title': ParagraphStyle('CourseTitleStyle', parent=_sample_styles['Heading2'], fontSize=22,
+                                   textColor=colors.HexColor('#2c2c2c'), spaceAfter=35,
+                                   alignment=TA_CENTER, fontName='Helvetica-Bold', leading=28),
+    # Tarih stili
+    'date': ParagraphStyle('DateStyle', parent=_sample_styles['Normal'], fontSize=12,
+                           textColor=colors.HexColor('#6b6b6b'), alignment=TA_CENTER,
+                           fontName='Helvetica-Oblique'),
+    # İmza stili
+    'signature': ParagraphStyle('SignatureStyle', parent=_sample_styles['Normal'], fontSize=14,
+                                textColor=colors.HexColor('#2c2c2c'), alignment=TA_CENTER,
+                                fontName='Helvetica-Bold'),
+}
+
+DETAILS_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 13),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#4a4a4a')),
+    ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#2c2c2c')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 10),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+])
+
+SIGNATURE_TEXT = """
+<table width='500' align='center'>
+<tr><td align='center'><hr width='250' color='#ff6b35'/></td></tr>
+<tr><td align='center' style='padding-top: 10px;'><b>KUWAMEDYA Akademi</b></td></tr>
+<tr><td align='center' style='padding-top: 5px; font-size: 11px; color: #6b6b6b;'>Eğitim ve Sertifikasyon Merkezi</td></tr>
+</table>
+"""
+
+
+def _background_geometry():
+    """Arka plan çerçeveleri, köşe rozetleri ve noktalı çizgilerin koordinatlarını hesaplar."""
+    width, height = A4
+    border_margin = 1.5*cm
+    inner_margin = 0.4*cm
+    inner = border_margin + inner_margin
+
+    # Köşe dekorasyonları (rozet merkezleri)
+    corner_size = 1.2*cm
+    corner_positions = [
+        (inner + 0.2*cm, height - inner - 0.2*cm - corner_size),
+        (width - inner - 0.2*cm - corner_size, height - inner - 0.2*cm - corner_size),
+        (inner + 0.2*cm, inner + 0.2*cm),
+        (width - inner - 0.2*cm - corner_size, inner + 0.2*cm),
+    ]
+    badges = [(x + corner_size/2, y + corner_size/2) for x, y in corner_positions]
+
+    # Üst ve alt dekoratif çizgiler ve üzerlerindeki noktalar
+    line_start = inner + 2.5*cm
+    line_end = width - inner - 2.5*cm
+    lines = [(line_start, line_y, line_end, line_y)
+             for line_y in (height - inner - 3*cm, inner + 3*cm)]
+    dots = [(line_start + (line_end - line_start) * i / 4, line_y)
+            for (_, line_y, _, _) in lines for i in range(5)]
+
+    return {
+        'outer': (border_margin, border_margin, width - 2*border_margin, height - 2*border_margin),
+        'inner': (inner, inner, width - 2*inner, height - 2*inner),
+        'badge_outer_radius': corner_size/3,
+        'badge_inner_radius': corner_size/5,
+        'badges': badges,
+        'lines': lines,
+        'dots': dots,
+        'dot_radius': 0.12*cm,
+    }
+
+
+BACKGROUND = _background_geometry()
+BACKGROUND_FORM = 'certificate_background'
+
+
+def _draw_background(canvas):
+    """Sabit arka planı (önceden hesaplanmış geometri ile) çizer."""
+    bg = BACKGROUND
+    # Dış çerçeve (turuncu kalın)
+    canvas.setStrokeColor(PRIMARY_COLOR)
+    canvas.setLineWidth(4)
+    canvas.rect(*bg['outer'])
+    # İç çerçeve (altın)
+    canvas.setStrokeColor(ACCENT_COLOR)
+    canvas.setLineWidth(2)
+    canvas.rect(*bg['inner'])
+    # Köşe rozetleri
+    canvas.setStrokeColor(PRIMARY_COLOR)
+    canvas.setLineWidth(1.5)
+    for cx, cy in bg['badges']:
+        canvas.setFillColor(PRIMARY_COLOR)
+        canvas.circle(cx, cy, bg['badge_outer_radius'], fill=1, stroke=1)
+        canvas.setFillColor(colors.white)
+        canvas.circle(cx, cy, bg['badge_inner_radius'], fill=1)
+    # Dekoratif çizgiler ve noktalar
+    canvas.setLineWidth(1)
+    for line in bg['lines']:
+        canvas.line(*line)
+    canvas.setFillColor(PRIMARY_COLOR)
+    for dx, dy in bg['dots']:
+        canvas.circle(dx, dy, bg['dot_radius'], fill=1)
+
+
+def _draw_page(canvas, doc):
+    """
+    Arka planı belgede bir kez form XObject olarak tanımlar ve her
+    sayfada sadece ona referans verir ('doForm').
+    """
+    if not getattr(doc, '_background_ready', False):
+        canvas.beginForm(BACKGROUND_FORM)
+        _draw_background(canvas)
+        canvas.endForm()
+        doc._background_ready = True
+    canvas.doForm(BACKGROUND_FORM)
+
+
+def format_date_tr(value):
+    """Tarihi süreç 'locale' ayarından bağımsız olarak '01 Ekim 2026' biçiminde yazar."""
+    return f"{value.day:02d} {MONTHS_TR[value.month - 1]} {value.year}"
+
+
+def render_certificate(data):
+    """Sertifika PDF'ini üretir ve bayt olarak döndürür (sadece değişken metinler yerleştirilir)."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4,
+                            rightMargin=1.5*cm, leftMargin=1.5*cm,
+                            topMargin=1.5*cm, bottomMargin=1.5*cm)
+
+    details_table = Table([
+        ['Eğitmen:', data.instructor_name or 'KUWAMEDYA Ekibi'],
+        ['Seviye:', data.difficulty],
+        ['Ders Sayısı:', str(data.lesson_count)],
+        ['Süre:', f'{data.duration_hours} Saat'],
+    ], colWidths=[4*cm, 6*cm])
+    details_table.setStyle(DETAILS_TABLE_STYLE)
+
+    story = [
+        Spacer(1, 4*cm),
+        Paragraph("SERTİFİKA", STYLES['title']),
+        Spacer(1, 0.8*cm),
+        Paragraph("<hr width='400' color='#ff6b35'/>", STYLES['subtitle']),
+        Spacer(1, 0.8*cm),
+        Paragraph("Bu belge, aşağıda adı geçen kişinin", STYLES['subtitle']),
+        Spacer(1, 0.5*cm),
+        Paragraph(f"<b>{data.user_name.upper()}</b>", STYLES['name']),
+        Spacer(1, 0.6*cm),
+        Paragraph("aşağıdaki kursu başarıyla tamamladığını belgeler:", STYLES['subtitle']),
+        Spacer(1, 0.6*cm),
+        Paragraph(f"<b>{data.course_title}</b>", STYLES['course_title']),
+        Spacer(1, 0.5*cm),
+        details_table,
+        Spacer(1, 1.5*cm),
+        # Tarih (kursun tamamlandığı gün; aynı sertifika her seferinde aynı tarihi taşır)
+        Paragraph(f"<i>Tarih: {format_date_tr(data.completed_at)}</i>", STYLES['date']),
+        Spacer(1, 2.5*cm),
+        Paragraph(SIGNATURE_TEXT, STYLES['signature']),
+    ]
+
+    # Not: Sayfa çizim fonksiyonları 'SimpleDocTemplate(...)' yerine 'build()'e
+    # verilmelidir; kurucuya verilenler sessizce yok sayılır.
+    doc.build(story, onFirstPage=_draw_page, onLaterPages=_draw_page)
+    return buffer.getvalue()
+
+
+def benchmark_render(data, iterations=50):
+    """
+    Sertifika üretim süresini ölçer. (sertifika başına ortalama ms,
+    PDF boyutu bayt) döndürür. İlk (ısınma) üretim ölçüme dahil edilmez.
+    """
+    pdf_bytes = render_certificate(data)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        pdf_bytes = render_certificate(data)
+    elapsed = time.perf_counter() - started
+    return (elapsed / iterations) * 1000, len(pdf_bytes)
+
+
+def store_certificate(data, folder=None):
+    """
+    Sertifikayı diskten döndürür; yoksa üretip atomik olarak kaydeder.
+    Dosyanın yolunu döndürür.
+    """
+    path = certificate_path(data, folder)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pdf_bytes = render_certificate(data)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, path)
+    return path
+
+
+def queue_certificate(data):
+    """Sertifikayı arka planda üretir (zaten diskteyse veya kuyruktaysa hiçbir şey yapmaz)."""
+    folder = current_app.config['CERTIFICATE_FOLDER']
+    logger = current_app.logger
+    path = certificate_path(data, folder)
+    with _pending_lock:
+        if path in _pending or os.path.exists(path):
+            return
+        _pending.add(path)
+
+    def _generate():
+        try:
+            store_certificate(data, folder)
+        except Exception as e:
+            logger.error(f"Arka plan sertifika üretim hatası (user={data.user_id}, course={data.course_id}): {e}")
+        finally:
+            with _pending_lock:
+                _pending.discard(path)
+
+    _executor.submit(_generate)
@@ -1,7 +1,27 @@
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+from dateutil import tz
 from flask import current_app
+from sqlalchemy import bindparam
+from sqlalchemy.dialects import postgresql, sqlite
 from extensions import db
 from models import Commission, Sale # ActivityLog importu kaldırıldı
 
+# ===================================================================
+# GÜNCELLEME v7.1 (Performans Güncellemesi)
+# 1. TOPLU YENİDEN HESAPLAMA: 'recompute_commissions' satışları id
+#    sırasıyla gruplar (chunk) halinde okur, primleri numpy ile tek
+#    seferde hesaplar ve 'INSERT ... ON CONFLICT (sale_id) DO UPDATE'
+#    ile toplu yazar ('flask commissions recompute').
+#    - Ödenmiş ('is_paid') primler değiştirilmez.
+#    - Core yazımları ORM olaylarını tetiklemediği için günlük özet ve
+#      personel toplamları 'sales_rollup.add_commission_changes' ile,
+#      panel önbelleği 'dashboard_stats.mark_changed' ile güncellenir.
+# 2. LOGLAMA: 'print' yerine 'current_app.logger' kullanılıyor; toplu
+#    işlem sonuçları 'anahtar=değer' biçiminde (satış/saniye dahil) loglanır.
+# 3. TUTARLILIK: Tekil ve toplu yol aynı yuvarlama fonksiyonunu kullanır
+#    ('commission_amounts').
 # ===================================================================
 # GÜNCELLEME v5.0
 # 1. MERKEZİ LOGLAMA: Manuel 'ActivityLog' oluşturma işlemleri
@@ -13,6 +33,27 @@ from models import Commission, Sale # ActivityLog importu kaldırıldı
 # ===================================================================
 from utils import log_activity # Merkezi loglama fonksiyonumuzu import et
 
+RECOMPUTE_CHUNK = 5000
+# Bu farkın altındaki prim değişiklikleri yazılmaz (kuruş altı)
+AMOUNT_TOLERANCE = 0.005
+
+RecomputeStats = namedtuple('RecomputeStats', ['sales', 'inserted', 'updated', 'unchanged', 'skipped_paid', 'last_sale_id'])
+
+
+def get_commission_rate():
+    """Prim oranını config'den al, yoksa %10 kullan."""
+    return current_app.config.get('COMMISSION_RATE', 0.10)
+
+
+def commission_amounts(amounts, rate):
+    """Satış tutarları dizisinden (kuruşa yuvarlanmış) prim tutarları dizisi."""
+    return np.round(np.asarray(amounts, dtype=np.float64) * rate, 2)
+
+
+def _calculation_details(sale_amount, rate):
+    return f"{sale_amount:.2f} TL tutarındaki satış için %{int(rate * 100)} oranında hesaplandı."
+
+
 def calculate_and_record_commission(sale: Sale):
     """
     Bir satış nesnesi alarak, yapılandırmadaki orana göre primini hesaplar
@@ -21,30 +62,26 @@ def calculate_and_record_commission(sale: Sale):
     """
     # --- GÜVENLİK KONTROLÜ (v3.4): NoneType hatasını önler ---
     if not sale or not sale.id:
-        print(f"Prim hesaplama hatası: Geçersiz satış nesnesi alındı.")
+        current_app.logger.warning("Prim hesaplama hatası: Geçersiz satış nesnesi alındı.")
         return False
     if not sale.author:
-        print(f"Prim hesaplama hatası: Satış ID {sale.id} için kullanıcı bilgisi bulunamadı.")
+        current_app.logger.warning(f"Prim hesaplama hatası: Satış ID {sale.id} için kullanıcı bilgisi bulunamadı.")
         return False
     # --- GÜVENLİK KONTROLÜ SONU ---
 
     try:
-        # Prim oranını config'den al, yoksa %10 kullan
-        commission_rate = current_app.config.get('COMMISSION_RATE', 0.10)
-        
-        # Prim miktarını hesapla
-        commission_amount = sale.amount * commission_rate
-        
-        # Bu satış için daha önce prim hesaplanmış mı kontrol et
-        existing_commission = Commission.query.filter_by(sale_id=sale.id).first()
+        commission_rate = get_commission_rate()
+
+        # Bu satış için daha önce prim hesaplanmış mı kontrol et (yalnızca id okunur)
+        existing_commission = db.session.query(Commission.id).filter_by(sale_id=sale.id).first()
         if existing_commission:
-            print(f"Uyarı: Satış ID {sale.id} için zaten prim hesaplanmış.")
+            current_app.logger.warning(f"Uyarı: Satış ID {sale.id} için zaten prim hesaplanmış.")
             return False # Zaten varsa tekrar hesaplama
 
         new_commission = Commission(
-            amount=round(commission_amount, 2),
+            amount=float(commission_amounts([sale.amount], commission_rate)[0]),
             sale_id=sale.id,
-            calculation_details=f"{sale.amount:.2f} TL tutarındaki satış için %{int(commission_rate * 100)} oranında hesaplandı."
+            calculation_details=_calculation_details(sale.amount, commission_rate)
         )
         db.session.add(new_commission)
 
@@ -58,12 +95,121 @@ def calculate_and_record_commission(sale: Sale):
         # Onu çağıran 'admin_routes.py' içindeki 'new_sale' rotası
         # 'db.session.commit()' yaparak hem satışı hem de primi
         # aynı anda veritabanına işler (Bu, 'atomik' işlem için en doğrusudur).
-        print(f"Başarılı: Satış ID {sale.id} için {new_commission.amount:.2f} TL prim eklendi.")
+        current_app.logger.info(f"Başarılı: Satış ID {sale.id} için {new_commission.amount:.2f} TL prim eklendi.")
         return True
 
     except Exception as e:
-        import traceback
-        print(f"Prim hesaplama sırasında beklenmedik bir hata oluştu: {e}")
-        print(traceback.format_exc())
+        current_app.logger.error(f"Prim hesaplama sırasında beklenmedik bir hata oluştu (sale={sale.id}): {e}", exc_info=True)
         db.session.rollback() # Hata olursa işlemi geri al
         return False
+
+
+# ===================================================================
+# TOPLU YENİDEN HESAPLAMA (v7.1)
+# ===================================================================
+def _local_day_start_utc(day):
+    """İstanbul saatine göre günün başlangıcı (veritabanındaki gibi naive UTC)."""
+    from sales_rollup import LOCAL_TZ
+    return datetime.combine(day, datetime.min.time(), LOCAL_TZ).astimezone(tz.UTC).replace(tzinfo=None)
+
+
+def _upsert_commissions(connection, inserts, updates):
+    """
+    Yeni primleri ekler, mevcut (ödenmemiş) primleri günceller. SQLite ve
+    PostgreSQL'de tek bir 'INSERT ... ON CONFLICT (sale_id) DO UPDATE' kullanılır.
+    """
+    table = Commission.__table__
+    dialect = {'sqlite': sqlite, 'postgresql': postgresql}.get(connection.dialect.name)
+    if dialect is not None:
+        rows = inserts + updates
+        if rows:
+            statement = dialect.insert(table)
+            statement = statement.on_conflict_do_update(
+                index_elements=['sale_id'],
+                set_={'amount': statement.excluded.amount,
+                      'calculation_details': statement.excluded.calculation_details},
+                # Okuma ile yazma arasında ödenen primlere dokunma
+                where=table.c.is_paid.isnot(True))
+            connection.execute(statement, rows)
+        return
+
+    # Diğer veritabanları: toplu UPDATE + toplu INSERT
+    if updates:
+        connection.execute(
+            table.update()
+            .where(table.c.sale_id == bindparam('b_sale_id'), table.c.is_paid.isnot(True))
+            .values(amount=bindparam('b_amount'), calculation_details=bindparam('b_details')),
+            [{'b_sale_id': row['sale_id'], 'b_amount': row['amount'], 'b_details': row['calculation_details']}
+             for row in updates])
+    if inserts:
+        connection.execute(table.insert(), inserts)
+
+
+def recompute_commissions(since=None, user_id=None, rate=None, chunk_size=RECOMPUTE_CHUNK):
+    """
+    Satışların primlerini güncel orana göre yeniden hesaplar; primi olmayan
+    satışlara prim ekler. 'since' (yerel tarih) ve 'user_id' ile süzülebilir.
+    Her grup yazıldıktan sonra o grubun 'RecomputeStats' değerini üretir
+    (generator); commit çağırana aittir (her gruptan sonra yapılabilir).
+    """
+    import dashboard_stats
+    from sales_rollup import add_commission_changes
+    rate = get_commission_rate() if rate is None else rate
+    base = db.session.query(Sale.id, Sale.user_id, Sale.date_posted, Sale.amount,
+                            Commission.amount, Commission.is_paid)\
+        .outerjoin(Commission, Commission.sale_id == Sale.id)\
+        .filter(Sale.user_id.isnot(None))  # Tekil yol gibi: personeli olmayan satışa prim yazılmaz
+    if since is not None:
+        base = base.filter(Sale.date_posted >= _local_day_start_utc(since))
+    if user_id is not None:
+        base = base.filter(Sale.user_id == user_id)
+
+    last_id = 0
+    while True:
+        # Anahtar (id) tabanlı sayfalama: tüm satışlar belleğe alınmaz
+        rows = base.filter(Sale.id > last_id).order_by(Sale.id.asc()).limit(chunk_size).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        sale_amounts = np.fromiter((row[3] or 0.0 for row in rows), dtype=np.float64, count=len(rows))
+        current = np.fromiter((np.nan if row[4] is None else row[4] for row in rows), dtype=np.float64, count=len(rows))
+        paid = np.fromiter((bool(row[5]) for row in rows), dtype=bool, count=len(rows))
+        new_amounts = commission_amounts(sale_amounts, rate)
+
+        missing = np.isnan(current)
+        skipped_paid = int((paid & ~missing).sum())
+        changed = ~missing & ~paid & (np.abs(new_amounts - np.nan_to_num(current)) > AMOUNT_TOLERANCE)
+
+        inserts, updates, changes = [], [], []
+        for position in np.flatnonzero(missing | changed):
+            sale_id, sale_user_id, date_posted, sale_amount = rows[position][:4]
+            row = {'sale_id': sale_id, 'amount': float(new_amounts[position]),
+                   'calculation_details': _calculation_details(sale_amount or 0.0, rate)}
+            (inserts if missing[position] else updates).append(row)
+            changes.append((sale_user_id, date_posted, row['amount'] - (0.0 if missing[position] else current[position])))
+
+        if inserts or updates:
+            connection = db.session.connection()
+            _upsert_commissions(connection, inserts, updates)
+            add_commission_changes(connection, changes)
+            dashboard_stats.mark_changed()
+
+        yield RecomputeStats(sales=len(rows), inserted=len(inserts), updated=len(updates),
+                             unchanged=len(rows) - len(inserts) - len(updates) - skipped_paid,
+                             skipped_paid=skipped_paid, last_sale_id=last_id)
+
+
+def log_recompute_result(totals, elapsed):
+    """Toplu hesaplama sonucunu 'anahtar=değer' biçiminde loglar ve satış/saniye değerini döndürür."""
+    per_second = totals.sales / elapsed if elapsed > 0 else 0.0
+    current_app.logger.info(
+        f"commission_recompute sales={totals.sales} inserted={totals.inserted} updated={totals.updated} "
+        f"unchanged={totals.unchanged} skipped_paid={totals.skipped_paid} "
+        f"seconds={elapsed:.3f} sales_per_second={per_second:.1f}")
+    return per_second
+
+
+def merge_stats(total, chunk):
+    """Grup sonuçlarını toplar ('last_sale_id' son grubunkidir)."""
+    return RecomputeStats(*(a + b for a, b in zip(total[:-1], chunk[:-1])), last_sale_id=chunk.last_sale_id)
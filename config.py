@@ -62,6 +62,10 @@ class Config:
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # Maksimum yükleme boyutu: 16 MB
 
+    # --- SERTİFİKA AYARLARI ---
+    # Üretilen sertifika PDF'lerinin saklandığı disk önbelleği (public 'static' dışında)
+    CERTIFICATE_FOLDER = os.environ.get('CERTIFICATE_FOLDER') or os.path.join(basedir, 'instance', 'certificates')
+
     # --- KUWAMEDYA ÖZEL AYARLARI ---
     COMMISSION_RATE = 0.10 # Prim hesaplama oranı (%10)
 
@@ -0,0 +1,431 @@
+import io
+import json
+import os
+import secrets
+import shutil
+import zipfile
+from collections import namedtuple
+from datetime import datetime
+from flask import current_app
+from extensions import db
+import dashboard_stats
+import lesson_renderer
+import search_index
+
+# ===================================================================
+# KUWAMEDYA - KURS DIŞA/İÇE AKTARMA PAKETLERİ (course_bundle.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, KURSLARI (dersleri, quizleri ve kapak görselleriyle) ORTAMLAR
+# ARASINDA TAŞIMAK İÇİN BİR ZIP PAKETİ ÜRETİR VE İÇE AKTARIR.
+# 'seed.py' yeniden çalıştırılmadan bir katalog staging ortamına kopyalanabilir.
+#
+# 1.  PAKET BİÇİMİ:
+#     - 'courses.ndjson', 'lessons.ndjson', 'quizzes.ndjson': Satır başına
+#       bir JSON kaydı. Kayıtlar kaynak id'lerini 'key' olarak taşır; alt
+#       kayıtlar üst kaydı bu anahtarla gösterir.
+#     - 'assets/...': Yüklenmiş kapak görselleri.
+#     - 'manifest.json': Biçim/sürüm ve kayıt sayıları (en sona yazılır).
+#
+# 2.  DIŞA AKTARMA ('iter_bundle'):
+#     - Paket, bellekte biriktirilmeden parça parça (bytes) üretilir;
+#       CLI dosyaya yazar, yönetim paneli HTTP yanıtı olarak akıtır.
+#     - Sorgular yalnızca gereken sütunları 'yield_per' ile okur.
+#
+# 3.  İÇE AKTARMA ('import_bundle'):
+#     - Kayıtlar 'BATCH_SIZE' boyutunda gruplar halinde Core toplu INSERT
+#       (executemany) ile yazılır; tüm paket TEK işlem (transaction) içinde
+#       uygulanır. Hata olursa her şey geri alınır ve çıkarılan görseller
+#       silinir.
+#     - Toplu INSERT ORM olaylarını tetiklemediğinden; ders ön işleme
+#       alanları ('lesson_renderer'), huni sayaçları, ders/soru sayaçları ve
+#       arama indeksi burada doğrudan doldurulur.
+#     - Yeni id'ler, benzersiz kısıtlar üzerinden geri okunur: kurs başlığı,
+#       (course_id, order), quiz için lesson_id, soru için (quiz_id, position).
+#     - Sorular, quiz formlarıyla aynı kurala göre doğrulanır: 'correct_index'
+#       seçeneklerden birini gösteren bir tam sayı olmalıdır.
+#     - İçe aktarma kaydı ('log_activity') aynı işlemde yazılır.
+# ===================================================================
+
+BUNDLE_FORMAT = 'kuwamedya-course-bundle'
+BUNDLE_VERSION = 1
+BATCH_SIZE = 500
+
+COURSE_FIELDS = ('title', 'description', 'category', 'difficulty', 'duration_hours', 'instructor_name')
+LESSON_FIELDS = ('title', 'lesson_type', 'content', 'video_url', 'recommended_videos', 'order')
+
+ImportResult = namedtuple('ImportResult', ['courses', 'lessons', 'quizzes', 'questions', 'skipped'])
+
+
+def _line(record):
+    return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _cover_asset_path(cover_image):
+    """Kapak görseli yüklenmiş bir dosyaysa diskteki yolunu döndürür (varsayılan görsel/URL için None)."""
+    if not cover_image or cover_image.startswith(('http://', 'https://')):
+        return None
+    upload_folder = os.path.realpath(current_app.config['UPLOAD_FOLDER'])
+    path = os.path.realpath(os.path.join(upload_folder, cover_image))
+    if not path.startswith(upload_folder + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+
+# ===================================================================
+# DIŞA AKTARMA
+# ===================================================================
+class _ChunkSink:
+    """'zipfile' çıktısını toplayan, geri sarılamayan (unseekable) yazma hedefi."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _course_rows(course_ids):
+    from models import Course
+    query = db.session.query(Course.id, Course.cover_image, *(getattr(Course, field) for field in COURSE_FIELDS))
+    if course_ids:
+        query = query.filter(Course.id.in_(course_ids))
+    return query.order_by(Course.id).yield_per(BATCH_SIZE)
+
+
+def _lesson_rows(course_ids):
+    from models import Lesson
+    query = db.session.query(Lesson.id, Lesson.course_id, *(getattr(Lesson, field) for field in LESSON_FIELDS))
+    if course_ids:
+        query = query.filter(Lesson.course_id.in_(course_ids))
+    return query.order_by(Lesson.course_id, Lesson.order).yield_per(BATCH_SIZE)
+
+
+def _quiz_records(course_ids):
+    """Quizleri soru ve seçenekleriyle tek sorguda okur ve quiz başına bir kayıt üretir."""
+    from models import Lesson, Quiz, QuizQuestion, QuizOption
+    query = db.session.query(
+        Quiz.id, Quiz.lesson_id, Quiz.title,
+        QuizQuestion.id.label('question_id'), QuizQuestion.text.label('question_text'),
+        QuizQuestion.correct_index, QuizOption.text.label('option_text'),
+    ).outerjoin(QuizQuestion, QuizQuestion.quiz_id == Quiz.id)\
+     .outerjoin(QuizOption, QuizOption.question_id == QuizQuestion.id)
+    if course_ids:
+        query = query.join(Lesson, Lesson.id == Quiz.lesson_id).filter(Lesson.course_id.in_(course_ids))
+    query = query.order_by(Quiz.id, QuizQuestion.position, QuizOption.position)
+
+    record, question, question_id = None, None, None
+    for row in query.yield_per(BATCH_SIZE):
+        if record is None or record['key'] != row.id:
+            if record is not None:
+                yield record
+            record, question, question_id = {'key': row.id, 'lesson': row.lesson_id, 'title': row.title, 'questions': []}, None, None
+        if row.question_id is None:
+            continue
+        if row.question_id != question_id:
+            question_id = row.question_id
+            question = {'question': row.question_text, 'options': [], 'correct_index': row.correct_index}
+            record['questions'].append(question)
+        if row.option_text is not None:
+            question['options'].append(row.option_text)
+    if record is not None:
+        yield record
+
+
+def iter_bundle(course_ids=None):
+    """
+    Verilen kursları (boşsa tümünü) ZIP paketi olarak parça parça üretir.
+    Uygulama bağlamı (app context) içinde tüketilmelidir.
+    """
+    sink = _ChunkSink()
+    counts = {'courses': 0, 'lessons': 0, 'quizzes': 0, 'assets': 0}
+    assets = []
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+        with bundle.open('courses.ndjson', 'w') as out:
+            for row in _course_rows(course_ids):
+                record = {'key': row.id, 'cover_image': row.cover_image, 'cover_asset': None}
+                record.update((field, getattr(row, field)) for field in COURSE_FIELDS)
+                path = _cover_asset_path(row.cover_image)
+                if path:
+                    record['cover_asset'] = f"assets/{row.id}/{os.path.basename(path)}"
+                    assets.append((path, record['cover_asset']))
+                out.write(_line(record))
+                counts['courses'] += 1
+                if sink.chunks:
+                    yield sink.drain()
+
+        with bundle.open('lessons.ndjson', 'w') as out:
+            for row in _lesson_rows(course_ids):
+                record = {'key': row.id, 'course': row.course_id}
+                record.update((field, getattr(row, field)) for field in LESSON_FIELDS)
+                out.write(_line(record))
+                counts['lessons'] += 1
+                if sink.chunks:
+                    yield sink.drain()
+
+        with bundle.open('quizzes.ndjson', 'w') as out:
+            for record in _quiz_records(course_ids):
+                out.write(_line(record))
+                counts['quizzes'] += 1
+                if sink.chunks:
+                    yield sink.drain()
+
+        for path, arcname in assets:
+            bundle.write(path, arcname)
+            counts['assets'] += 1
+            yield sink.drain()
+
+        manifest = dict(format=BUNDLE_FORMAT, version=BUNDLE_VERSION,
+                        exported_at=datetime.utcnow().isoformat(), **counts)
+        bundle.writestr('manifest.json', json.dumps(manifest, ensure_ascii=False, indent=2))
+    yield sink.drain()
+
+
+# ===================================================================
+# İÇE AKTARMA
+# ===================================================================
+def _read_lines(bundle, name):
+    """Paketteki bir NDJSON dosyasını satır satır (dict) okur."""
+    with bundle.open(name) as raw:
+        for line in io.TextIOWrapper(raw, encoding='utf-8'):
+            if line.strip():
+                yield json.loads(line)
+
+
+def _batches(records):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validate_question(quiz_title, position, question):
+    """Sorunun 'correct_index' alanı seçeneklerden birini göstermiyorsa ValueError fırlatır."""
+    options = question.get('options')
+    correct_index = question.get('correct_index')
+    if not isinstance(options, list) or not isinstance(correct_index, int) or not (0 <= correct_index < len(options)):
+        raise ValueError(f"'{quiz_title}' quizinin {position + 1}. sorusunda seçeneklerle uyumlu, "
+                         "geçerli bir 'correct_index' (tam sayı) bulunamadı.")
+
+
+class _BundleImporter:
+    """Bir paketi mevcut oturumun işlemi (transaction) içinde toplu olarak yazar."""
+
+    def __init__(self, bundle, skip_existing):
+        self.bundle = bundle
+        self.skip_existing = skip_existing
+        self.connection = db.session.connection()
+        self.search_backend = search_index.get_backend(self.connection)
+        self.course_ids = {}   # paket anahtarı -> yeni kurs id
+        self.lesson_ids = {}   # paket anahtarı -> yeni ders id
+        self.skipped = 0
+        self.counts = {'lessons': 0, 'quizzes': 0, 'questions': 0}
+        self.written_files = []
+
+    def run(self):
+        for batch in _batches(_read_lines(self.bundle, 'courses.ndjson')):
+            self._import_courses(batch)
+        for batch in _batches(_read_lines(self.bundle, 'lessons.ndjson')):
+            self._import_lessons(batch)
+        self._update_lesson_counts()
+        for batch in _batches(_read_lines(self.bundle, 'quizzes.ndjson')):
+            self._import_quizzes(batch)
+        return ImportResult(courses=len(self.course_ids), lessons=self.counts['lessons'],
+                            quizzes=self.counts['quizzes'], questions=self.counts['questions'],
+                            skipped=self.skipped)
+
+    def remove_written_files(self):
+        for path in self.written_files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _extract_cover(self, record):
+        """Kapak görselini yükleme klasörüne yeni (çakışmayan) bir adla çıkarır."""
+        arcname = record.get('cover_asset')
+        if not arcname:
+            return record.get('cover_image') or 'course_default.png'
+        _, extension = os.path.splitext(arcname)
+        allowed_extensions = current_app.config.get('ALLOWED_EXTENSIONS', {'png', 'jpg', 'jpeg', 'gif'})
+        if extension.lower().strip('.') not in allowed_extensions:
+            return 'course_default.png'
+
+        folder = os.path.join(current_app.config['UPLOAD_FOLDER'], 'courses')
+        os.makedirs(folder, exist_ok=True)
+        filename = secrets.token_hex(8) + extension
+        path = os.path.join(folder, filename)
+        with self.bundle.open(arcname) as source, open(path, 'wb') as target:
+            shutil.copyfileobj(source, target)
+        self.written_files.append(path)
+        return f"courses/{filename}"
+
+    def _import_courses(self, batch):
+        from models import Course
+        course_table = Course.__table__
+        titles = [record['title'] for record in batch]
+        existing = {row.title for row in db.session.query(Course.title).filter(Course.title.in_(titles))}
+        if existing and not self.skip_existing:
+            raise ValueError(f"'{sorted(existing)[0]}' başlıklı kurs zaten mevcut.")
+
+        rows, keys = [], {}
+        for record in batch:
+            if record['title'] in existing:
+                self.skipped += 1
+                continue
+            row = {field: record.get(field) for field in COURSE_FIELDS}
+            row['cover_image'] = self._extract_cover(record)
+            rows.append(row)
+            keys[record['title']] = record['key']
+        if not rows:
+            return
+
+        self.connection.execute(course_table.insert(), rows)
+        new_rows = db.session.query(Course.id, Course.title, Course.description).filter(Course.title.in_(list(keys))).all()
+        for row in new_rows:
+            self.course_ids[keys[row.title]] = row.id
+        if self.search_backend is not None:
+            self.search_backend.upsert_many(self.connection, [
+                ('course', row.id, row.id, row.title, search_index.html_to_text(row.description)) for row in new_rows])
+
+    def _import_lessons(self, batch):
+        from models import Lesson, LessonFunnelStat
+        lesson_table = Lesson.__table__
+        rows, keys = [], {}
+        for record in batch:
+            course_id = self.course_ids.get(record['course'])
+            if course_id is None:
+                continue
+            row = {field: record.get(field) for field in LESSON_FIELDS}
+            row['course_id'] = course_id
+            # Toplu INSERT 'lesson_render_fields' olayını tetiklemez; ön işleme burada yapılır
+            row['content_html'] = lesson_renderer.sanitize_html(row['content'])
+            row['video_embed_id'] = lesson_renderer.extract_youtube_id(row['video_url'])
+            row['recommended_video_ids'] = ' '.join(
+                lesson_renderer.normalize_recommended_videos(row['recommended_videos'])) or None
+            row['render_version'] = lesson_renderer.RENDER_VERSION
+            rows.append(row)
+            keys[(course_id, row['order'])] = record['key']
+        if not rows:
+            return
+
+        self.connection.execute(lesson_table.insert(), rows)
+        new_rows = db.session.query(Lesson.id, Lesson.course_id, Lesson.order, Lesson.title, Lesson.content)\
+            .filter(Lesson.course_id.in_({course_id for course_id, _ in keys}),
+                    Lesson.order.in_({order for _, order in keys}))
+        funnel_rows, documents = [], []
+        for row in new_rows:
+            key = keys.get((row.course_id, row.order))
+            if key is None:
+                continue
+            self.lesson_ids[key] = row.id
+            funnel_rows.append({'lesson_id': row.id, 'course_id': row.course_id, 'completion_count': 0})
+            documents.append(('lesson', row.id, row.course_id, row.title, search_index.html_to_text(row.content)))
+        self.connection.execute(LessonFunnelStat.__table__.insert(), funnel_rows)
+        if self.search_backend is not None:
+            self.search_backend.upsert_many(self.connection, documents)
+        self.counts['lessons'] += len(rows)
+
+    def _update_lesson_counts(self):
+        from sqlalchemy import func, select
+        from models import Course, Lesson
+        if not self.course_ids:
+            return
+        course_table = Course.__table__
+        lesson_total = select(func.count(Lesson.id))\
+            .where(Lesson.course_id == course_table.c.id)\
+            .scalar_subquery()
+        self.connection.execute(course_table.update()
+                                .where(course_table.c.id.in_(list(self.course_ids.values())))
+                                .values(lesson_count=lesson_total))
+
+    def _import_quizzes(self, batch):
+        from models import Quiz, QuizQuestion, QuizOption
+        quiz_rows, questions_by_lesson = [], {}
+        for record in batch:
+            lesson_id = self.lesson_ids.get(record['lesson'])
+            if lesson_id is None:
+                continue
+            questions = record.get('questions') or []
+            for position, question in enumerate(questions):
+                _validate_question(record['title'], position, question)
+            quiz_rows.append({'lesson_id': lesson_id, 'title': record['title'], 'question_count': len(questions)})
+            questions_by_lesson[lesson_id] = questions
+        if not quiz_rows:
+            return
+
+        self.connection.execute(Quiz.__table__.insert(), quiz_rows)
+        quiz_ids = dict(db.session.query(Quiz.lesson_id, Quiz.id).filter(Quiz.lesson_id.in_(list(questions_by_lesson))))
+
+        question_rows, options_by_question = [], {}
+        for lesson_id, questions in questions_by_lesson.items():
+            quiz_id = quiz_ids[lesson_id]
+            for position, question in enumerate(questions):
+                question_rows.append({'quiz_id': quiz_id, 'position': position, 'text': question['question'],
+                                      'correct_index': question['correct_index']})
+                options_by_question[(quiz_id, position)] = question.get('options') or []
+        if not question_rows:
+            self.counts['quizzes'] += len(quiz_rows)
+            return
+
+        self.connection.execute(QuizQuestion.__table__.insert(), question_rows)
+        question_ids = db.session.query(QuizQuestion.id, QuizQuestion.quiz_id, QuizQuestion.position)\
+            .filter(QuizQuestion.quiz_id.in_(list(quiz_ids.values())))
+        option_rows = [
+            {'question_id': row.id, 'position': position, 'text': str(text)}
+            for row in question_ids
+            for position, text in enumerate(options_by_question[(row.quiz_id, row.position)])
+        ]
+        if option_rows:
+            self.connection.execute(QuizOption.__table__.insert(), option_rows)
+        self.counts['quizzes'] += len(quiz_rows)
+        self.counts['questions'] += len(question_rows)
+
+
+def import_bundle(source, skip_existing=False, user=None):
+    """
+    Bir kurs paketini (dosya yolu veya dosya nesnesi) tek işlemde içe aktarır
+    ve commit eder. Aynı başlıklı kurs veya geçersiz bir soru varsa ValueError
+    fırlatır; 'skip_existing' ile bu kurslar (ve alt kayıtları) atlanır.
+    'user' verilirse aktivite logu aynı işlemde yazılır.
+    """
+    try:
+        bundle = zipfile.ZipFile(source)
+    except zipfile.BadZipFile:
+        raise ValueError("Geçerli bir kurs paketi değil (ZIP dosyası okunamadı).")
+
+    with bundle:
+        try:
+            manifest = json.loads(bundle.read('manifest.json'))
+        except (KeyError, ValueError):
+            raise ValueError("Geçerli bir kurs paketi değil (manifest.json bulunamadı).")
+        if manifest.get('format') != BUNDLE_FORMAT or manifest.get('version') != BUNDLE_VERSION:
+            raise ValueError("Desteklenmeyen kurs paketi biçimi veya sürümü.")
+
+        importer = _BundleImporter(bundle, skip_existing)
+        try:
+            result = importer.run()
+            if user is not None:
+                from utils import log_activity
+                log_activity(user, f"paketten {result.courses} kurs içe aktardı.")
+            # Kurslar Core ile yazıldı; yönetici paneli önbelleği commit sonrası yenilensin
+            dashboard_stats.mark_changed()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            importer.remove_written_files()
+            raise
+    return result
@@ -0,0 +1,137 @@
+from datetime import datetime
+from sqlalchemy import and_, literal, select
+from extensions import db
+import dashboard_stats
+import search_index
+
+# ===================================================================
+# KUWAMEDYA - SUNUCU TARAFINDA KURS KOPYALAMA (course_clone.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, BİR KURSU (dersleri, quizleri, soruları ve seçenekleriyle)
+# KÜME TABANLI 'INSERT ... SELECT' SORGULARIYLA KOPYALAR.
+#
+# 1.  SABİT SAYIDA SORGU:
+#     - Kurs büyüklüğünden bağımsız olarak her tablo için tek bir
+#       'INSERT ... SELECT' çalışır. Satırlar Python'a okunmaz; ders veya
+#       soru sayısı ne olursa olsun veritabanına giden istek sayısı aynıdır.
+#     - Eski ve yeni dersler, kurs içinde benzersiz olan 'order' anahtarı
+#       üzerinden eşleştirilir; quiz, soru ve seçenekler bu eşleşme
+#       (ve 'position' değerleri) üzerinden kopyalanır.
+#
+# 2.  TÜRETİLMİŞ ALANLAR:
+#     - Kapak görseli dosyası kopyalanmaz, aynı dosya adı paylaşılır.
+#     - Ders ön işleme alanları ('content_html' vb.), ders/soru sayaçları
+#       ve arama indeksi kaynaktan kopyalanır. Kayıt ve tamamlama
+#       sayaçları sıfırdan başlar.
+#     - Toplu INSERT ORM olaylarını tetiklemez; huni sayaçları da burada
+#       oluşturulur.
+# ===================================================================
+
+LESSON_COPY_FIELDS = ('title', 'lesson_type', 'content', 'video_url', 'recommended_videos', 'content_html',
+                      'video_embed_id', 'recommended_video_ids', 'render_version', 'order')
+
+
+def copy_title(title):
+    """Kopya kurs için benzersiz bir başlık üretir: 'Başlık (Kopya)', 'Başlık (Kopya 2)'..."""
+    from models import Course
+    max_length = Course.__table__.c.title.type.length
+    number = 1
+    while True:
+        suffix = ' (Kopya)' if number == 1 else f' (Kopya {number})'
+        candidate = title[:max_length - len(suffix)] + suffix
+        if not db.session.query(Course.query.filter(Course.title == candidate).exists()).scalar():
+            return candidate
+        number += 1
+
+
+def _lesson_pairs(target_id):
+    """Kaynak ve kopya dersleri 'order' üzerinden eşleştiren (eski, yeni) takma adları döndürür."""
+    from models import Lesson
+    old_lesson = Lesson.__table__.alias('old_lesson')
+    new_lesson = Lesson.__table__.alias('new_lesson')
+    join = old_lesson.join(new_lesson, and_(new_lesson.c.course_id == target_id,
+                                            new_lesson.c.order == old_lesson.c.order))
+    return old_lesson, new_lesson, join
+
+
+def clone_course(course, title=None):
+    """
+    Kursu tüm dersleri ve quizleriyle kopyalar; yeni kursun id'sini döndürür.
+    İşlemin (transaction) commit edilmesi çağırana aittir.
+    """
+    from models import Course, Lesson, LessonFunnelStat, Quiz, QuizQuestion, QuizOption
+    connection = db.session.connection()
+    now = datetime.utcnow()
+    title = title or copy_title(course.title)
+
+    # 1. Kurs (kapak görseli paylaşılır, kayıt sayacı sıfırdan başlar)
+    course_table = Course.__table__
+    connection.execute(course_table.insert().from_select(
+        ['title', 'description', 'category', 'difficulty', 'duration_hours', 'cover_image',
+         'instructor_name', 'lesson_count', 'enrollment_count', 'created_at', 'updated_at'],
+        select(literal(title), course_table.c.description, course_table.c.category, course_table.c.difficulty,
+               course_table.c.duration_hours, course_table.c.cover_image, course_table.c.instructor_name,
+               course_table.c.lesson_count, literal(0), literal(now), literal(now))
+        .where(course_table.c.id == course.id)))
+    new_course_id = connection.execute(select(course_table.c.id).where(course_table.c.title == title)).scalar()
+
+    # 2. Dersler (ön işlenmiş alanlarıyla birlikte)
+    lesson_table = Lesson.__table__
+    connection.execute(lesson_table.insert().from_select(
+        list(LESSON_COPY_FIELDS) + ['course_id', 'created_at', 'updated_at'],
+        select(*(lesson_table.c[field] for field in LESSON_COPY_FIELDS),
+               literal(new_course_id), literal(now), literal(now))
+        .where(lesson_table.c.course_id == course.id)))
+
+    # 3. Huni sayaçları (her yeni ders için sıfır)
+    connection.execute(LessonFunnelStat.__table__.insert().from_select(
+        ['lesson_id', 'course_id', 'completion_count'],
+        select(lesson_table.c.id, lesson_table.c.course_id, literal(0))
+        .where(lesson_table.c.course_id == new_course_id)))
+
+    # 4. Quizler
+    old_lesson, new_lesson, lesson_join = _lesson_pairs(new_course_id)
+    quiz_table = Quiz.__table__
+    connection.execute(quiz_table.insert().from_select(
+        ['title', 'lesson_id', 'question_count', 'created_at', 'updated_at'],
+        select(quiz_table.c.title, new_lesson.c.id, quiz_table.c.question_count, literal(now), literal(now))
+        .select_from(lesson_join.join(quiz_table, quiz_table.c.lesson_id == old_lesson.c.id))
+        .where(old_lesson.c.course_id == course.id)))
+
+    # 5. Sorular ve 6. seçenekler ((yeni quiz, position) üzerinden eşleştirilir)
+    old_quiz = quiz_table.alias('old_quiz')
+    new_quiz = quiz_table.alias('new_quiz')
+    quiz_join = lesson_join\
+        .join(old_quiz, old_quiz.c.lesson_id == old_lesson.c.id)\
+        .join(new_quiz, new_quiz.c.lesson_id == new_lesson.c.id)
+    question_table = QuizQuestion.__table__
+    old_question = question_table.alias('old_question')
+    connection.execute(question_table.insert().from_select(
+        ['quiz_id', 'position', 'text', 'correct_index', 'updated_at'],
+        select(new_quiz.c.id, old_question.c.position, old_question.c.text, old_question.c.correct_index, literal(now))
+        .select_from(quiz_join.join(old_question, old_question.c.quiz_id == old_quiz.c.id))
+        .where(old_lesson.c.course_id == course.id)))
+
+    new_question = question_table.alias('new_question')
+    option_table = QuizOption.__table__
+    connection.execute(option_table.insert().from_select(
+        ['question_id', 'position', 'text'],
+        select(new_question.c.id, option_table.c.position, option_table.c.text)
+        .select_from(quiz_join
+                     .join(old_question, old_question.c.quiz_id == old_quiz.c.id)
+                     .join(new_question, and_(new_question.c.quiz_id == new_quiz.c.id,
+                                              new_question.c.position == old_question.c.position))
+                     .join(option_table, option_table.c.question_id == old_question.c.id))
+        .where(old_lesson.c.course_id == course.id)))
+
+    # 7. Arama indeksi (ders belgeleri kaynağın indeks satırlarından kopyalanır)
+    backend = search_index.get_backend(connection)
+    if backend is not None:
+        backend.upsert(connection, 'course', new_course_id, new_course_id, title,
+                       search_index.html_to_text(course.description))
+        backend.copy_lessons(connection, course.id, new_course_id)
+
+    # Toplu INSERT oturum olaylarına görünmez; yönetici paneli önbelleği commit sonrası yenilensin
+    dashboard_stats.mark_changed()
+    return new_course_id
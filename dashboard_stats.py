@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import namedtuple
+from itertools import chain
+from sqlalchemy import event, func, case, select, desc, true
+from sqlalchemy.orm import joinedload
+from extensions import db
+from sales_rollup import local_today
+
+# ===================================================================
+# KUWAMEDYA - YÖNETİCİ PANELİ İSTATİSTİKLERİ (dashboard_stats.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, '/admin_dashboard' SAYFASININ ÖZET KARTLARINI VE "EN YENİ
+# PERSONEL" LİSTESİNİ HAZIRLAR.
+#
+# 1.  TEK SORGU:
+#     - Rol sayıları (gruplanmış CASE sayımları), bu ayın ciro ve prim
+#       toplamları ('sales_daily_rollup' günlük özet tablosundan, ayın gün
+#       sayısı kadar satır) ve kurs sayısı CTE'ler ile TEK bir SELECT
+#       içinde hesaplanır. Ay, İstanbul saatine göre belirlenir.
+#
+# 2.  ANLIK GÖRÜNTÜ (SNAPSHOT) ÖNBELLEĞİ:
+#     - Sonuç, ORM nesnesi değil düz veri (namedtuple) olarak süreç içinde
+#       saklanır. 'Sale', 'User', 'Course' veya 'Commission' içeren bir
+#       işlem commit edildiğinde önbellek temizlenir (oturum olayları).
+#     - ORM dışı toplu yazan kodlar ('course_clone', 'course_bundle')
+#       'mark_changed' ile aynı işlemi işaretler.
+#     - Diğer süreçlerdeki (worker) değişiklikler için önbellek en fazla
+#       'SNAPSHOT_TTL' saniye yaşar; ay değiştiğinde de yeniden hesaplanır.
+#
+# 3.  SON AKTİVİTELER:
+#     - Her işlemde yazıldığı için önbelleğe alınmaz; 'timestamp' indeksi
+#       üzerinden son 5 kayıt, kullanıcılarıyla birlikte (joinedload)
+#       TEK sorguda okunur (N+1 yok).
+# ===================================================================
+
+SNAPSHOT_TTL = 60  # saniye
+LATEST_STAFF_LIMIT = 5
+RECENT_ACTIVITY_LIMIT = 5
+
+DashboardSnapshot = namedtuple('DashboardSnapshot', ['month', 'stats', 'latest_users', 'created'])
+StaffRow = namedtuple('StaffRow', ['id', 'username', 'name', 'email', 'title', 'date_created', 'avatar_url'])
+
+_snapshot_lock = threading.Lock()
+_snapshot = None
+
+
+def _aggregate_stats(start_of_month):
+    """Panel kartlarının tüm sayılarını tek sorguda hesaplar."""
+    from models import User, Course, SalesDailyRollup
+    user_counts = select(
+        func.count(case((User.role == 'Personel', 1))).label('personnel'),
+        func.count(case((User.role == 'Admin', 1))).label('admins'),
+        func.count(case((User.role == 'normal', 1))).label('members'),
+    ).cte('user_counts')
+    monthly_sales = select(
+        func.coalesce(func.sum(SalesDailyRollup.amount), 0.0).label('revenue'),
+        func.coalesce(func.sum(SalesDailyRollup.commission), 0.0).label('commission'),
+    ).where(SalesDailyRollup.day >= start_of_month).cte('monthly_sales')
+    course_counts = select(func.count(Course.id).label('courses')).cte('course_counts')
+
+    row = db.session.execute(select(
+        user_counts.c.personnel, user_counts.c.admins, user_counts.c.members,
+        monthly_sales.c.revenue, monthly_sales.c.commission, course_counts.c.courses,
+    ).select_from(
+        # Her CTE tek satırdır; birleştirme koşulu gerekmez
+        user_counts.join(monthly_sales, true()).join(course_counts, true())
+    )).one()
+    return {
+        'total_staff': row.personnel + row.admins,  # Personel + Admin
+        'total_users': row.members,  # Sadece standart üyeler
+        'monthly_revenue': row.revenue,
+        'monthly_commission': row.commission,
+        'active_courses': row.courses,
+    }
+
+
+def _latest_staff():
+    from models import User
+    users = User.query.filter(User.role.in_(['Admin', 'Personel']))\
+        .order_by(desc(User.date_created)).limit(LATEST_STAFF_LIMIT).all()
+    return tuple(StaffRow(user.id, user.username, user.name, user.email, user.title, user.date_created, user.avatar(40))
+                 for user in users)
+
+
+def get_dashboard_snapshot():
+    """Panel istatistiklerini önbellekten döndürür; yoksa veya eskidiyse yeniden hesaplar."""
+    global _snapshot
+    month = local_today().replace(day=1)
+    with _snapshot_lock:
+        snapshot = _snapshot
+    if snapshot is not None and snapshot.month == month and time.monotonic() - snapshot.created < SNAPSHOT_TTL:
+        return snapshot
+
+    snapshot = DashboardSnapshot(month, _aggregate_stats(month), _latest_staff(), time.monotonic())
+    with _snapshot_lock:
+        _snapshot = snapshot
+    return snapshot
+
+
+def invalidate_dashboard():
+    """Panel önbelleğini temizler."""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
+
+
+def recent_activities(limit=RECENT_ACTIVITY_LIMIT):
+    """Son aktiviteleri kullanıcılarıyla birlikte tek sorguda döndürür."""
+    from models import ActivityLog
+    return ActivityLog.query.options(joinedload(ActivityLog.user))\
+        .order_by(desc(ActivityLog.timestamp)).limit(limit).all()
+
+
+# ===================================================================
+# OTURUM OLAYLARI (ÖNBELLEK GEÇERSİZLEŞTİRME)
+# ===================================================================
+_SESSION_FLAG = 'dashboard_changed'
+
+
+def mark_changed(session=None):
+    """ORM dışı (Core) yazılan işlemi işaretler; commit sonrası önbellek temizlenir."""
+    (session or db.session).info[_SESSION_FLAG] = True
+
+
+def _watched_models():
+    from models import User, Sale, Commission, Course
+    return (User, Sale, Commission, Course)
+
+
+def _on_after_flush(session, flush_context):
+    watched = _watched_models()
+    if any(isinstance(obj, watched) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info[_SESSION_FLAG] = True
+
+
+def _on_after_commit(session):
+    if session.info.pop(_SESSION_FLAG, False):
+        invalidate_dashboard()
+
+
+def _on_after_rollback(session):
+    session.info.pop(_SESSION_FLAG, None)
+
+
+def register_events():
+    """Oturum olaylarını panel önbelleğine bağlar (birden çok çağrı güvenlidir)."""
+    from sqlalchemy.orm import Session
+    listeners = (
+        ('after_flush', _on_after_flush),
+        ('after_commit', _on_after_commit),
+        ('after_rollback', _on_after_rollback),
+    )
+    for name, listener in listeners:
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
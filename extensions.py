@@ -2,6 +2,9 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
 from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import sqlite3
 
 # ==========================================================================
 # Geliştirilmiş Eklenti Başlatma (extensions.py) - v2.1 (OAuth Kaldırıldı)
@@ -24,4 +27,15 @@ login_manager = LoginManager()
 
 # --- VERİTABANI GÖÇ YÖNETİMİ EKLENTİSİ ---
 # Migrate: SQLAlchemy modellerindeki değişiklikleri veritabanına uygulamak için (Alembic kullanır).
-migrate = Migrate()
\ No newline at end of file
+migrate = Migrate()
+
+# --- SQLITE YABANCI ANAHTAR DESTEĞİ (v7.1) ---
+# SQLite, 'ON DELETE CASCADE / SET NULL' kurallarını varsayılan olarak uygulamaz.
+# Modellerdeki 'passive_deletes=True' ilişkileri bu kurallara güvendiği için
+# her yeni SQLite bağlantısında yabancı anahtar denetimi açılır.
+@event.listens_for(Engine, 'connect')
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
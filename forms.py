@@ -1,7 +1,7 @@
 from flask_wtf import FlaskForm
-from flask_wtf.file import FileField, FileAllowed
+from flask_wtf.file import FileField, FileAllowed, FileRequired
 from wtforms import (StringField, PasswordField, SubmitField, BooleanField, TextAreaField,
-                   SelectField, FloatField, IntegerField, DateField, SelectMultipleField, widgets)
+                   SelectField, FloatField, IntegerField, DateField, SelectMultipleField, HiddenField, widgets)
 from wtforms.validators import (DataRequired, Length, Email, EqualTo, ValidationError, URL, Optional, Regexp, NumberRange)
 import re
 import json # QuizForm'da JSON validasyonu için
@@ -233,15 +233,31 @@ class CourseForm(FlaskForm):
     submit = SubmitField('Kursu Kaydet')
 
 
+class CourseImportForm(FlaskForm):
+    """'flask academy export' veya kurs dışa aktarma ile üretilen ZIP paketini yükler (v7.1)."""
+    bundle = FileField('Kurs Paketi (.zip)', validators=[FileRequired(message='Bir paket dosyası seçin.'), FileAllowed(['zip'], 'Sadece .zip paketleri!')])
+    skip_existing = BooleanField('Aynı başlıklı kursları atla')
+    submit = SubmitField('İçe Aktar')
+
+
 class LessonForm(FlaskForm):
     title = StringField('Ders Başlığı', validators=[DataRequired(), Length(max=150)])
     lesson_type = SelectField('Ders Tipi', choices=[('Video', 'Video'), ('Metin', 'Metin'), ('Quiz', 'Quiz')], validators=[DataRequired()])
     content = TextAreaField('Ders İçeriği (Metin/Açıklama)', validators=[Optional()])
     video_url = StringField('Video URL (Sadece ID veya Tam URL)', validators=[Optional()])
-    order = IntegerField('Ders Sırası (Örn: 1, 2, 3...)', validators=[DataRequired(), NumberRange(min=1, message='Sıra numarası 1 veya daha büyük olmalı.')])
+    # Kurstaki konum (1, 2, 3...). Veritabanına seyrek sıralama anahtarı olarak yazılır (bkz. 'lesson_ordering.py')
+    order = IntegerField('Ders Sırası (Boş bırakılırsa sona eklenir)', validators=[Optional(), NumberRange(min=1, message='Sıra numarası 1 veya daha büyük olmalı.')])
     submit = SubmitField('Dersi Kaydet')
 
 
+class LessonReorderForm(FlaskForm):
+    """Sürükle-bırak ile belirlenen yeni ders sırasını (virgülle ayrılmış ders id'leri) taşır (v7.1)."""
+    lesson_ids = HiddenField('Ders Sırası', validators=[DataRequired(), Regexp(r'^\d+(,\d+)*$', message='Geçersiz ders sırası.')])
+
+    def lesson_id_list(self):
+        return [int(lesson_id) for lesson_id in self.lesson_ids.data.split(',')]
+
+
 class QuizForm(FlaskForm):
     title = StringField('Quiz Başlığı', validators=[DataRequired(), Length(max=150)])
     questions_json = TextAreaField('Sorular (JSON Formatında)', validators=[DataRequired()])
@@ -271,3 +287,29 @@ class QuizForm(FlaskForm):
             raise e
         except Exception as e:
              raise ValidationError(f'JSON verisi işlenirken beklenmedik bir hata oluştu: {e}')
+
+
+class QuizEditForm(FlaskForm):
+    """Quiz başlığını düzenler. Sorular tek tek 'QuizQuestionForm' ile düzenlenir."""
+    title = StringField('Quiz Başlığı', validators=[DataRequired(), Length(max=150)])
+    submit = SubmitField('Quiz Kaydet')
+
+
+class QuizQuestionForm(FlaskForm):
+    """Tek bir quiz sorusunu ekler veya düzenler (v7.1)."""
+    question = TextAreaField('Soru Metni', validators=[DataRequired()])
+    options = TextAreaField('Seçenekler (her satıra bir seçenek)', validators=[DataRequired()])
+    correct_option = IntegerField('Doğru Seçenek No (1, 2, 3...)', validators=[DataRequired(), NumberRange(min=1)])
+    submit = SubmitField('Soruyu Kaydet')
+
+    def option_list(self):
+        """Boş satırları atarak seçenek listesini döndürür."""
+        return [line.strip() for line in (self.options.data or '').splitlines() if line.strip()]
+
+    def validate_options(self, options):
+        if len(self.option_list()) < 2:
+            raise ValidationError('En az 2 seçenek girilmelidir.')
+
+    def validate_correct_option(self, correct_option):
+        if correct_option.data and correct_option.data > len(self.option_list()):
+            raise ValidationError('Doğru seçenek numarası, seçenek sayısından büyük olamaz.')
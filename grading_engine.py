@@ -0,0 +1,240 @@
+from collections import namedtuple
+import numpy as np
+
+# ===================================================================
+# KUWAMEDYA - SINAV DEĞERLENDİRME MOTORU (grading_engine.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, QUIZ CEVAPLARININ DEĞERLENDİRİLMESİNİ ROTALARDAN BAĞIMSIZ,
+# TEK BİR MERKEZDE TOPLAR.
+#
+# 1.  CEVAP ANAHTARI ('AnswerKey'):
+#     - 'QuizQuestion' tablosundan okunan soru listesinden, her sorunun ORİJİNAL doğru
+#       seçenek indeksini tutan bir NumPy dizisi çıkarılır.
+#     - Seçenekler istemcide karıştırıldığı için frontend indeks değil
+#       seçenek METNİ gönderir; anahtar, metni orijinal indekse
+#       çeviren sözlükleri de tutar.
+#
+# 2.  VEKTÖREL DEĞERLENDİRME:
+#     - Bir gönderim = soru başına seçilen orijinal indeks dizisi
+#       (cevapsız/tanınmayan seçenek = -1).
+#     - Tek gönderim ('grade_submission') veya gönderim matrisi
+#       ('grade_batch') tek bir dizi karşılaştırmasıyla değerlendirilir ve
+#       soru başına doğru/yanlış vektörleri döndürülür.
+#
+# 3.  SAKLAMA:
+#     - Seçimler 'QuizAttempt.answers' alanında paketlenmiş (int16)
+#       bayt dizisi olarak saklanır. Cevap anahtarı düzeltildiğinde
+#       geçmiş denemeler 'flask quizzes regrade' ile yeniden puanlanır.
+#     - Dizi, sorunun quiz içindeki sırasına (ordinal) göre dizinlenir.
+#       Bir soru silinirken o sütun tüm denemelerden çıkarılır
+#       ('drop_answer', bkz. 'quiz_store.delete_question').
+#
+# 4.  MADDE ANALİZİ ('item_analysis'):
+#     - Bir quizin tüm denemeleri üzerinden soru başına güçlük indeksi,
+#       ayırt edicilik (üst/alt %27 grup farkı ve madde-kalan
+#       korelasyonu) ve seçenek (çeldirici) frekansları tek geçişte,
+#       döngüsüz hesaplanır. Rapor ve önbellek 'quiz_analysis.py' içindedir.
+# ===================================================================
+
+UNANSWERED = -1
+# Geçersiz soruların (seçeneği olmayan, hatalı 'correct_index') anahtar değeri;
+# hiçbir seçim bu değere eşit olamayacağı için soru her zaman yanlış sayılır.
+INVALID_KEY = -2
+ANSWER_DTYPE = np.dtype('<i2')
+
+
+class AnswerKey:
+    """Bir quizin doğru cevap indeksleri ve seçenek metni -> indeks eşlemeleri."""
+    __slots__ = ('correct', 'option_index')
+
+    def __init__(self, correct, option_index):
+        self.correct = correct
+        self.option_index = option_index
+
+    def __len__(self):
+        return len(self.correct)
+
+
+def extract_answer_key(questions):
+    """Quiz soru listesi ('quiz_store.load_question_dicts') içinden cevap anahtarını çıkarır."""
+    correct = np.full(len(questions), INVALID_KEY, dtype=ANSWER_DTYPE)
+    option_index = []
+    for i, question in enumerate(questions):
+        options = question.get('options') if isinstance(question, dict) else None
+        if not isinstance(options, list) or not options:
+            option_index.append({})
+            continue
+
+        lookup = {}
+        for index, text in enumerate(options):
+            lookup.setdefault(str(text).strip(), index)
+        try:
+            correct_index = int(question.get('correct_index', 0))
+        except (TypeError, ValueError):
+            correct_index = INVALID_KEY
+        # Aralık dışı indeks geçersiz anahtar kalır (hiçbir seçenek doğru sayılmaz)
+        if 0 <= correct_index < len(options):
+            # Aynı metinli iki seçenek varsa, metin doğru seçeneğe eşlenir
+            lookup[str(options[correct_index]).strip()] = correct_index
+            correct[i] = correct_index
+        option_index.append(lookup)
+    return AnswerKey(correct, tuple(option_index))
+
+
+def encode_submission(answer_key, selected_texts):
+    """
+    Seçilen seçenek metinlerini (soru sırasıyla; cevapsızsa None veya '')
+    orijinal seçenek indekslerine çevirir.
+    """
+    selections = np.full(len(answer_key), UNANSWERED, dtype=ANSWER_DTYPE)
+    for i, (lookup, text) in enumerate(zip(answer_key.option_index, selected_texts)):
+        if text:
+            selections[i] = lookup.get(text.strip(), UNANSWERED)
+    return selections
+
+
+def encode_form(answer_key, form):
+    """'submit_quiz' formundaki 'question-{i}' / 'question-{i}-text' alanlarını kodlar."""
+    return encode_submission(answer_key, [
+        form.get(f'question-{i}-text', '') if form.get(f'question-{i}') is not None else None
+        for i in range(len(answer_key))
+    ])
+
+
+def grade_submission(answer_key, selections):
+    """Tek bir gönderimi değerlendirir; soru başına doğru/yanlış (bool) vektörü döndürür."""
+    return np.asarray(selections, dtype=ANSWER_DTYPE) == answer_key.correct
+
+
+def grade_batch(answer_key, selection_matrix):
+    """
+    Gönderim matrisini (satır = deneme, sütun = soru) tek karşılaştırmada
+    değerlendirir. (doğruluk matrisi, satır başına skor) döndürür.
+    """
+    matrix = np.asarray(selection_matrix, dtype=ANSWER_DTYPE).reshape(-1, len(answer_key))
+    correctness = matrix == answer_key.correct
+    return correctness, correctness.sum(axis=1)
+
+
+def pack_answers(selections):
+    """Seçim dizisini 'QuizAttempt.answers' için bayt dizisine paketler."""
+    return np.asarray(selections, dtype=ANSWER_DTYPE).tobytes()
+
+
+def unpack_answers(packed, question_count):
+    """
+    Paketlenmiş seçimleri çözer. Quizin soru sayısı sonradan değiştiyse
+    dizi eksik sorular cevapsız sayılarak doldurulur veya kırpılır.
+    """
+    selections = np.frombuffer(packed or b'', dtype=ANSWER_DTYPE)
+    if len(selections) >= question_count:
+        return selections[:question_count]
+    padded = np.full(question_count, UNANSWERED, dtype=ANSWER_DTYPE)
+    padded[:len(selections)] = selections
+    return padded
+
+
+def drop_answer(packed, ordinal):
+    """
+    Paketlenmiş seçimlerden 'ordinal' sıradaki sorunun cevabını çıkarır;
+    sonraki soruların cevapları bir sıra öne kayar. Dizi o soruya kadar
+    uzanmıyorsa (soru denemeden sonra eklenmişse) değişmeden döner.
+    """
+    selections = np.frombuffer(packed or b'', dtype=ANSWER_DTYPE)
+    if ordinal >= len(selections):
+        return packed
+    return np.delete(selections, ordinal).tobytes()
+
+
+def answer_matrix(packed_answers, question_count):
+    """
+    Paketlenmiş cevap listesinden (satır = deneme, sütun = soru) matrisi
+    oluşturur. Tüm denemeler güncel soru sayısıyla yazılmışsa tek bir
+    'frombuffer' çağrısı yeterlidir; aksi halde satırlar tek tek hizalanır.
+    """
+    if not packed_answers or not question_count:
+        return np.empty((len(packed_answers), question_count), dtype=ANSWER_DTYPE)
+    width = question_count * ANSWER_DTYPE.itemsize
+    if all(len(packed) == width for packed in packed_answers):
+        return np.frombuffer(b''.join(packed_answers), dtype=ANSWER_DTYPE).reshape(-1, question_count)
+    return np.stack([unpack_answers(packed, question_count) for packed in packed_answers])
+
+
+ItemStatistics = namedtuple('ItemStatistics', [
+    'attempts', 'difficulty', 'discrimination', 'point_biserial',
+    'option_frequency', 'upper_frequency', 'lower_frequency', 'mean_score', 'score_std'])
+
+# Klasik test kuramındaki üst/alt grup oranı
+GROUP_FRACTION = 0.27
+
+
+def _option_frequency(codes, question_count, width):
+    """Her soru için seçenek kodlarının (0 = cevapsız/geçersiz) frekans tablosu."""
+    offsets = np.arange(question_count, dtype=np.int64) * width
+    flat = (codes.astype(np.int64) + offsets).ravel()
+    return np.bincount(flat, minlength=question_count * width).reshape(question_count, width)
+
+
+def item_analysis(answer_key, matrix, option_counts, group_fraction=GROUP_FRACTION):
+    """
+    Soru başına madde istatistiklerini hesaplar.
+
+    - difficulty: Doğru cevaplayanların oranı (güçlük indeksi, p).
+    - discrimination: Üst ve alt gruptaki doğru oranlarının farkı (D).
+    - point_biserial: Soru ile sorunun çıkarıldığı toplam puan arasındaki
+      korelasyon. Hesaplanamıyorsa (varyans yok) NaN.
+    - option_frequency / upper_frequency / lower_frequency: (soru × seçenek+1)
+      sayım tabloları; 0. sütun cevapsız veya artık var olmayan seçenekler.
+    """
+    question_count = len(answer_key)
+    matrix = np.asarray(matrix, dtype=ANSWER_DTYPE).reshape(-1, question_count)
+    attempts = matrix.shape[0]
+    option_counts = np.asarray(option_counts, dtype=np.int64)
+    width = int(option_counts.max(initial=0)) + 1
+
+    correctness, scores = grade_batch(answer_key, matrix)
+    correct = correctness.astype(np.float64)
+    scores = scores.astype(np.float64)
+
+    # Seçenek kodları: cevapsız = 0, seçenek i = i + 1; güncel seçenek
+    # sayısının dışında kalan eski seçimler cevapsız sayılır.
+    codes = matrix.astype(np.int64) + 1
+    codes[(codes < 0) | (codes > option_counts)] = 0
+
+    if attempts == 0:
+        empty = np.zeros(question_count)
+        frequency = np.zeros((question_count, width), dtype=np.int64)
+        return ItemStatistics(0, empty, empty, np.full(question_count, np.nan),
+                              frequency, frequency, frequency, 0.0, 0.0)
+
+    difficulty = correct.mean(axis=0)
+
+    group_size = max(1, int(round(attempts * group_fraction)))
+    order = np.argsort(scores, kind='stable')
+    lower, upper = order[:group_size], order[-group_size:]
+    discrimination = correct[upper].mean(axis=0) - correct[lower].mean(axis=0)
+
+    # Madde-kalan korelasyonu, (deneme × soru) boyutunda ara matris
+    # oluşturmadan kovaryans özdeşlikleriyle hesaplanır:
+    # cov(x, S - x) = cov(x, S) - var(x), var(S - x) = var(S) - 2cov(x, S) + var(x)
+    mean_score = scores.mean()
+    score_var = scores.var()
+    item_var = difficulty * (1.0 - difficulty)
+    cov_item_score = correct.T @ scores / attempts - difficulty * mean_score
+    cov_item_rest = cov_item_score - item_var
+    rest_var = score_var - 2.0 * cov_item_score + item_var
+    denominator = np.sqrt(item_var * rest_var)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        point_biserial = np.where(denominator > 1e-12, cov_item_rest / denominator, np.nan)
+
+    return ItemStatistics(
+        attempts=attempts,
+        difficulty=difficulty,
+        discrimination=discrimination,
+        point_biserial=point_biserial,
+        option_frequency=_option_frequency(codes, question_count, width),
+        upper_frequency=_option_frequency(codes[upper], question_count, width),
+        lower_frequency=_option_frequency(codes[lower], question_count, width),
+        mean_score=float(mean_score),
+        score_std=float(np.sqrt(score_var)))
@@ -0,0 +1,176 @@
+from bisect import bisect_left
+from datetime import datetime
+from sqlalchemy import bindparam
+from extensions import db
+
+# ===================================================================
+# KUWAMEDYA - DERS SIRALAMA ANAHTARLARI (lesson_ordering.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, 'Lesson.order' DEĞERLERİNİ SEYREK (ARALIKLI) SIRALAMA
+# ANAHTARLARI OLARAK YÖNETİR.
+#
+# 1.  SEYREK ANAHTARLAR:
+#     - Dersler 1, 2, 3 yerine 'ORDER_GAP' aralıklarla (1024, 2048, ...)
+#       numaralandırılır. İki dersin arasına ders eklemek veya bir dersi
+#       taşımak, aradaki boşluğun ortasındaki anahtarı kullanır; diğer
+#       derslere dokunulmaz (tek satır güncellenir).
+#     - Boşluk tükendiğinde kursun tüm dersleri bir kez yeniden aralıklı
+#       numaralandırılır.
+#     - Kullanıcıya gösterilen "Ders 3" gibi numaralar anahtar değil,
+#       sıradaki konumdur (şablonlarda 'loop.index').
+#
+# 2.  TOPLU SIRALAMA ('reorder_lessons'):
+#     - Sürükle-bırak ile gelen yeni sıra TEK işlemde uygulanır. Mevcut
+#       anahtarların en uzun artan alt dizisi korunur; yalnızca yeri
+#       değişen dersler yeni anahtar alır.
+#     - 'uq_lesson_order_in_course' kısıtına takılmamak için değişen
+#       satırlar önce geçici negatif değerlere, sonra yeni değerlerine
+#       yazılır (iki aşamalı güncelleme).
+#     - Kursun 'updated_at' değeri güncellenir; böylece diğer süreçlerdeki
+#       kurs ana hatları önbelleği ('academy_cache.py') de yenilenir.
+# ===================================================================
+
+ORDER_GAP = 1024
+
+
+def _course_keys(course_id, exclude_id=None):
+    """Kursun derslerini sıralı (id, order) listesi olarak döndürür."""
+    from models import Lesson
+    query = db.session.query(Lesson.id, Lesson.order).filter(Lesson.course_id == course_id)
+    if exclude_id is not None:
+        query = query.filter(Lesson.id != exclude_id)
+    return query.order_by(Lesson.order.asc()).all()
+
+
+def _spaced_keys(count):
+    return [ORDER_GAP * (index + 1) for index in range(count)]
+
+
+def _apply_keys(course_id, changes):
+    """
+    {lesson_id: yeni_anahtar} değişikliklerini iki aşamada uygular ve kursun
+    'updated_at' değerini yeniler. Değişen satır sayısını döndürür.
+    """
+    from models import Course, Lesson
+    if not changes:
+        return 0
+    lesson_table = Lesson.__table__
+    statement = lesson_table.update()\
+        .where(lesson_table.c.id == bindparam('lesson_id'))\
+        .values(order=bindparam('new_order'))
+    # 1. aşama: Benzersiz ve çakışmayan geçici negatif değerler
+    db.session.execute(statement, [{'lesson_id': lesson_id, 'new_order': -lesson_id} for lesson_id in changes])
+    # 2. aşama: Yeni anahtarlar
+    db.session.execute(statement, [{'lesson_id': lesson_id, 'new_order': key} for lesson_id, key in changes.items()])
+
+    course_table = Course.__table__
+    db.session.execute(course_table.update()
+                       .where(course_table.c.id == course_id)
+                       .values(updated_at=datetime.utcnow()))
+    return len(changes)
+
+
+def _longest_increasing(keys):
+    """Artan en uzun alt dizinin konumlarını (küme) döndürür (O(n log n))."""
+    tails, tail_positions = [], []
+    previous = [None] * len(keys)
+    for position, key in enumerate(keys):
+        index = bisect_left(tails, key)
+        if index == len(tails):
+            tails.append(key)
+            tail_positions.append(position)
+        else:
+            tails[index] = key
+            tail_positions[index] = position
+        previous[position] = tail_positions[index - 1] if index else None
+
+    kept = set()
+    position = tail_positions[-1] if tail_positions else None
+    while position is not None:
+        kept.add(position)
+        position = previous[position]
+    return kept
+
+
+def plan_order_keys(keys):
+    """
+    Yeni sıraya dizilmiş mevcut anahtarlar için, mümkün olduğunca az değişiklik
+    yapan yeni anahtar listesini döndürür. Boşluk yetmezse tüm liste yeniden
+    aralıklı numaralandırılır.
+    """
+    kept = _longest_increasing(keys)
+    planned = list(keys)
+    position = 0
+    while position < len(keys):
+        if position in kept:
+            position += 1
+            continue
+        run_start = position
+        while position < len(keys) and position not in kept:
+            position += 1
+        low = planned[run_start - 1] if run_start else 0
+        high = keys[position] if position < len(keys) else None
+        run_length = position - run_start
+        if high is None:
+            step = ORDER_GAP
+        elif high - low - 1 >= run_length:
+            step = (high - low) // (run_length + 1)
+        else:
+            return _spaced_keys(len(keys))
+        for offset in range(run_length):
+            planned[run_start + offset] = low + step * (offset + 1)
+    return planned
+
+
+def reorder_lessons(course, lesson_ids):
+    """
+    Kursun derslerini verilen id sırasına göre yeniden sıralar.
+    Liste kursun derslerinin tamamını içermiyorsa ValueError fırlatır.
+    Anahtarı değişen ders sayısını döndürür (commit çağırana aittir).
+    """
+    rows = _course_keys(course.id)
+    current = {row.id: row.order for row in rows}
+    if len(lesson_ids) != len(set(lesson_ids)) or set(lesson_ids) != set(current):
+        raise ValueError("Sıralama listesi kursun tüm derslerini tam olarak bir kez içermelidir.")
+
+    planned = plan_order_keys([current[lesson_id] for lesson_id in lesson_ids])
+    changes = {lesson_id: key for lesson_id, key in zip(lesson_ids, planned) if current[lesson_id] != key}
+    return _apply_keys(course.id, changes)
+
+
+def order_key_for_position(course_id, position, exclude_id=None):
+    """
+    Dersin kurstaki 1 tabanlı 'position' konumuna yerleşmesi için bir anahtar
+    döndürür ('position' boşsa sona eklenir). Komşular arasında boşluk yoksa
+    diğer dersler önce yeniden aralıklı numaralandırılır. Oturumdaki kaydedilmemiş
+    bir 'order' değeri otomatik flush ile yazılmasın diye form verisi nesneye
+    aktarılmadan ÖNCE çağrılmalıdır.
+    """
+    rows = _course_keys(course_id, exclude_id=exclude_id)
+    if not position or position > len(rows):
+        return (rows[-1].order if rows else 0) + ORDER_GAP
+
+    index = max(position, 1) - 1
+    low = rows[index - 1].order if index else 0
+    high = rows[index].order
+    if high - low > 1:
+        return (low + high) // 2
+
+    # Boşluk yok: Yeni dersin yerini atlayarak kursu yeniden numaralandır
+    key = ORDER_GAP * (index + 1)
+    spaced = _spaced_keys(len(rows) + 1)
+    del spaced[index]
+    changes = {row.id: new_key for row, new_key in zip(rows, spaced) if row.order != new_key}
+    if exclude_id is not None:
+        # Taşınan dersin eski anahtarı yeni numaralarla çakışmasın diye o da aynı işlemde yazılır
+        changes[exclude_id] = key
+    _apply_keys(course_id, changes)
+    return key
+
+
+def lesson_position(lesson):
+    """Dersin kurstaki 1 tabanlı konumu (ekranda gösterilen ders numarası)."""
+    from models import Lesson
+    return db.session.query(db.func.count(Lesson.id))\
+        .filter(Lesson.course_id == lesson.course_id, Lesson.order <= lesson.order).scalar()
@@ -0,0 +1,186 @@
+import json
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlparse, parse_qs
+
+# ===================================================================
+# KUWAMEDYA - DERS İÇERİĞİ İŞLEME HATTI (lesson_renderer.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, DERS İÇERİĞİNİ KAYIT ANINDA BİR KEZ İŞLER; 'lesson_view'
+# HER İSTEKTE AYRIŞTIRMA (PARSE) YAPMAZ, HAZIR PARÇALARI BASAR.
+#
+# 1.  İÇERİK ('Lesson.content' -> 'Lesson.content_html'):
+#     - Yönetici tarafından girilen HTML, izin verilen etiket/öznitelik
+#       listesine göre temizlenir (sanitize). '<script>', '<style>',
+#       'on*' olay öznitelikleri ve 'javascript:' bağlantıları atılır.
+#
+# 2.  VİDEOLAR:
+#     - 'video_url' (ID veya tam YouTube adresi) -> 'video_embed_id'.
+#     - 'recommended_videos' (JSON liste) -> 'recommended_video_ids'
+#       (boşlukla ayrılmış, tekrarsız YouTube ID'leri).
+#
+# 3.  NE ZAMAN ÇALIŞIR?
+#     - 'models.py' içindeki 'before_insert' / 'before_update' olayları,
+#       ilgili alanlar değiştiğinde veya 'RENDER_VERSION' artırıldığında
+#       'render_lesson' fonksiyonunu çağırır. 'add_lesson', 'edit_lesson',
+#       'flask seed' ve içe aktarma gibi tüm kayıt yolları kapsanır.
+#     - İşleme kuralları değiştiğinde 'RENDER_VERSION' artırılır ve
+#       'flask academy render-lessons' çalıştırılır.
+# ===================================================================
+
+RENDER_VERSION = 1
+
+ALLOWED_TAGS = frozenset((
+    'a', 'abbr', 'b', 'blockquote', 'br', 'code', 'div', 'em', 'figcaption', 'figure',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'mark', 'ol', 'p', 'pre',
+    's', 'small', 'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'th', 'thead',
+    'tr', 'u', 'ul',
+))
+VOID_TAGS = frozenset(('br', 'hr', 'img'))
+# İçeriğiyle birlikte tamamen atılan etiketler
+DROP_CONTENT_TAGS = frozenset(('script', 'style', 'iframe', 'object', 'template'))
+
+GLOBAL_ATTRIBUTES = frozenset(('class', 'title'))
+TAG_ATTRIBUTES = {
+    'a': frozenset(('href', 'target')),
+    'img': frozenset(('src', 'alt', 'width', 'height')),
+    'td': frozenset(('colspan', 'rowspan')),
+    'th': frozenset(('colspan', 'rowspan')),
+}
+URL_ATTRIBUTES = frozenset(('href', 'src'))
+ALLOWED_URL_SCHEMES = frozenset(('', 'http', 'https', 'mailto'))
+
+_YOUTUBE_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+_YOUTUBE_HOSTS = ('youtube.com', 'www.youtube.com', 'm.youtube.com', 'youtube-nocookie.com',
+                  'www.youtube-nocookie.com', 'youtu.be')
+
+
+def _is_safe_url(value):
+    scheme = urlparse(value.strip()).scheme.lower()
+    return scheme in ALLOWED_URL_SCHEMES
+
+
+class _Sanitizer(HTMLParser):
+    """İzin listesine göre HTML'i yeniden üreten basit bir ayrıştırıcı."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.open_tags = []
+        self.drop_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth += 1
+            return
+        if self.drop_depth or tag not in ALLOWED_TAGS:
+            return
+
+        allowed = GLOBAL_ATTRIBUTES | TAG_ATTRIBUTES.get(tag, frozenset())
+        rendered = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not _is_safe_url(value):
+                continue
+            if name == 'target' and value != '_blank':
+                continue
+            rendered.append(f' {name}="{escape(value, quote=True)}"')
+        if tag == 'a' and any(name == 'target' for name, _ in attrs):
+            rendered.append(' rel="noopener noreferrer"')
+
+        self.parts.append(f"<{tag}{''.join(rendered)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth = max(0, self.drop_depth - 1)
+            return
+        if self.drop_depth or tag not in self.open_tags:
+            return
+        # Kapatılmamış iç etiketleri de kapatarak iç içe yapıyı korur
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.parts.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.drop_depth:
+            self.parts.append(escape(data, quote=False))
+
+    def result(self):
+        self.close()
+        self.parts.extend(f"</{tag}>" for tag in reversed(self.open_tags))
+        self.open_tags = []
+        return ''.join(self.parts)
+
+
+def sanitize_html(value):
+    """Ders içeriğini izin verilen etiket ve özniteliklere göre temizler."""
+    if not value or not value.strip():
+        return ''
+    sanitizer = _Sanitizer()
+    sanitizer.feed(value)
+    return sanitizer.result().strip()
+
+
+def extract_youtube_id(value):
+    """Bir YouTube adresinden veya doğrudan ID'den 11 karakterlik video ID'sini çıkarır."""
+    value = (value or '').strip()
+    if not value:
+        return None
+    if _YOUTUBE_ID_RE.match(value):
+        return value
+
+    parsed = urlparse(value if '//' in value else f'https://{value}')
+    host = (parsed.hostname or '').lower()
+    if host not in _YOUTUBE_HOSTS:
+        return None
+    if host == 'youtu.be':
+        candidate = parsed.path.lstrip('/').split('/')[0]
+    else:
+        candidate = parse_qs(parsed.query).get('v', [''])[0]
+        if not candidate:
+            segments = [segment for segment in parsed.path.split('/') if segment]
+            if len(segments) >= 2 and segments[0] in ('embed', 'shorts', 'live', 'v'):
+                candidate = segments[1]
+    return candidate if _YOUTUBE_ID_RE.match(candidate or '') else None
+
+
+def normalize_recommended_videos(raw):
+    """'recommended_videos' JSON listesini sıralı ve tekrarsız YouTube ID'lerine çevirir."""
+    if not raw:
+        return ()
+    try:
+        entries = json.loads(raw)
+    except ValueError:
+        # Eski kayıtlar: JSON yerine virgül/satır ile ayrılmış adresler
+        entries = re.split(r'[\s,]+', raw)
+    if isinstance(entries, str):
+        entries = [entries]
+    if not isinstance(entries, list):
+        return ()
+
+    video_ids = []
+    for entry in entries:
+        video_id = extract_youtube_id(entry) if isinstance(entry, str) else None
+        if video_id and video_id not in video_ids:
+            video_ids.append(video_id)
+    return tuple(video_ids)
+
+
+def render_lesson(lesson):
+    """Dersin işlenmiş alanlarını ('content_html', video ID'leri) doldurur."""
+    lesson.content_html = sanitize_html(lesson.content)
+    lesson.video_embed_id = extract_youtube_id(lesson.video_url)
+    lesson.recommended_video_ids = ' '.join(normalize_recommended_videos(lesson.recommended_videos)) or None
+    lesson.render_version = RENDER_VERSION
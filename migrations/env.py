@@ -97,6 +97,12 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # SQLite 'batch' göçleri tabloları yeniden oluşturur (DROP + RENAME);
+        # yabancı anahtar denetimi açıkken bu, alt tablolardaki satırları
+        # 'ON DELETE CASCADE' ile silerdi. Göç süresince denetim kapatılır.
+        if connection.dialect.name == 'sqlite':
+            connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -0,0 +1,26 @@
+"""v7.1 Quiz deneme cevapları (quiz_attempt.answers)
+
+Revision ID: 5b2f0c9e7a41
+Revises: dcc8cee78414
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2f0c9e7a41'
+down_revision = 'dcc8cee78414'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz_attempt', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('answers', sa.LargeBinary(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('quiz_attempt', schema=None) as batch_op:
+        batch_op.drop_column('answers')
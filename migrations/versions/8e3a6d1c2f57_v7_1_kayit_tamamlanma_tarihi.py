@@ -0,0 +1,36 @@
+"""v7.1 Kayıt tamamlanma tarihi (enrollment.completed_at)
+
+Revision ID: 8e3a6d1c2f57
+Revises: 5b2f0c9e7a41
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3a6d1c2f57'
+down_revision = '5b2f0c9e7a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('enrollment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('completed_at', sa.DateTime(), nullable=True))
+
+    # Zaten tamamlanmış kayıtlar için tarih = son tamamlanan dersin tarihi
+    op.execute(
+        'UPDATE enrollment SET completed_at = '
+        '(SELECT MAX(lesson_completion.completed_at) FROM lesson_completion '
+        'WHERE lesson_completion.user_id = enrollment.user_id '
+        'AND lesson_completion.course_id = enrollment.course_id) '
+        'WHERE enrollment.completed_count > 0 AND enrollment.completed_count >= '
+        '(SELECT course.lesson_count FROM course WHERE course.id = enrollment.course_id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('enrollment', schema=None) as batch_op:
+        batch_op.drop_column('completed_at')
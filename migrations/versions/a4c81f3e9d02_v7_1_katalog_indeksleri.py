@@ -0,0 +1,27 @@
+"""v7.1 Akademi katalog indeksleri (course.difficulty, course.category+title)
+
+Revision ID: a4c81f3e9d02
+Revises: 8e3a6d1c2f57
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c81f3e9d02'
+down_revision = '8e3a6d1c2f57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('course', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_course_difficulty'), ['difficulty'], unique=False)
+        batch_op.create_index('ix_course_category_title', ['category', 'title'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('course', schema=None) as batch_op:
+        batch_op.drop_index('ix_course_category_title')
+        batch_op.drop_index(batch_op.f('ix_course_difficulty'))
@@ -0,0 +1,69 @@
+"""v7.1 Günlük satış özet tablosu (sales_daily_rollup)
+
+Revision ID: a7d3f9b1c246
+Revises: e9c4b7a2d158
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from collections import defaultdict
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+from dateutil import tz
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3f9b1c246'
+down_revision = 'e9c4b7a2d158'
+branch_labels = None
+depends_on = None
+
+LOCAL_TZ = tz.gettz('Europe/Istanbul')
+
+rollup_table = sa.table('sales_daily_rollup',
+    sa.column('user_id', sa.Integer), sa.column('day', sa.Date), sa.column('amount', sa.Float),
+    sa.column('sale_count', sa.Integer), sa.column('commission', sa.Float))
+
+
+def _local_day(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=tz.UTC).astimezone(LOCAL_TZ).date()
+
+
+def upgrade():
+    op.create_table('sales_daily_rollup',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('amount', sa.Float(), server_default='0', nullable=False),
+    sa.Column('sale_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('commission', sa.Float(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    with op.batch_alter_table('sales_daily_rollup', schema=None) as batch_op:
+        batch_op.create_index('ix_sales_daily_rollup_day', ['day'], unique=False)
+
+    # Mevcut satışlardan özeti hesapla (gün, İstanbul saatine göre; personeli olmayan satışlar atlanır)
+    bind = op.get_bind()
+    totals = defaultdict(lambda: [0.0, 0, 0.0])
+    rows = bind.execute(sa.text(
+        "SELECT sale.user_id, sale.date_posted, sale.amount, commission.amount AS commission "
+        "FROM sale LEFT OUTER JOIN commission ON commission.sale_id = sale.id "
+        "WHERE sale.user_id IS NOT NULL"))
+    for row in rows:
+        bucket = totals[(row.user_id, _local_day(row.date_posted))]
+        bucket[0] += row.amount or 0.0
+        bucket[1] += 1
+        bucket[2] += row.commission or 0.0
+    if totals:
+        op.bulk_insert(rollup_table, [
+            {'user_id': user_id, 'day': day, 'amount': amount, 'sale_count': count, 'commission': commission}
+            for (user_id, day), (amount, count, commission) in totals.items()])
+
+
+def downgrade():
+    with op.batch_alter_table('sales_daily_rollup', schema=None) as batch_op:
+        batch_op.drop_index('ix_sales_daily_rollup_day')
+
+    op.drop_table('sales_daily_rollup')
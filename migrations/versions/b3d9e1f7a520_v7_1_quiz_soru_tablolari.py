@@ -0,0 +1,125 @@
+"""v7.1 Quiz soru tabloları (quiz_question, quiz_option, quiz.question_count)
+
+Revision ID: b3d9e1f7a520
+Revises: f5a8c3e6b217
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3d9e1f7a520'
+down_revision = 'f5a8c3e6b217'
+branch_labels = None
+depends_on = None
+
+
+quiz_table = sa.table('quiz',
+    sa.column('id', sa.Integer), sa.column('questions', sa.Text), sa.column('question_count', sa.Integer))
+question_table = sa.table('quiz_question',
+    sa.column('id', sa.Integer), sa.column('quiz_id', sa.Integer), sa.column('position', sa.Integer),
+    sa.column('text', sa.Text), sa.column('correct_index', sa.Integer))
+option_table = sa.table('quiz_option',
+    sa.column('question_id', sa.Integer), sa.column('position', sa.Integer), sa.column('text', sa.Text))
+
+INVALID_QUESTION_TEXT = '(Geçersiz soru)'
+
+
+def _correct_index(data):
+    try:
+        return int(data.get('correct_index', 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def upgrade():
+    op.create_table('quiz_question',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('quiz_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('correct_index', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quiz.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('quiz_id', 'position', name='uq_quiz_question_position')
+    )
+    op.create_table('quiz_option',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['quiz_question.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('question_id', 'position', name='uq_quiz_option_position')
+    )
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('question_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Mevcut JSON soruları satırlara dönüştür (geçersiz JSON içeren quizler boş kalır)
+    bind = op.get_bind()
+    for quiz_id, raw in bind.execute(sa.select(quiz_table.c.id, quiz_table.c.questions)).fetchall():
+        try:
+            questions = json.loads(raw or '[]')
+        except ValueError:
+            questions = []
+        if not isinstance(questions, list):
+            questions = []
+
+        # Geçersiz sorular atlanmaz, yer tutucu satır olarak eklenir: denemelerin paketlenmiş
+        # cevapları soru sırasına göre dizinlendiği için sonraki sorular kaymamalıdır.
+        # Seçeneği olmayan yer tutucu, eskisi gibi her zaman yanlış sayılır.
+        for position, data in enumerate(questions):
+            if not isinstance(data, dict):
+                data = {}
+            bind.execute(question_table.insert().values(
+                quiz_id=quiz_id, position=position, text=str(data.get('question') or INVALID_QUESTION_TEXT),
+                correct_index=_correct_index(data)))
+            # (quiz_id, position) benzersiz olduğundan yeni sorunun id'si bununla okunur
+            question_id = bind.execute(sa.select(question_table.c.id).where(
+                question_table.c.quiz_id == quiz_id, question_table.c.position == position)).scalar()
+            raw_options = data.get('options')
+            options = [{'question_id': question_id, 'position': i, 'text': str(text)}
+                       for i, text in enumerate(raw_options if isinstance(raw_options, list) else [])]
+            if options:
+                bind.execute(option_table.insert(), options)
+        bind.execute(quiz_table.update().where(quiz_table.c.id == quiz_id).values(question_count=len(questions)))
+
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.drop_column('questions')
+
+
+def downgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('questions', sa.Text(), nullable=False, server_default='[]'))
+
+    # Satırlardan JSON metnini yeniden oluştur
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(question_table.c.quiz_id, question_table.c.id, question_table.c.text,
+                  question_table.c.correct_index, option_table.c.text.label('option_text'))
+        .select_from(question_table.outerjoin(option_table, option_table.c.question_id == question_table.c.id))
+        .order_by(question_table.c.quiz_id, question_table.c.position, option_table.c.position)
+    ).fetchall()
+    quizzes = {}
+    current = None
+    for row in rows:
+        if current is None or current['id'] != row.id:
+            current = {'id': row.id, 'question': row.text, 'options': [], 'correct_index': row.correct_index}
+            quizzes.setdefault(row.quiz_id, []).append(current)
+        if row.option_text is not None:
+            current['options'].append(row.option_text)
+    for quiz_id, questions in quizzes.items():
+        for question in questions:
+            del question['id']
+        bind.execute(quiz_table.update().where(quiz_table.c.id == quiz_id)
+                     .values(questions=json.dumps(questions, ensure_ascii=False)))
+
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.drop_column('question_count')
+
+    op.drop_table('quiz_option')
+    op.drop_table('quiz_question')
@@ -0,0 +1,38 @@
+"""v7.1 Personel satış/prim toplamları (user.sales_total, sales_count, commission_total)
+
+Revision ID: b3e8c1d5f702
+Revises: a7d3f9b1c246
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8c1d5f702'
+down_revision = 'a7d3f9b1c246'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sales_total', sa.Float(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('sales_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('commission_total', sa.Float(), server_default='0', nullable=False))
+
+    # Mevcut toplamları günlük özet tablosundan doldur
+    op.execute(
+        'UPDATE "user" SET '
+        'sales_total = (SELECT COALESCE(SUM(amount), 0) FROM sales_daily_rollup WHERE sales_daily_rollup.user_id = "user".id), '
+        'sales_count = (SELECT COALESCE(SUM(sale_count), 0) FROM sales_daily_rollup WHERE sales_daily_rollup.user_id = "user".id), '
+        'commission_total = (SELECT COALESCE(SUM(commission), 0) FROM sales_daily_rollup WHERE sales_daily_rollup.user_id = "user".id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('commission_total')
+        batch_op.drop_column('sales_count')
+        batch_op.drop_column('sales_total')
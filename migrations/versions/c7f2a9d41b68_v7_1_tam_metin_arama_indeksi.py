@@ -0,0 +1,42 @@
+"""v7.1 Akademi tam metin arama indeksi (SQLite FTS5 / PostgreSQL tsvector)
+
+Revision ID: c7f2a9d41b68
+Revises: a4c81f3e9d02
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7f2a9d41b68'
+down_revision = 'a4c81f3e9d02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    from search_index import SqliteSearchBackend, PostgresSearchBackend, html_to_text
+
+    bind = op.get_bind()
+    backend = {'sqlite': SqliteSearchBackend, 'postgresql': PostgresSearchBackend}.get(bind.dialect.name)
+    if backend is None:
+        return
+    backend = backend()
+    backend.ensure_schema(bind)
+
+    courses = bind.execute(sa.text("SELECT id, title, description FROM course")).fetchall()
+    for row in courses:
+        backend.upsert(bind, 'course', row.id, row.id, row.title or '', html_to_text(row.description))
+    lessons = bind.execute(sa.text("SELECT id, course_id, title, content FROM lesson")).fetchall()
+    for row in lessons:
+        backend.upsert(bind, 'lesson', row.id, row.course_id, row.title or '', html_to_text(row.content))
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS search_index")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("DROP TABLE IF EXISTS search_document")
@@ -0,0 +1,51 @@
+"""v7.1 Seyrek ders sıralama anahtarları (lesson.order -> 1024, 2048, ...)
+
+Revision ID: d4e8a2c6f913
+Revises: b3d9e1f7a520
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e8a2c6f913'
+down_revision = 'b3d9e1f7a520'
+branch_labels = None
+depends_on = None
+
+ORDER_GAP = 1024
+
+lesson_table = sa.table('lesson',
+    sa.column('id', sa.Integer), sa.column('course_id', sa.Integer), sa.column('order', sa.Integer))
+
+
+def _renumber(step):
+    """Her kursun derslerini mevcut sırasını koruyarak step, 2*step, ... olarak numaralandırır."""
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(lesson_table.c.id, lesson_table.c.course_id)
+                        .order_by(lesson_table.c.course_id, lesson_table.c.order)).fetchall()
+    if not rows:
+        return
+    statement = lesson_table.update()\
+        .where(lesson_table.c.id == sa.bindparam('lesson_id'))\
+        .values(order=sa.bindparam('new_order'))
+    # 'uq_lesson_order_in_course' kısıtına takılmamak için önce geçici negatif değerler
+    bind.execute(statement, [{'lesson_id': row.id, 'new_order': -row.id} for row in rows])
+
+    values = []
+    position, previous_course = 0, None
+    for row in rows:
+        position = position + 1 if row.course_id == previous_course else 1
+        previous_course = row.course_id
+        values.append({'lesson_id': row.id, 'new_order': position * step})
+    bind.execute(statement, values)
+
+
+def upgrade():
+    _renumber(ORDER_GAP)
+
+
+def downgrade():
+    _renumber(1)
@@ -0,0 +1,149 @@
+"""v7.1 Ders tamamlama tablosu (LessonCompletion)
+
+Revision ID: d69e71f19b88
+Revises: 4477e705df55
+Create Date: 2026-10-18 10:00:00.000000
+
+'enrollment.completed_lessons' ('1,5,12' gibi) string alanındaki veriler
+'lesson_completion' tablosuna parça parça (chunk) taşınır ve her kayıt için
+'completed_count' sayacı doldurulur.
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd69e71f19b88'
+down_revision = '4477e705df55'
+branch_labels = None
+depends_on = None
+
+CHUNK_SIZE = 1000
+
+enrollment_table = sa.table('enrollment',
+    sa.column('id', sa.Integer),
+    sa.column('user_id', sa.Integer),
+    sa.column('course_id', sa.Integer),
+    sa.column('date_enrolled', sa.DateTime),
+    sa.column('completed_lessons', sa.Text),
+    sa.column('completed_count', sa.Integer),
+)
+
+lesson_table = sa.table('lesson',
+    sa.column('id', sa.Integer),
+    sa.column('course_id', sa.Integer),
+)
+
+completion_table = sa.table('lesson_completion',
+    sa.column('user_id', sa.Integer),
+    sa.column('lesson_id', sa.Integer),
+    sa.column('course_id', sa.Integer),
+    sa.column('completed_at', sa.DateTime),
+)
+
+
+def _parse_ids(csv_value):
+    """'1,5,12' -> {1, 5, 12} (geçersiz parçalar atlanır)."""
+    ids = set()
+    for part in (csv_value or '').split(','):
+        part = part.strip()
+        if part.isdigit():
+            ids.add(int(part))
+    return ids
+
+
+def upgrade():
+    op.create_table('lesson_completion',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('lesson_id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['course_id'], ['course.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['lesson_id'], ['lesson.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'lesson_id', name='uq_user_lesson_completion')
+    )
+    with op.batch_alter_table('lesson_completion', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_lesson_completion_lesson_id'), ['lesson_id'], unique=False)
+        batch_op.create_index('ix_lesson_completion_user_course', ['user_id', 'course_id'], unique=False)
+
+    with op.batch_alter_table('enrollment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # --- VERİ TAŞIMA (CSV -> lesson_completion) ---
+    conn = op.get_bind()
+    # Ders -> Kurs eşlemesi: Sadece kursa gerçekten ait derslerin ID'leri taşınır.
+    lesson_course = {row.id: row.course_id for row in conn.execute(
+        sa.select(lesson_table.c.id, lesson_table.c.course_id))}
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(enrollment_table.c.id, enrollment_table.c.user_id,
+                      enrollment_table.c.course_id, enrollment_table.c.date_enrolled,
+                      enrollment_table.c.completed_lessons)
+            .where(enrollment_table.c.id > last_id)
+            .order_by(enrollment_table.c.id)
+            .limit(CHUNK_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+
+        completions = []
+        for row in rows:
+            valid_ids = [lid for lid in _parse_ids(row.completed_lessons)
+                         if lesson_course.get(lid) == row.course_id]
+            completed_at = row.date_enrolled or datetime.utcnow()
+            completions.extend({'user_id': row.user_id, 'lesson_id': lid,
+                                'course_id': row.course_id, 'completed_at': completed_at}
+                               for lid in valid_ids)
+            if valid_ids:
+                conn.execute(enrollment_table.update()
+                             .where(enrollment_table.c.id == row.id)
+                             .values(completed_count=len(valid_ids)))
+        if completions:
+            conn.execute(completion_table.insert(), completions)
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('enrollment', schema=None) as batch_op:
+        batch_op.drop_column('completed_lessons')
+
+
+def downgrade():
+    with op.batch_alter_table('enrollment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('completed_lessons', sa.Text(), nullable=True))
+
+    # --- VERİ GERİ TAŞIMA (lesson_completion -> CSV) ---
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(enrollment_table.c.id, enrollment_table.c.user_id, enrollment_table.c.course_id)
+            .where(enrollment_table.c.id > last_id)
+            .order_by(enrollment_table.c.id)
+            .limit(CHUNK_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        for row in rows:
+            lesson_ids = sorted(r.lesson_id for r in conn.execute(
+                sa.select(completion_table.c.lesson_id)
+                .where(completion_table.c.user_id == row.user_id,
+                       completion_table.c.course_id == row.course_id)))
+            conn.execute(enrollment_table.update()
+                         .where(enrollment_table.c.id == row.id)
+                         .values(completed_lessons=','.join(map(str, lesson_ids))))
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('enrollment', schema=None) as batch_op:
+        batch_op.drop_column('completed_count')
+
+    with op.batch_alter_table('lesson_completion', schema=None) as batch_op:
+        batch_op.drop_index('ix_lesson_completion_user_course')
+        batch_op.drop_index(batch_op.f('ix_lesson_completion_lesson_id'))
+
+    op.drop_table('lesson_completion')
@@ -0,0 +1,32 @@
+"""v7.1 Kurs ders sayacı (course.lesson_count)
+
+Revision ID: dcc8cee78414
+Revises: d69e71f19b88
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'dcc8cee78414'
+down_revision = 'd69e71f19b88'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('course', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('lesson_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Mevcut kurslar için sayacı tek bir küme (set-based) sorgusu ile doldur
+    op.execute(
+        'UPDATE course SET lesson_count = '
+        '(SELECT COUNT(*) FROM lesson WHERE lesson.course_id = course.id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('course', schema=None) as batch_op:
+        batch_op.drop_column('lesson_count')
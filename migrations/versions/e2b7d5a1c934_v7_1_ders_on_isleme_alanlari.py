@@ -0,0 +1,55 @@
+"""v7.1 Ders ön işleme alanları (lesson.content_html, video_embed_id, recommended_video_ids)
+
+Revision ID: e2b7d5a1c934
+Revises: c7f2a9d41b68
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7d5a1c934'
+down_revision = 'c7f2a9d41b68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    from lesson_renderer import RENDER_VERSION, sanitize_html, extract_youtube_id, normalize_recommended_videos
+
+    bind = op.get_bind()
+    existing = {column['name'] for column in sa.inspect(bind).get_columns('lesson')}
+
+    with op.batch_alter_table('lesson', schema=None) as batch_op:
+        # 'recommended_videos' modele daha önce migration'sız eklenmişti
+        if 'recommended_videos' not in existing:
+            batch_op.add_column(sa.Column('recommended_videos', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('content_html', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('video_embed_id', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('recommended_video_ids', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('render_version', sa.Integer(), nullable=False, server_default='0'))
+
+    # Mevcut dersleri bir kez işle
+    lessons = bind.execute(sa.text(
+        "SELECT id, content, video_url, recommended_videos FROM lesson")).fetchall()
+    for row in lessons:
+        bind.execute(sa.text(
+            "UPDATE lesson SET content_html = :content_html, video_embed_id = :video_embed_id, "
+            "recommended_video_ids = :recommended_video_ids, render_version = :render_version "
+            "WHERE id = :id"), {
+                'id': row.id,
+                'content_html': sanitize_html(row.content),
+                'video_embed_id': extract_youtube_id(row.video_url),
+                'recommended_video_ids': ' '.join(normalize_recommended_videos(row.recommended_videos)) or None,
+                'render_version': RENDER_VERSION,
+            })
+
+
+def downgrade():
+    with op.batch_alter_table('lesson', schema=None) as batch_op:
+        batch_op.drop_column('render_version')
+        batch_op.drop_column('recommended_video_ids')
+        batch_op.drop_column('video_embed_id')
+        batch_op.drop_column('content_html')
@@ -0,0 +1,50 @@
+"""v7.1 Veritabanı taraflı silme (lesson.course_id, sale.user_id, activity_log.user_id ON DELETE CASCADE; sale.user_id indeksi)
+
+Revision ID: e9c4b7a2d158
+Revises: d4e8a2c6f913
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9c4b7a2d158'
+down_revision = 'd4e8a2c6f913'
+branch_labels = None
+depends_on = None
+
+# SQLite'taki isimsiz yabancı anahtar, 'batch' modunda bu kuralla adlandırılarak bulunur
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _fk_name(table, column, referred_table):
+    # PostgreSQL isimsiz anahtarları '<tablo>_<sütun>_fkey' olarak adlandırır
+    if op.get_bind().dialect.name == 'postgresql':
+        return f'{table}_{column}_fkey'
+    return f'fk_{table}_{column}_{referred_table}'
+
+
+def _replace_fk(table, column, referred_table, ondelete):
+    name = _fk_name(table, column, referred_table)
+    with op.batch_alter_table(table, schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_='foreignkey')
+        batch_op.create_foreign_key(name, referred_table, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    _replace_fk('lesson', 'course_id', 'course', 'CASCADE')
+    # Kullanıcı silinirken satışları (primleriyle) ve logları veritabanı tarafında silinir
+    # (önceden ORM cascade ile siliniyordu; 'SET NULL' kuralı hiç devreye girmiyordu)
+    _replace_fk('sale', 'user_id', 'user', 'CASCADE')
+    _replace_fk('activity_log', 'user_id', 'user', 'CASCADE')
+    with op.batch_alter_table('sale', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_sale_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('sale', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_sale_user_id'))
+    _replace_fk('activity_log', 'user_id', 'user', 'SET NULL')
+    _replace_fk('sale', 'user_id', 'user', 'SET NULL')
+    _replace_fk('lesson', 'course_id', 'course', None)
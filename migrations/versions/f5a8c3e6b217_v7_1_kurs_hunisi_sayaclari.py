@@ -0,0 +1,53 @@
+"""v7.1 Kurs hunisi sayaçları (course.enrollment_count, lesson_funnel_stat)
+
+Revision ID: f5a8c3e6b217
+Revises: e2b7d5a1c934
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5a8c3e6b217'
+down_revision = 'e2b7d5a1c934'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('course', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('enrollment_count', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_table('lesson_funnel_stat',
+    sa.Column('lesson_id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('completion_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['course_id'], ['course.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['lesson_id'], ['lesson.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('lesson_id')
+    )
+    with op.batch_alter_table('lesson_funnel_stat', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_lesson_funnel_stat_course_id'), ['course_id'], unique=False)
+
+    # Mevcut veriden sayaçları hesapla
+    op.execute(
+        "INSERT INTO lesson_funnel_stat (lesson_id, course_id, completion_count) "
+        "SELECT lesson.id, lesson.course_id, "
+        "(SELECT COUNT(lesson_completion.id) FROM lesson_completion "
+        "WHERE lesson_completion.lesson_id = lesson.id) FROM lesson"
+    )
+    op.execute(
+        "UPDATE course SET enrollment_count = "
+        "(SELECT COUNT(enrollment.id) FROM enrollment WHERE enrollment.course_id = course.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('lesson_funnel_stat', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_lesson_funnel_stat_course_id'))
+
+    op.drop_table('lesson_funnel_stat')
+    with op.batch_alter_table('course', schema=None) as batch_op:
+        batch_op.drop_column('enrollment_count')
@@ -1,9 +1,8 @@
 from extensions import db, bcrypt # bcrypt'i User modeli içinde kullanacağız
 from flask_login import UserMixin
 from datetime import datetime
-from sqlalchemy import func, CheckConstraint, event # event eklendi (şifre kontrolü için)
+from sqlalchemy import select, CheckConstraint, event # event eklendi (şifre kontrolü için)
 import hashlib # Profil fotoğrafı için gravatar URL'si oluşturmak üzere eklendi
-import json # Quiz __repr__ için eklendi
 
 # ==========================================================================
 # Geliştirilmiş Veritabanı Modelleri (models.py)
@@ -84,12 +83,22 @@ class User(UserMixin, db.Model):
     social_twitter = db.Column(db.String(200), nullable=True)
     social_github = db.Column(db.String(200), nullable=True)
 
+    # GÜNCELLEME (v7.1): Satış ve prim toplamları her profilde SUM ile hesaplanmıyor.
+    # 'Sale' / 'Commission' olayları bu alanları aynı işlem içinde günceller (bkz. 'sales_rollup.py').
+    # Sapmalar 'flask rollups reconcile' komutu ile raporlanır / düzeltilir.
+    sales_total = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    sales_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    commission_total = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+
     # İlişkiler (Bir kullanıcı silinirse, ona ait her şey silinir - cascade)
     # 'lazy='dynamic'' -> Bu ilişkilerin bir sorgu (query) olarak yüklenmesini sağlar.
-    sales = db.relationship('Sale', backref='author', lazy='dynamic', cascade="all, delete-orphan")
-    enrollments = db.relationship('Enrollment', backref='student', lazy='dynamic', cascade="all, delete-orphan")
-    quiz_attempts = db.relationship('QuizAttempt', backref='user', lazy='dynamic', cascade="all, delete-orphan")
-    activities = db.relationship('ActivityLog', backref='user', lazy='dynamic', cascade="all, delete-orphan")
+    # GÜNCELLEME (v7.1): 'passive_deletes=True' -> Alt satırlar Python'a yüklenmez;
+    # silme işini veritabanındaki 'ON DELETE CASCADE' kuralları yapar.
+    sales = db.relationship('Sale', backref='author', lazy='dynamic', cascade="all, delete-orphan", passive_deletes=True)
+    enrollments = db.relationship('Enrollment', backref='student', lazy='dynamic', cascade="all, delete-orphan", passive_deletes=True)
+    quiz_attempts = db.relationship('QuizAttempt', backref='user', lazy='dynamic', cascade="all, delete-orphan", passive_deletes=True)
+    activities = db.relationship('ActivityLog', backref='user', lazy='dynamic', cascade="all, delete-orphan", passive_deletes=True)
+    lesson_completions = db.relationship('LessonCompletion', backref='user', lazy='dynamic', cascade="all, delete-orphan", passive_deletes=True)
 
     def __init__(self, **kwargs):
         """Model oluşturulurken şifre varsa otomatik hash'ler."""
@@ -152,19 +161,12 @@ class User(UserMixin, db.Model):
             return f'https://www.gravatar.com/avatar/{digest}?d=mp&s={size}'
 
     def get_total_commission(self):
-        """Kullanıcının kazandığı toplam prim tutarını döndürür."""
-        total = db.session.query(func.sum(Commission.amount))\
-            .join(Sale)\
-            .filter(Sale.user_id == self.id)\
-            .scalar()
-        return total or 0.0
+        """Kullanıcının kazandığı toplam prim tutarını döndürür (saklanan toplam, sorgu yapmaz)."""
+        return self.commission_total or 0.0
 
     def get_total_sales_amount(self):
-        """Kullanıcının yaptığı toplam satış miktarını döndürür."""
-        total = db.session.query(func.sum(Sale.amount))\
-            .filter(Sale.user_id == self.id)\
-            .scalar()
-        return total or 0.0
+        """Kullanıcının yaptığı toplam satış miktarını döndürür (saklanan toplam, sorgu yapmaz)."""
+        return self.sales_total or 0.0
 
     def get_enrollment_for_course(self, course_id):
         """Kullanıcının belirli bir kursa olan kaydını döndürür."""
@@ -196,8 +198,10 @@ class Sale(db.Model):
     product_name = db.Column(db.String(100), nullable=False)
     amount = db.Column(db.Float, nullable=False)
     date_posted = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
-    # Bir personel silinirse satışları silinmesin, 'author' alanı null olsun
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'), nullable=True) 
+    # GÜNCELLEME (v7.1): Bir personel silinirse satışları (ve primleri) veritabanı
+    # tarafında silinir ('ON DELETE CASCADE'; v7.0'daki ORM cascade ile aynı sonuç).
+    # (İndeks: kullanıcı silinirken cascade taraması ve personel satış sorguları için)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=True, index=True)
 
     # 'author' ilişkisi (User modelinde backref ile tanımlandı)
     commission = db.relationship('Commission', backref='sale', uselist=False, cascade="all, delete-orphan")
@@ -233,20 +237,31 @@ class Course(db.Model):
     title = db.Column(db.String(150), nullable=False, unique=True)
     description = db.Column(db.Text, nullable=False)
     category = db.Column(db.String(50), nullable=False, index=True)
-    difficulty = db.Column(db.String(20), default='Başlangıç')
+    difficulty = db.Column(db.String(20), default='Başlangıç', index=True)
     duration_hours = db.Column(db.Integer, default=0)
     cover_image = db.Column(db.String(100), nullable=True, default='course_default.png')
     instructor_name = db.Column(db.String(100), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    # Bir kurs silinirse, tüm dersleri ve kayıtları da silinsin
-    lessons = db.relationship('Lesson', backref='course', lazy='dynamic', order_by='Lesson.order', cascade="all, delete-orphan")
-    enrollments = db.relationship('Enrollment', backref='course', lazy='dynamic', cascade="all, delete-orphan")
+    # GÜNCELLEME (v7.1): Ders sayısı artık her seferinde COUNT(*) ile hesaplanmıyor.
+    # 'Lesson' üzerindeki after_insert/after_delete olayları bu alanı güncel tutar.
+    # Sapmalar 'flask academy reconcile-counts' komutu ile düzeltilir.
+    lesson_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # GÜNCELLEME (v7.1): Kayıtlı öğrenci sayısı ('Enrollment' olaylarıyla güncel tutulur).
+    # Kurs hunisinin (funnel) ilk adımıdır; 'flask academy rebuild-funnel' ile yeniden hesaplanır.
+    enrollment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Bir kurs silinirse, tüm dersleri ve kayıtları da silinsin (veritabanı tarafında, bkz. 'passive_deletes')
+    lessons = db.relationship('Lesson', backref='course', lazy='dynamic', order_by='Lesson.order',
+                              cascade="all, delete-orphan", passive_deletes=True)
+    enrollments = db.relationship('Enrollment', backref='course', lazy='dynamic', cascade="all, delete-orphan", passive_deletes=True)
+
+    # Akademi kataloğunda "kategori + başlığa göre sırala" sorguları için (v7.1)
+    __table_args__ = (db.Index('ix_course_category_title', 'category', 'title'),)
 
     def get_lesson_count(self):
-        """Kursa ait toplam ders sayısını döndürür."""
-        return self.lessons.count()
+        """Kursa ait toplam ders sayısını döndürür (saklanan sayaç, sorgu yapmaz)."""
+        return self.lesson_count or 0
 
     def get_next_lesson(self, current_lesson_order):
         """Mevcut dersten bir sonraki dersi (sıraya göre) bulur."""
@@ -268,18 +283,28 @@ class Lesson(db.Model):
     content = db.Column(db.Text, nullable=True) # Metin dersleri veya video açıklaması
     video_url = db.Column(db.String(255), nullable=True)
     recommended_videos = db.Column(db.Text, nullable=True) # JSON array of YouTube video URLs/IDs
+    # Kayıt anında 'lesson_renderer' tarafından üretilen alanlar (bkz. 'lesson_render_fields')
+    content_html = db.Column(db.Text, nullable=True) # Temizlenmiş (sanitize) içerik
+    video_embed_id = db.Column(db.String(20), nullable=True) # 'video_url' içinden YouTube ID
+    recommended_video_ids = db.Column(db.Text, nullable=True) # Boşlukla ayrılmış YouTube ID'leri
+    render_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     order = db.Column(db.Integer, nullable=False) # Dersin kurstaki sırası
-    course_id = db.Column(db.Integer, db.ForeignKey('course.id'), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.id', ondelete='CASCADE'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # 'course' ilişkisi (Course modelinde backref ile tanımlandı)
     # Bir ders silinirse, ona bağlı quiz de silinsin
-    quiz = db.relationship('Quiz', backref='lesson', uselist=False, cascade="all, delete-orphan")
+    quiz = db.relationship('Quiz', backref='lesson', uselist=False, cascade="all, delete-orphan", passive_deletes=True)
 
     # Bir kurs içinde aynı 'order' (sıra) numarasından sadece bir tane olabilir
     __table_args__ = (db.UniqueConstraint('course_id', 'order', name='uq_lesson_order_in_course'),)
 
+    @property
+    def recommended_video_id_list(self):
+        """Önerilen videoların YouTube ID listesi (kayıt anında normalize edilmiştir)."""
+        return self.recommended_video_ids.split() if self.recommended_video_ids else []
+
     def __repr__(self):
         return f"<Lesson id={self.id} title='{self.title}' order={self.order}>"
 
@@ -290,8 +315,12 @@ class Enrollment(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
     course_id = db.Column(db.Integer, db.ForeignKey('course.id', ondelete='CASCADE'), nullable=False, index=True)
     date_enrolled = db.Column(db.DateTime, default=datetime.utcnow)
-    # Tamamlanan derslerin ID'lerini '1,5,12' gibi bir string'de saklar (v5.0)
-    completed_lessons = db.Column(db.Text, default='') 
+    # GÜNCELLEME (v7.1): Tamamlanan dersler artık 'LessonCompletion' tablosunda
+    # tutuluyor. Bu sayaç, ilerleme yüzdesinin tek bir okuma ile hesaplanmasını sağlar.
+    completed_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # GÜNCELLEME (v7.1): Kursun %100 tamamlandığı an. Sertifika tarihi ve
+    # diskteki sertifika önbelleğinin anahtarı bu alandan gelir.
+    completed_at = db.Column(db.DateTime, nullable=True)
 
     # 'student' ve 'course' ilişkileri (User ve Course modellerinde backref ile tanımlandı)
 
@@ -299,37 +328,261 @@ class Enrollment(db.Model):
     __table_args__ = (db.UniqueConstraint('user_id', 'course_id', name='uq_user_course_enrollment'),)
 
     def get_completed_ids_set(self):
-        """'1,5,12' string'ini {'1', '5', '12'} set'ine çevirir."""
-        return set(filter(None, self.completed_lessons.split(','))) if self.completed_lessons else set()
+        """
+        Tamamlanan derslerin ID'lerini {1, 5, 12} gibi bir set olarak döndürür.
+        Tek bir indeksli sorgu ile yüklenir ve istek boyunca nesne üzerinde saklanır.
+        """
+        cached = getattr(self, '_completed_ids', None)
+        if cached is None:
+            if self.id is None:
+                cached = set()
+            else:
+                rows = db.session.query(LessonCompletion.lesson_id)\
+                    .filter(LessonCompletion.user_id == self.user_id,
+                            LessonCompletion.course_id == self.course_id)\
+                    .all()
+                cached = {row.lesson_id for row in rows}
+            self._completed_ids = cached
+        return cached
+
+    @staticmethod
+    def calculate_progress(completed_count, lesson_count):
+        """Tamamlanan ders sayısı ve toplam ders sayısından ilerleme yüzdesini hesaplar."""
+        if not lesson_count or lesson_count <= 0:
+            return 0
+        return min(100, round(((completed_count or 0) / lesson_count) * 100))
 
     def get_progress(self):
-        """Kullanıcının kurstaki ilerlemesini yüzde olarak hesaplar."""
-        try:
-            completed_count = len([int(id_str) for id_str in self.get_completed_ids_set()])
-        except ValueError:
-             completed_count = 0 
-        total_lessons = self.course.get_lesson_count()
-        return round((completed_count / total_lessons) * 100) if total_lessons > 0 else 0
+        """Kullanıcının kurstaki ilerlemesini yüzde olarak hesaplar (sayaç okuması)."""
+        return Enrollment.calculate_progress(self.completed_count, self.course.get_lesson_count())
 
     def add_completed_lesson(self, lesson_id):
-        """Bir dersi tamamlandı listesine ekler."""
-        lesson_id_str = str(lesson_id)
+        """
+        Bir dersi tamamlandı olarak kaydeder ve sayacı artırır.
+        Ders zaten tamamlanmışsa hiçbir şey yapmaz ve False döndürür.
+        """
+        lesson_id = int(lesson_id)
         completed_ids = self.get_completed_ids_set()
-        if lesson_id_str not in completed_ids:
-            completed_ids.add(lesson_id_str)
-            try:
-                # '1,12,5' -> [1, 12, 5] -> [1, 5, 12] -> '1,5,12' (Sıralı saklar)
-                valid_ids = [int(id_str) for id_str in completed_ids]
-                self.completed_lessons = ','.join(map(str, sorted(valid_ids)))
-            except ValueError:
-                 self.completed_lessons = ','.join(sorted(list(completed_ids)))
+        if lesson_id in completed_ids:
+            return False
+        db.session.add(LessonCompletion(user_id=self.user_id or self.student.id,
+                                        lesson_id=lesson_id,
+                                        course_id=self.course_id or self.course.id))
+        self.completed_count = (self.completed_count or 0) + 1
+        completed_ids.add(lesson_id)
+        if self.completed_at is None and self.get_progress() == 100:
+            self.completed_at = datetime.utcnow()
+        return True
 
     def is_lesson_completed(self, lesson_id):
-        """Belirli bir dersin tamamlanıp tamamlanmadığını kontrol eder."""
-        return str(lesson_id) in self.get_completed_ids_set()
+        """Belirli bir dersin tamamlanıp tamamlanmadığını kontrol eder (O(1) set araması)."""
+        try:
+            return int(lesson_id) in self.get_completed_ids_set()
+        except (TypeError, ValueError):
+            return False
+
+    def __repr__(self):
+        return f"<Enrollment user_id={self.user_id} course_id={self.course_id} completed={self.completed_count}>"
+
+class LessonCompletion(db.Model):
+    """Bir kullanıcının bir dersi tamamladığını kaydeder (v7.1)."""
+    __tablename__ = 'lesson_completion'
+    id = db.Column(db.Integer, primary_key=True)
+    # Kullanıcı, ders veya kurs silinirse bu kayıt da silinsin
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    lesson_id = db.Column(db.Integer, db.ForeignKey('lesson.id', ondelete='CASCADE'), nullable=False, index=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.id', ondelete='CASCADE'), nullable=False)
+    completed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Bir kullanıcı bir dersi sadece bir kez tamamlayabilir.
+    # (user_id, course_id) indeksi, bir kayıttaki tüm tamamlamaları tek sorguda getirir.
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'lesson_id', name='uq_user_lesson_completion'),
+        db.Index('ix_lesson_completion_user_course', 'user_id', 'course_id'),
+    )
 
     def __repr__(self):
-        return f"<Enrollment user_id={self.user_id} course_id={self.course_id} progress={self.get_progress()}%>"
+        return f"<LessonCompletion user_id={self.user_id} lesson_id={self.lesson_id}>"
+
+class LessonFunnelStat(db.Model):
+    """
+    Bir dersi tamamlayan öğrenci sayısı (v7.1). Kurs hunisi bu tablodan
+    okunur; 'LessonCompletion' olayları sayacı artımlı olarak günceller.
+    """
+    __tablename__ = 'lesson_funnel_stat'
+    lesson_id = db.Column(db.Integer, db.ForeignKey('lesson.id', ondelete='CASCADE'), primary_key=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.id', ondelete='CASCADE'), nullable=False, index=True)
+    completion_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f"<LessonFunnelStat lesson_id={self.lesson_id} completions={self.completion_count}>"
+
+@event.listens_for(Lesson, 'before_insert')
+@event.listens_for(Lesson, 'before_update')
+def lesson_render_fields(mapper, connection, target):
+    """
+    Ders içeriği veya videoları değiştiğinde (ya da işleme kuralları
+    güncellendiğinde) temizlenmiş HTML'i ve video ID'lerini bir kez üretir.
+    """
+    from lesson_renderer import RENDER_VERSION, render_lesson
+    state = db.inspect(target)
+    changed = any(state.attrs[field].history.has_changes()
+                  for field in ('content', 'video_url', 'recommended_videos'))
+    if changed or target.render_version != RENDER_VERSION:
+        render_lesson(target)
+
+@event.listens_for(Lesson, 'after_insert')
+def lesson_increment_course_count(mapper, connection, target):
+    """Yeni bir ders eklendiğinde kursun 'lesson_count' sayacını bir artırır."""
+    course_table = Course.__table__
+    connection.execute(
+        course_table.update()
+        .where(course_table.c.id == target.course_id)
+        .values(lesson_count=course_table.c.lesson_count + 1)
+    )
+
+@event.listens_for(Lesson, 'after_insert')
+def lesson_create_funnel_stat(mapper, connection, target):
+    """Yeni ders için sıfır değerli huni sayacını oluşturur (tamamlamalar sadece UPDATE yapar)."""
+    connection.execute(LessonFunnelStat.__table__.insert().values(
+        lesson_id=target.id, course_id=target.course_id, completion_count=0))
+
+@event.listens_for(Lesson, 'after_delete')
+def lesson_decrement_course_count(mapper, connection, target):
+    """Bir ders silindiğinde kursun 'lesson_count' sayacını bir azaltır."""
+    course_table = Course.__table__
+    connection.execute(
+        course_table.update()
+        .where(course_table.c.id == target.course_id,
+               course_table.c.lesson_count > 0)
+        .values(lesson_count=course_table.c.lesson_count - 1)
+    )
+
+@event.listens_for(Lesson, 'after_update')
+def lesson_touch_course_outline(mapper, connection, target):
+    """
+    Ana hatta görünen bir alan (başlık, tip, sıra, kurs) değiştiğinde kursun
+    'updated_at' değerini yeniler; diğer süreçlerdeki ana hat önbelleği
+    ('academy_cache.get_course_outline') bu değere göre yenilenir.
+    """
+    state = db.inspect(target)
+    course_ids = {target.course_id}
+    course_history = state.attrs['course_id'].history
+    if course_history.has_changes():
+        course_ids.update(course_id for course_id in course_history.deleted if course_id is not None)
+    elif not any(state.attrs[field].history.has_changes() for field in ('title', 'lesson_type', 'order')):
+        return
+    course_table = Course.__table__
+    connection.execute(
+        course_table.update()
+        .where(course_table.c.id.in_(course_ids))
+        .values(updated_at=datetime.utcnow())
+    )
+
+@event.listens_for(Lesson, 'before_delete')
+def lesson_release_completions(mapper, connection, target):
+    """
+    Bir ders silinmeden önce, o dersi tamamlamış kayıtların sayaçlarını azaltır
+    ve tamamlama kayıtlarını siler. Böylece ilerleme yüzdesi tutarlı kalır.
+    """
+    completion_table = LessonCompletion.__table__
+    enrollment_table = Enrollment.__table__
+    completed_users = select(completion_table.c.user_id)\
+        .where(completion_table.c.lesson_id == target.id)
+    connection.execute(
+        enrollment_table.update()
+        .where(enrollment_table.c.course_id == target.course_id,
+               enrollment_table.c.user_id.in_(completed_users),
+               enrollment_table.c.completed_count > 0)
+        .values(completed_count=enrollment_table.c.completed_count - 1)
+    )
+    connection.execute(completion_table.delete().where(completion_table.c.lesson_id == target.id))
+    funnel_table = LessonFunnelStat.__table__
+    connection.execute(funnel_table.delete().where(funnel_table.c.lesson_id == target.id))
+
+@event.listens_for(LessonCompletion, 'after_insert')
+def completion_increment_funnel(mapper, connection, target):
+    """Bir ders tamamlandığında dersin huni sayacını bir artırır (satır yoksa oluşturur)."""
+    funnel_table = LessonFunnelStat.__table__
+    updated = connection.execute(
+        funnel_table.update()
+        .where(funnel_table.c.lesson_id == target.lesson_id)
+        .values(completion_count=funnel_table.c.completion_count + 1)
+    ).rowcount
+    if not updated:
+        connection.execute(funnel_table.insert().values(
+            lesson_id=target.lesson_id, course_id=target.course_id, completion_count=1))
+
+@event.listens_for(LessonCompletion, 'after_delete')
+def completion_decrement_funnel(mapper, connection, target):
+    """
+    Bir tamamlama kaydı silindiğinde dersin huni sayacını bir azaltır.
+    (Ders silinirken huni satırı 'lesson_release_completions' içinde zaten silinir;
+    kullanıcı silinirken azaltma 'user_release_enrollments' içinde yapılır.)
+    """
+    funnel_table = LessonFunnelStat.__table__
+    connection.execute(
+        funnel_table.update()
+        .where(funnel_table.c.lesson_id == target.lesson_id,
+               funnel_table.c.completion_count > 0)
+        .values(completion_count=funnel_table.c.completion_count - 1)
+    )
+
+@event.listens_for(Enrollment, 'after_insert')
+def enrollment_increment_course_count(mapper, connection, target):
+    """Yeni bir kayıt oluşturulduğunda kursun 'enrollment_count' sayacını bir artırır."""
+    course_table = Course.__table__
+    connection.execute(
+        course_table.update()
+        .where(course_table.c.id == target.course_id)
+        .values(enrollment_count=course_table.c.enrollment_count + 1,
+                # Kayıt sayısı katalog içeriği değildir; 'updated_at' (katalog sürümü) korunur
+                updated_at=course_table.c.updated_at)
+    )
+
+@event.listens_for(Enrollment, 'after_delete')
+def enrollment_decrement_course_count(mapper, connection, target):
+    """Bir kayıt silindiğinde kursun 'enrollment_count' sayacını bir azaltır."""
+    course_table = Course.__table__
+    connection.execute(
+        course_table.update()
+        .where(course_table.c.id == target.course_id,
+               course_table.c.enrollment_count > 0)
+        .values(enrollment_count=course_table.c.enrollment_count - 1,
+                # Kayıt sayısı katalog içeriği değildir; 'updated_at' (katalog sürümü) korunur
+                updated_at=course_table.c.updated_at)
+    )
+
+@event.listens_for(User, 'before_delete')
+def user_release_enrollments(mapper, connection, target):
+    """
+    Kullanıcının kayıtları ve ders tamamlamaları veritabanı tarafında
+    ('ON DELETE CASCADE') silineceği için 'Enrollment' / 'LessonCompletion'
+    olayları çalışmaz; kayıtlı olduğu kursların 'enrollment_count' ve
+    tamamladığı derslerin huni sayaçları burada tek sorguyla bir azaltılır.
+    """
+    course_table = Course.__table__
+    enrollment_table = Enrollment.__table__
+    enrolled_courses = select(enrollment_table.c.course_id)\
+        .where(enrollment_table.c.user_id == target.id)
+    connection.execute(
+        course_table.update()
+        .where(course_table.c.id.in_(enrolled_courses),
+               course_table.c.enrollment_count > 0)
+        .values(enrollment_count=course_table.c.enrollment_count - 1,
+                # Kayıt sayısı katalog içeriği değildir; 'updated_at' (katalog sürümü) korunur
+                updated_at=course_table.c.updated_at)
+    )
+    completion_table = LessonCompletion.__table__
+    funnel_table = LessonFunnelStat.__table__
+    completed_lessons = select(completion_table.c.lesson_id)\
+        .where(completion_table.c.user_id == target.id)
+    connection.execute(
+        funnel_table.update()
+        .where(funnel_table.c.lesson_id.in_(completed_lessons),
+               funnel_table.c.completion_count > 0)
+        .values(completion_count=funnel_table.c.completion_count - 1)
+    )
 
 class Quiz(db.Model):
     __tablename__ = 'quiz'
@@ -337,20 +590,102 @@ class Quiz(db.Model):
     title = db.Column(db.String(150), nullable=False)
     # Bir ders silinirse, quiz de silinsin
     lesson_id = db.Column(db.Integer, db.ForeignKey('lesson.id', ondelete='CASCADE'), unique=True, nullable=False)
-    # Soruları '[{"question": "...", "options": [...]}]' formatında JSON string olarak saklar
-    questions = db.Column(db.Text, nullable=False) 
+    # GÜNCELLEME (v7.1): Sorular artık tek bir JSON metni değil; 'QuizQuestion' ve
+    # 'QuizOption' tablolarında sıralı satırlar olarak tutulur. Soru sayısı, 'QuizQuestion'
+    # olaylarıyla güncel tutulan bir sayaçtır (JSON parse etmeden okunur).
+    question_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # 'lesson' ilişkisi (Lesson modelinde backref ile tanımlandı)
-    attempts = db.relationship('QuizAttempt', backref='quiz', lazy='dynamic', cascade="all, delete-orphan")
+    attempts = db.relationship('QuizAttempt', backref='quiz', lazy='dynamic', cascade="all, delete-orphan", passive_deletes=True)
+    # Bir quiz silinirse, soruları (ve seçenekleri) de silinsin
+    questions = db.relationship('QuizQuestion', backref='quiz', lazy='dynamic',
+                                order_by='QuizQuestion.position', cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
-        try:
-            question_count = len(json.loads(self.questions))
-        except:
-            question_count = 0
-        return f"<Quiz id={self.id} title='{self.title}' questions={question_count}>"
+        return f"<Quiz id={self.id} title='{self.title}' questions={self.question_count}>"
+
+class QuizQuestion(db.Model):
+    """Bir quizin tek bir sorusu (v7.1). 'position' quiz içindeki sırasıdır (0'dan başlar)."""
+    __tablename__ = 'quiz_question'
+    id = db.Column(db.Integer, primary_key=True)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='CASCADE'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    text = db.Column(db.Text, nullable=False)
+    # Doğru seçeneğin 'QuizOption.position' değeri
+    correct_index = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Bir soru silinirse, seçenekleri de silinsin
+    options = db.relationship('QuizOption', backref='question', order_by='QuizOption.position',
+                              cascade="all, delete-orphan", passive_deletes=True)
+
+    # Bir quiz içinde aynı sırada tek bir soru olabilir (kısıtın indeksi soruları sırayla getirir)
+    __table_args__ = (db.UniqueConstraint('quiz_id', 'position', name='uq_quiz_question_position'),)
+
+    @classmethod
+    def from_dict(cls, position, data):
+        """'{"question", "options", "correct_index"}' sözlüğünden soru ve seçeneklerini oluşturur."""
+        return cls(position=position,
+                   text=data['question'],
+                   correct_index=int(data.get('correct_index', 0)),
+                   options=[QuizOption(position=i, text=str(text)) for i, text in enumerate(data['options'])])
+
+    @classmethod
+    def from_dicts(cls, questions):
+        """Soru sözlükleri listesinden sıralı 'QuizQuestion' listesi oluşturur."""
+        return [cls.from_dict(position, data) for position, data in enumerate(questions)]
+
+    def __repr__(self):
+        return f"<QuizQuestion id={self.id} quiz_id={self.quiz_id} position={self.position}>"
+
+class QuizOption(db.Model):
+    """Bir sorunun tek bir seçeneği (v7.1)."""
+    __tablename__ = 'quiz_option'
+    id = db.Column(db.Integer, primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('quiz_question.id', ondelete='CASCADE'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    text = db.Column(db.Text, nullable=False)
+
+    __table_args__ = (db.UniqueConstraint('question_id', 'position', name='uq_quiz_option_position'),)
+
+    def __repr__(self):
+        return f"<QuizOption id={self.id} question_id={self.question_id} position={self.position}>"
+
+@event.listens_for(QuizQuestion, 'after_insert')
+def question_increment_quiz_count(mapper, connection, target):
+    """Yeni soru eklendiğinde quizin 'question_count' sayacını artırır ('updated_at' da güncellenir)."""
+    quiz_table = Quiz.__table__
+    connection.execute(
+        quiz_table.update()
+        .where(quiz_table.c.id == target.quiz_id)
+        .values(question_count=quiz_table.c.question_count + 1)
+    )
+
+@event.listens_for(QuizQuestion, 'after_delete')
+def question_decrement_quiz_count(mapper, connection, target):
+    """Bir soru silindiğinde quizin 'question_count' sayacını azaltır ('updated_at' da güncellenir)."""
+    quiz_table = Quiz.__table__
+    connection.execute(
+        quiz_table.update()
+        .where(quiz_table.c.id == target.quiz_id,
+               quiz_table.c.question_count > 0)
+        .values(question_count=quiz_table.c.question_count - 1)
+    )
+
+@event.listens_for(QuizQuestion, 'after_update')
+def question_touch_quiz(mapper, connection, target):
+    """
+    Bir soru düzenlendiğinde quizin 'updated_at' değerini yeniler; derlenmiş
+    quiz önbelleği ve madde analizi raporu bu değere göre yenilenir.
+    """
+    quiz_table = Quiz.__table__
+    connection.execute(
+        quiz_table.update()
+        .where(quiz_table.c.id == target.quiz_id)
+        .values(updated_at=datetime.utcnow())
+    )
 
 class QuizAttempt(db.Model):
     __tablename__ = 'quiz_attempt'
@@ -361,6 +696,10 @@ class QuizAttempt(db.Model):
     score = db.Column(db.Integer, nullable=False)
     total_questions = db.Column(db.Integer, nullable=False)
     date_attempted = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # Soru başına seçilen ORİJİNAL seçenek indeksleri (int16, paketlenmiş; -1 = cevapsız).
+    # 'grading_engine' ile yazılır/okunur ve cevap anahtarı düzeltildiğinde yeniden
+    # puanlamayı mümkün kılar. v7.1 öncesi denemelerde boştur (NULL).
+    answers = db.Column(db.LargeBinary, nullable=True)
 
     # 'user' ve 'quiz' ilişkileri (User ve Quiz modellerinde backref ile tanımlandı)
 
@@ -372,6 +711,27 @@ class QuizAttempt(db.Model):
     def __repr__(self):
         return f"<QuizAttempt user_id={self.user_id} quiz_id={self.quiz_id} score={self.score}/{self.total_questions}>"
 
+class SalesDailyRollup(db.Model):
+    """
+    Personel başına günlük satış özeti (v7.1). Raporlar 'sale' tablosunu taramak
+    yerine bu tabloyu okur. 'day', satışın İstanbul saatine göre günüdür.
+    'Sale' / 'Commission' olaylarıyla aynı işlemde güncellenir (bkz. 'sales_rollup.py');
+    'flask rollups rebuild' ile baştan hesaplanır.
+    """
+    __tablename__ = 'sales_daily_rollup'
+    # Personel silinirse satışlarıyla birlikte özet satırları da silinir ('ON DELETE CASCADE')
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True, autoincrement=False)
+    day = db.Column(db.Date, primary_key=True)
+    amount = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    sale_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    commission = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+
+    # Şirket geneli (tüm personel) tarih aralığı sorguları için
+    __table_args__ = (db.Index('ix_sales_daily_rollup_day', 'day'),)
+
+    def __repr__(self):
+        return f"<SalesDailyRollup user_id={self.user_id} day={self.day} amount={self.amount:.2f} count={self.sale_count}>"
+
 # ==========================================================================
 # SİTE İÇİ AKTİVİTE KAYDI (ACTIVITY LOG)
 # (Değişiklik Gerekmiyor - v5.0 ile uyumlu)
@@ -379,8 +739,8 @@ class QuizAttempt(db.Model):
 class ActivityLog(db.Model):
     __tablename__ = 'activity_log'
     id = db.Column(db.Integer, primary_key=True)
-    # Kullanıcı silinirse log kalsın, sadece user_id null olsun
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'), nullable=True, index=True)
+    # GÜNCELLEME (v7.1): Kullanıcı silinirse logları da veritabanı tarafında silinir ('ON DELETE CASCADE')
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=True, index=True)
     action = db.Column(db.String(500), nullable=False)
     target_type = db.Column(db.String(50), index=True) # Örn: 'Course', 'User', 'Sale'
     target_id = db.Column(db.Integer, index=True) # Örn: Course ID'si
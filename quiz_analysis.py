@@ -0,0 +1,158 @@
+import math
+import threading
+from collections import namedtuple, OrderedDict
+from sqlalchemy import func
+from extensions import db
+import grading_engine
+
+# ===================================================================
+# KUWAMEDYA - QUIZ MADDE ANALİZİ RAPORU (quiz_analysis.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, EĞİTMENLERİN HATALI VEYA İŞLEVSİZ SORULARI BULMASI İÇİN
+# BİR QUIZİN TÜM DENEMELERİ ÜZERİNDEN MADDE ANALİZİ RAPORU HAZIRLAR.
+#
+# 1.  HESAPLAMA:
+#     - Denemelerin paketlenmiş cevapları ('QuizAttempt.answers') tek
+#       sorguda okunur ve tek bir NumPy matrisine dönüştürülür.
+#     - İstatistikler 'grading_engine.item_analysis' ile vektörel olarak
+#       hesaplanır (yüz binlerce deneme saniyeler içinde işlenir).
+#
+# 2.  ÖNBELLEK:
+#     - Rapor; (quiz.updated_at, cevaplı deneme sayısı, son deneme id)
+#       sürümüyle saklanır. Yeni bir deneme geldiğinde veya quiz
+#       düzenlendiğinde sürüm değişir ve rapor yeniden hesaplanır.
+#       Sürüm kontrolü, 'quiz_id' indeksini kullanan tek bir sorgudur.
+# ===================================================================
+
+# Sorun işaretleme eşikleri (klasik test kuramı yaygın kabulleri)
+TOO_EASY = 0.90
+TOO_HARD = 0.20
+LOW_DISCRIMINATION = 0.20
+WEAK_DISTRACTOR_SHARE = 0.05
+# Bundan az denemede uyarı üretilmez (küçük örneklemde istatistikler yanıltıcıdır)
+MIN_FLAG_ATTEMPTS = 10
+
+OptionStat = namedtuple('OptionStat', ['index', 'text', 'count', 'share', 'upper', 'lower', 'is_correct'])
+
+QuestionReport = namedtuple('QuestionReport', [
+    'index', 'text', 'difficulty', 'discrimination', 'point_biserial',
+    'unanswered', 'options', 'flags'])
+
+QuizReport = namedtuple('QuizReport', [
+    'quiz_id', 'attempts', 'legacy_attempts', 'mean_score', 'score_std', 'question_count', 'questions'])
+
+
+def _attempt_version(quiz_id):
+    """Cevabı saklanan denemelerin (sayı, son id) sürümü ve eski (cevapsız) deneme sayısı."""
+    from models import QuizAttempt
+    with_answers, last_id, total = db.session.query(
+        func.count(QuizAttempt.answers), func.max(QuizAttempt.id), func.count(QuizAttempt.id),
+    ).filter(QuizAttempt.quiz_id == quiz_id).one()
+    return (with_answers, last_id), total - with_answers
+
+
+def _load_answer_matrix(quiz_id, question_count):
+    from models import QuizAttempt
+    rows = db.session.query(QuizAttempt.answers)\
+        .filter(QuizAttempt.quiz_id == quiz_id, QuizAttempt.answers.isnot(None))\
+        .all()
+    return grading_engine.answer_matrix([row.answers for row in rows], question_count)
+
+
+def _flags(difficulty, discrimination, options, attempts):
+    """Bir soru için eğitmene gösterilecek uyarıları üretir."""
+    flags = []
+    if attempts < MIN_FLAG_ATTEMPTS:
+        return flags
+    if difficulty >= TOO_EASY:
+        flags.append('Çok kolay')
+    elif difficulty <= TOO_HARD:
+        flags.append('Çok zor (cevap anahtarını kontrol edin)')
+    if discrimination < 0:
+        flags.append('Negatif ayırt edicilik')
+    elif discrimination < LOW_DISCRIMINATION:
+        flags.append('Düşük ayırt edicilik')
+    for option in options:
+        if option.is_correct:
+            continue
+        if option.upper > option.lower and option.upper > 0:
+            flags.append(f"'{option.text}' çeldiricisi üst grubu daha çok çekiyor")
+        elif option.share < WEAK_DISTRACTOR_SHARE:
+            flags.append(f"'{option.text}' çeldiricisi neredeyse hiç seçilmiyor")
+    return flags
+
+
+def _build_report(quiz_id, compiled, legacy_attempts):
+    questions = compiled.questions
+    option_counts = [len(q.get('options') or []) if isinstance(q, dict) else 0 for q in questions]
+    matrix = _load_answer_matrix(quiz_id, len(questions))
+    stats = grading_engine.item_analysis(compiled.answer_key, matrix, option_counts)
+    attempts = stats.attempts
+    correct_indexes = compiled.answer_key.correct
+
+    reports = []
+    for i, question in enumerate(questions):
+        texts = (question.get('options') or []) if isinstance(question, dict) else []
+        options = tuple(
+            OptionStat(index=j, text=str(text),
+                       count=int(stats.option_frequency[i, j + 1]),
+                       share=float(stats.option_frequency[i, j + 1] / attempts) if attempts else 0.0,
+                       upper=int(stats.upper_frequency[i, j + 1]),
+                       lower=int(stats.lower_frequency[i, j + 1]),
+                       is_correct=j == int(correct_indexes[i]))
+            for j, text in enumerate(texts))
+        difficulty = float(stats.difficulty[i])
+        discrimination = float(stats.discrimination[i])
+        point_biserial = float(stats.point_biserial[i])
+        reports.append(QuestionReport(
+            index=i,
+            text=question.get('question', '') if isinstance(question, dict) else '',
+            difficulty=difficulty,
+            discrimination=discrimination,
+            point_biserial=None if math.isnan(point_biserial) else point_biserial,
+            unanswered=int(stats.option_frequency[i, 0]),
+            options=options,
+            flags=tuple(_flags(difficulty, discrimination, options, attempts))))
+
+    return QuizReport(quiz_id=quiz_id, attempts=attempts, legacy_attempts=legacy_attempts,
+                      mean_score=stats.mean_score, score_std=stats.score_std,
+                      question_count=len(questions), questions=tuple(reports))
+
+
+# ===================================================================
+# RAPOR ÖNBELLEĞİ
+# ===================================================================
+REPORT_CACHE_SIZE = 64
+
+_report_lock = threading.Lock()
+_report_cache = OrderedDict()
+
+
+def get_item_analysis(quiz):
+    """
+    Quizin madde analizi raporunu önbellekten döndürür; yeni deneme
+    geldiyse veya quiz düzenlendiyse yeniden hesaplar.
+    """
+    from academy_cache import get_compiled_quiz
+    attempt_version, legacy_attempts = _attempt_version(quiz.id)
+    version = (quiz.updated_at, attempt_version)
+    with _report_lock:
+        cached = _report_cache.get(quiz.id)
+        if cached is not None and cached[0] == version:
+            _report_cache.move_to_end(quiz.id)
+            return cached[1]
+
+    report = _build_report(quiz.id, get_compiled_quiz(quiz), legacy_attempts)
+    with _report_lock:
+        _report_cache[quiz.id] = (version, report)
+        _report_cache.move_to_end(quiz.id)
+        while len(_report_cache) > REPORT_CACHE_SIZE:
+            _report_cache.popitem(last=False)
+    return report
+
+
+def invalidate_item_analysis(quiz_id):
+    """Bir quizin madde analizi önbelleğini temizler (quiz silme sonrası)."""
+    with _report_lock:
+        _report_cache.pop(quiz_id, None)
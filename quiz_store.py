@@ -0,0 +1,135 @@
+from datetime import datetime
+from sqlalchemy import func
+from extensions import db
+from grading_engine import ANSWER_DTYPE, drop_answer
+
+# ===================================================================
+# KUWAMEDYA - QUIZ SORU DEPOSU (quiz_store.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, 'QuizQuestion' / 'QuizOption' TABLOLARINI OKUYAN VE YAZAN
+# TEK MERKEZDİR.
+#
+# 1.  OKUMA:
+#     - 'load_question_dicts' bir quizin tüm sorularını ve seçeneklerini
+#       yalnızca gereken sütunlarla TEK sorguda okur ve 'grading_engine' /
+#       'quiz.html' tarafından beklenen sözlük listesine çevirir.
+#
+# 2.  YAZMA:
+#     - Tek bir soru eklenir, güncellenir veya silinir; quizin diğer
+#       soruları okunmaz veya yeniden yazılmaz.
+#     - Seçenekler sıra numarasıyla yerinde güncellenir (benzersiz sıra
+#       kısıtı ile çakışmamak için önce silip sonra ekleme yapılmaz).
+#     - Soru silindiğinde diğer soruların sırası kaydırılmaz; sıralama
+#       'position' değerine göre yapıldığından boşluklar sorun değildir.
+#     - Denemelerin paketlenmiş cevapları ('QuizAttempt.answers') soru
+#       sırasına göre dizinlendiği için, silinen sorunun cevabı AYNI işlem
+#       içinde tüm denemelerden çıkarılır; sonraki cevaplar kaymaz.
+#       Skorlar 'flask quizzes regrade' ile yeniden hesaplanır.
+#     - Soru ekleme/silme/düzenleme, 'models.py' olayları üzerinden
+#       'Quiz.question_count' ve 'Quiz.updated_at' alanlarını günceller.
+# ===================================================================
+
+# Soru silinirken cevapları tek seferde yeniden yazılacak deneme sayısı
+ANSWER_REMAP_CHUNK = 1000
+
+
+def load_question_dicts(quiz_id):
+    """Quizin sorularını '{"id", "question", "options", "correct_index"}' listesi olarak döndürür."""
+    from models import QuizQuestion, QuizOption
+    rows = db.session.query(
+        QuizQuestion.id, QuizQuestion.text, QuizQuestion.correct_index, QuizOption.text.label('option_text'),
+    ).outerjoin(QuizOption, QuizOption.question_id == QuizQuestion.id)\
+     .filter(QuizQuestion.quiz_id == quiz_id)\
+     .order_by(QuizQuestion.position.asc(), QuizOption.position.asc())\
+     .all()
+
+    questions = []
+    current = None
+    for row in rows:
+        if current is None or current['id'] != row.id:
+            current = {"id": row.id, "question": row.text, "options": [], "correct_index": row.correct_index}
+            questions.append(current)
+        if row.option_text is not None:
+            current["options"].append(row.option_text)
+    return questions
+
+
+def _next_position(quiz_id):
+    from models import QuizQuestion
+    last = db.session.query(func.max(QuizQuestion.position)).filter(QuizQuestion.quiz_id == quiz_id).scalar()
+    return 0 if last is None else last + 1
+
+
+def add_question(quiz, text, options, correct_index):
+    """Quizin sonuna yeni bir soru ekler ve soruyu döndürür."""
+    from models import QuizQuestion
+    question = QuizQuestion.from_dict(_next_position(quiz.id), {
+        "question": text, "options": options, "correct_index": correct_index})
+    question.quiz_id = quiz.id
+    db.session.add(question)
+    return question
+
+
+def update_question(question, text, options, correct_index):
+    """Tek bir sorunun metnini, seçeneklerini ve doğru cevabını günceller."""
+    from models import QuizOption
+    question.text = text
+    question.correct_index = int(correct_index)
+    existing = list(question.options)
+    for position, option_text in enumerate(options):
+        if position < len(existing):
+            existing[position].text = str(option_text)
+        else:
+            question.options.append(QuizOption(position=position, text=str(option_text)))
+    for option in existing[len(options):]:
+        question.options.remove(option)
+    # Yalnızca seçenekler değişse bile sorunun (ve quizin) 'updated_at' değeri yenilenir
+    question.updated_at = datetime.utcnow()
+    return question
+
+
+def _question_ordinal(question):
+    """Sorunun quiz içindeki sırası (0'dan başlar); paketlenmiş cevaplardaki dizinidir."""
+    from models import QuizQuestion
+    return db.session.query(func.count(QuizQuestion.id))\
+        .filter(QuizQuestion.quiz_id == question.quiz_id, QuizQuestion.position < question.position)\
+        .scalar()
+
+
+def _drop_attempt_answers(quiz_id, ordinal, chunk_size=ANSWER_REMAP_CHUNK):
+    """Quizin tüm denemelerinin paketlenmiş cevaplarından 'ordinal' sıradaki cevabı çıkarır."""
+    from models import QuizAttempt
+    last_id = 0
+    while True:
+        rows = db.session.query(QuizAttempt.id, QuizAttempt.answers)\
+            .filter(QuizAttempt.quiz_id == quiz_id, QuizAttempt.id > last_id,
+                    QuizAttempt.answers.isnot(None))\
+            .order_by(QuizAttempt.id).limit(chunk_size).all()
+        if not rows:
+            break
+        updates = [{'id': row.id, 'answers': drop_answer(row.answers, ordinal)}
+                   for row in rows if len(row.answers) > ordinal * ANSWER_DTYPE.itemsize]
+        if updates:
+            db.session.bulk_update_mappings(QuizAttempt, updates)
+        last_id = rows[-1].id
+
+
+def delete_question(question):
+    """
+    Tek bir soruyu (ve seçeneklerini) siler; denemelerin paketlenmiş
+    cevaplarından o sorunun cevabını aynı işlem içinde çıkarır.
+    """
+    _drop_attempt_answers(question.quiz_id, _question_ordinal(question))
+    db.session.delete(question)
+
+
+def replace_questions(quiz, questions):
+    """Quizin tüm sorularını verilen sözlük listesiyle değiştirir (toplu içe aktarma için)."""
+    from models import QuizQuestion
+    for question in quiz.questions.all():
+        db.session.delete(question)
+    db.session.flush()
+    for question in QuizQuestion.from_dicts(questions):
+        question.quiz_id = quiz.id
+        db.session.add(question)
@@ -0,0 +1,337 @@
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from dateutil import tz
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+
+# ===================================================================
+# KUWAMEDYA - GÜNLÜK SATIŞ ÖZETİ (sales_rollup.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, 'sales_daily_rollup' TABLOSUNU (personel + gün başına satış
+# tutarı, adedi ve prim toplamı) VE 'User' ÜZERİNDEKİ ÇALIŞAN TOPLAMLARI
+# ('sales_total', 'sales_count', 'commission_total') GÜNCEL TUTAR.
+#
+# 1.  ARTIMLI GÜNCELLEME:
+#     - 'Sale' ve 'Commission' ORM olayları (insert/update/delete), ilgili
+#       (user_id, gün) satırını AYNI işlem içinde 'upsert' ile günceller
+#       ('INSERT ... ON CONFLICT DO UPDATE SET amount = amount + ...').
+#       Aynı olay, personelin 'User' satırındaki toplamları da artırır /
+#       azaltır; 'new_sale' rotası ve prim motoru ek bir şey yapmaz.
+#     - Toplu prim yeniden hesaplama (Core 'upsert', olay tetiklemez) farkları
+#       'add_commission_changes' ile aynı işlem içinde yansıtır.
+#     - Gün, satış zamanının (UTC) İstanbul saatine çevrilmiş halidir.
+#     - Personeli olmayan satışlar özete yazılmaz. Bir personel silinirken
+#       satışları, primleri ve özet satırları veritabanı tarafında silinir
+#       ('ON DELETE CASCADE').
+#
+# 2.  RAPORLAMA:
+#     - Panel kartları ve satış grafikleri bu tablodan okunur; maliyet satış
+#       sayısına değil gün sayısına bağlıdır.
+#     - Profil toplamları doğrudan 'User' satırından okunur (sorgu yok).
+#
+# 3.  YENİDEN HESAPLAMA ('flask rollups rebuild'):
+#     - Tablo boşaltılır ve satışlar id sırasıyla 'REBUILD_CHUNK'lık
+#       gruplar halinde okunup eklenir (tüm satışlar belleğe alınmaz).
+#     - ORM dışı (Core) toplu satış yazan işlemlerden sonra çalıştırılmalıdır.
+#       Personel toplamları da özet tablosundan yeniden yazılır.
+#
+# 4.  MUTABAKAT ('flask rollups reconcile', her gece çalıştırılması önerilir):
+#     - Saklanan personel toplamları 'sale' ve 'commission' tablolarından
+#       hesaplanan gerçek değerlerle karşılaştırılır, sapmalar raporlanır.
+#       '--fix' ile saklanan değerler düzeltilir.
+# ===================================================================
+
+LOCAL_TZ = tz.gettz('Europe/Istanbul')
+REBUILD_CHUNK = 5000
+# Kayan nokta toplamlarında sapma sayılmayacak fark (kuruş altı)
+DRIFT_TOLERANCE = 0.005
+
+UserTotalsDrift = namedtuple('UserTotalsDrift', ['user_id', 'username', 'stored', 'actual'])
+
+
+def local_today():
+    """İstanbul saatine göre bugünün tarihi."""
+    return datetime.now(LOCAL_TZ).date()
+
+
+def local_day(moment):
+    """Veritabanındaki naive UTC zamanın İstanbul saatine göre günü."""
+    return (moment or datetime.utcnow()).replace(tzinfo=tz.UTC).astimezone(LOCAL_TZ).date()
+
+
+def _rollup_key(user_id, moment):
+    return (user_id, local_day(moment))
+
+
+def _upsert_add(connection, rows):
+    """
+    {'user_id', 'day', 'amount', 'sale_count', 'commission'} satırlarını mevcut
+    değerlere EKLER (satır yoksa oluşturur).
+    """
+    from models import SalesDailyRollup
+    if not rows:
+        return
+    table = SalesDailyRollup.__table__
+    dialect = {'sqlite': sqlite, 'postgresql': postgresql}.get(connection.dialect.name)
+    if dialect is not None:
+        statement = dialect.insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=['user_id', 'day'],
+            set_={column: table.c[column] + statement.excluded[column]
+                  for column in ('amount', 'sale_count', 'commission')})
+        connection.execute(statement, rows)
+        return
+
+    # Diğer veritabanları: önce UPDATE, satır yoksa INSERT
+    for row in rows:
+        updated = connection.execute(
+            table.update()
+            .where(table.c.user_id == row['user_id'], table.c.day == row['day'])
+            .values(amount=table.c.amount + row['amount'],
+                    sale_count=table.c.sale_count + row['sale_count'],
+                    commission=table.c.commission + row['commission'])
+        ).rowcount
+        if not updated:
+            connection.execute(table.insert().values(**row))
+
+
+def _add_user_totals(connection, user_id, amount=0.0, count=0, commission=0.0):
+    """Personelin 'User' satırındaki çalışan toplamlarını günceller."""
+    from models import User
+    user_table = User.__table__
+    connection.execute(
+        user_table.update()
+        .where(user_table.c.id == user_id)
+        .values(sales_total=user_table.c.sales_total + amount,
+                sales_count=user_table.c.sales_count + count,
+                commission_total=user_table.c.commission_total + commission)
+    )
+
+
+def add_commission_changes(connection, changes):
+    """
+    ORM olaylarını atlayan toplu (Core) prim yazımları için özet tablosunu ve
+    personel toplamlarını günceller. 'changes': (user_id, date_posted, fark) üçlüleri.
+    """
+    by_key = defaultdict(float)
+    for user_id, moment, delta in changes:
+        if delta and user_id is not None:
+            by_key[_rollup_key(user_id, moment)] += delta
+    _upsert_add(connection, [{'user_id': user_id, 'day': day, 'amount': 0.0, 'sale_count': 0, 'commission': delta}
+                             for (user_id, day), delta in by_key.items()])
+    by_user = defaultdict(float)
+    for (user_id, _), delta in by_key.items():
+        by_user[user_id] += delta
+    for user_id, delta in by_user.items():
+        _add_user_totals(connection, user_id, commission=delta)
+
+
+def _add(connection, key, amount=0.0, count=0, commission=0.0):
+    user_id, day = key
+    if user_id is None:
+        return  # Personeli olmayan satış özete yazılmaz
+    amount, commission = amount or 0.0, commission or 0.0
+    _upsert_add(connection, [{'user_id': user_id, 'day': day, 'amount': amount,
+                              'sale_count': count, 'commission': commission}])
+    _add_user_totals(connection, user_id, amount, count, commission)
+
+
+def _sale_key(connection, sale_id):
+    """Bir satışın özet anahtarını veritabanından okur (prim olayları için)."""
+    from models import Sale
+    sale_table = Sale.__table__
+    row = connection.execute(select(sale_table.c.user_id, sale_table.c.date_posted)
+                             .where(sale_table.c.id == sale_id)).first()
+    return _rollup_key(row.user_id, row.date_posted) if row else None
+
+
+def _sale_commission(connection, sale_id):
+    from models import Commission
+    commission_table = Commission.__table__
+    return connection.execute(select(commission_table.c.amount)
+                              .where(commission_table.c.sale_id == sale_id)).scalar() or 0.0
+
+
+def _old_value(state, field):
+    """Değişmeden önceki değer (değişmediyse mevcut değer)."""
+    history = state.attrs[field].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.object, field)
+
+
+# ===================================================================
+# ORM OLAYLARI
+# ===================================================================
+def _on_sale_inserted(mapper, connection, target):
+    _add(connection, _rollup_key(target.user_id, target.date_posted), amount=target.amount, count=1)
+
+
+def _on_sale_updated(mapper, connection, target):
+    state = db.inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in ('amount', 'user_id', 'date_posted')):
+        return
+    old_key = _rollup_key(_old_value(state, 'user_id'), _old_value(state, 'date_posted'))
+    new_key = _rollup_key(target.user_id, target.date_posted)
+    old_amount = _old_value(state, 'amount')
+    if old_key == new_key:
+        _add(connection, new_key, amount=target.amount - old_amount)
+        return
+    # Satış başka bir güne/personele taşındı: primiyle birlikte eski satırdan düş, yenisine ekle
+    commission = _sale_commission(connection, target.id)
+    _add(connection, old_key, amount=-old_amount, count=-1, commission=-commission)
+    _add(connection, new_key, amount=target.amount, count=1, commission=commission)
+
+
+def _on_sale_deleted(mapper, connection, target):
+    # Primin payı 'Commission' silme olayında düşülür ('Sale.commission' cascade)
+    _add(connection, _rollup_key(target.user_id, target.date_posted), amount=-target.amount, count=-1)
+
+
+def _on_commission_inserted(mapper, connection, target):
+    key = _sale_key(connection, target.sale_id)
+    if key is not None:
+        _add(connection, key, commission=target.amount)
+
+
+def _on_commission_updated(mapper, connection, target):
+    state = db.inspect(target)
+    if not state.attrs['amount'].history.has_changes():
+        return
+    key = _sale_key(connection, target.sale_id)
+    if key is not None:
+        _add(connection, key, commission=target.amount - _old_value(state, 'amount'))
+
+
+def _on_commission_deleted(mapper, connection, target):
+    key = _sale_key(connection, target.sale_id)
+    if key is not None:
+        _add(connection, key, commission=-target.amount)
+
+
+def register_events():
+    """'Sale' ve 'Commission' ORM olaylarını özet tablosuna bağlar (birden çok çağrı güvenlidir)."""
+    from models import Sale, Commission
+    listeners = (
+        (Sale, 'after_insert', _on_sale_inserted),
+        (Sale, 'after_update', _on_sale_updated),
+        (Sale, 'after_delete', _on_sale_deleted),
+        (Commission, 'after_insert', _on_commission_inserted),
+        (Commission, 'after_update', _on_commission_updated),
+        (Commission, 'after_delete', _on_commission_deleted),
+    )
+    for model, name, listener in listeners:
+        if not event.contains(model, name, listener):
+            event.listen(model, name, listener)
+
+
+# ===================================================================
+# YENİDEN HESAPLAMA
+# ===================================================================
+def rebuild(chunk_size=REBUILD_CHUNK):
+    """
+    Özet tablosunu ve personel toplamlarını tüm satışlardan yeniden hesaplar
+    (commit çağırana aittir). İşlenen satış sayısını döndürür.
+    """
+    from models import Sale, Commission, SalesDailyRollup
+    connection = db.session.connection()
+    connection.execute(SalesDailyRollup.__table__.delete())
+
+    total = 0
+    last_id = 0
+    while True:
+        # Anahtar (id) tabanlı sayfalama: her grup tek bir indeksli sorgudur
+        rows = db.session.query(Sale.id, Sale.user_id, Sale.date_posted, Sale.amount, Commission.amount)\
+            .outerjoin(Commission, Commission.sale_id == Sale.id)\
+            .filter(Sale.id > last_id, Sale.user_id.isnot(None))\
+            .order_by(Sale.id.asc())\
+            .limit(chunk_size).all()
+        if not rows:
+            break
+        totals = defaultdict(lambda: [0.0, 0, 0.0])
+        for sale_id, user_id, date_posted, amount, commission in rows:
+            bucket = totals[_rollup_key(user_id, date_posted)]
+            bucket[0] += amount or 0.0
+            bucket[1] += 1
+            bucket[2] += commission or 0.0
+        _upsert_add(connection, [{'user_id': user_id, 'day': day, 'amount': amount,
+                                  'sale_count': count, 'commission': commission}
+                                 for (user_id, day), (amount, count, commission) in totals.items()])
+        total += len(rows)
+        last_id = rows[-1][0]
+
+    _write_user_totals_from_rollup(connection)
+    return total
+
+
+def _write_user_totals_from_rollup(connection):
+    """'User' toplamlarını özet tablosundan tek UPDATE ile yeniden yazar."""
+    from models import User, SalesDailyRollup
+    user_table = User.__table__
+    rollup_table = SalesDailyRollup.__table__
+
+    def user_sum(column):
+        return select(func.coalesce(func.sum(column), 0))\
+            .where(rollup_table.c.user_id == user_table.c.id)\
+            .scalar_subquery()
+
+    connection.execute(user_table.update().values(
+        sales_total=user_sum(rollup_table.c.amount),
+        sales_count=user_sum(rollup_table.c.sale_count),
+        commission_total=user_sum(rollup_table.c.commission),
+    ))
+
+
+# ===================================================================
+# MUTABAKAT
+# ===================================================================
+def _drifted(stored, actual):
+    return (abs(stored[0] - actual[0]) > DRIFT_TOLERANCE or stored[1] != actual[1]
+            or abs(stored[2] - actual[2]) > DRIFT_TOLERANCE)
+
+
+def reconcile_user_totals(fix=False):
+    """
+    Saklanan personel toplamlarını 'sale' ve 'commission' tablolarıyla
+    karşılaştırır. Sapan her kullanıcı için 'UserTotalsDrift' döndürür
+    ('stored' / 'actual' = (tutar, adet, prim)). 'fix' verilirse saklanan
+    değerler gerçek değerlerle değiştirilir (commit çağırana aittir).
+    """
+    from models import User, Sale, Commission
+    actual = defaultdict(lambda: [0.0, 0, 0.0])
+    # Kaynak tablolardan personel başına iki gruplanmış sorgu (kullanıcı başına sorgu yok)
+    sales = db.session.query(Sale.user_id, func.sum(Sale.amount), func.count(Sale.id))\
+        .filter(Sale.user_id.isnot(None)).group_by(Sale.user_id)
+    for user_id, amount, count in sales:
+        actual[user_id][0] = float(amount or 0.0)
+        actual[user_id][1] = count
+    commissions = db.session.query(Sale.user_id, func.sum(Commission.amount))\
+        .join(Commission, Commission.sale_id == Sale.id)\
+        .filter(Sale.user_id.isnot(None)).group_by(Sale.user_id)
+    for user_id, commission in commissions:
+        actual[user_id][2] = float(commission or 0.0)
+
+    columns = (User.id, User.username, User.sales_total, User.sales_count, User.commission_total)
+    stored_rows = db.session.query(*columns)\
+        .filter((User.sales_count != 0) | (User.sales_total != 0) | (User.commission_total != 0)).all()
+    # Satışı olduğu halde toplamı sıfır görünen kullanıcılar (sapma varsa az sayıdadır)
+    missing = set(actual) - {row[0] for row in stored_rows}
+    if missing:
+        stored_rows += db.session.query(*columns).filter(User.id.in_(missing)).all()
+
+    drifts = []
+    for user_id, username, sales_total, sales_count, commission_total in stored_rows:
+        stored = (sales_total or 0.0, sales_count or 0, commission_total or 0.0)
+        expected = tuple(actual.get(user_id, (0.0, 0, 0.0)))
+        if _drifted(stored, expected):
+            drifts.append(UserTotalsDrift(user_id, username, stored, expected))
+
+    if fix and drifts:
+        user_table = User.__table__
+        connection = db.session.connection()
+        for drift in drifts:
+            connection.execute(user_table.update().where(user_table.c.id == drift.user_id).values(
+                sales_total=drift.actual[0], sales_count=drift.actual[1], commission_total=drift.actual[2]))
+    return drifts
@@ -0,0 +1,142 @@
+from collections import namedtuple
+from datetime import date, timedelta
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import func
+from extensions import db
+from sales_rollup import local_today
+
+# ===================================================================
+# KUWAMEDYA - SATIŞ ZAMAN SERİSİ (sales_series.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, SATIŞ TUTARLARINI VE ADETLERİNİ GÜN / HAFTA / AY
+# DİLİMLERİNE (BUCKET) AYIRAN GENEL ZAMAN SERİSİ SERVİSİDİR.
+# Profil ve yönetici paneli grafikleri veriyi
+# '/admin/api/sales-series' üzerinden sonradan (lazy) yükler.
+#
+# 1.  TEK SORGU (GÜNLÜK ÖZET TABLOSU):
+#     - Aralıktaki günlük toplamlar 'sales_daily_rollup' tablosundan TEK
+#       bir 'GROUP BY day' ile okunur; maliyet satış sayısına değil gün
+#       sayısına bağlıdır. Günler Python'da hafta/ay dilimlerine toplanır.
+#
+# 2.  SAAT DİLİMİ:
+#     - Özet tablosundaki günler, UTC saklanan 'Sale.date_posted'
+#       değerinin 'Europe/Istanbul' yerel günüdür (ör. 23:30 UTC satışı
+#       ertesi güne yazılır, bkz. 'sales_rollup.py').
+#     - Haftalar pazartesi başlar.
+#
+# 3.  BOŞLUK DOLDURMA VE ETİKETLER:
+#     - Satış olmayan dilimler 0 değeriyle döner (grafikte boşluk olmaz).
+#     - Etiketler sunucu 'locale' ayarından bağımsız olarak Türkçe üretilir.
+# ===================================================================
+
+GRANULARITIES = ('day', 'week', 'month')
+# Varsayılan aralıklar (dilim sayısı) ve tek istekte izin verilen en fazla dilim
+DEFAULT_BUCKETS = {'day': 30, 'week': 12, 'month': 6}
+MAX_BUCKETS = 400
+
+MONTHS_TR = ('Ocak', 'Şubat', 'Mart', 'Nisan', 'Mayıs', 'Haziran',
+             'Temmuz', 'Ağustos', 'Eylül', 'Ekim', 'Kasım', 'Aralık')
+
+SalesSeries = namedtuple('SalesSeries', ['granularity', 'start', 'end', 'buckets', 'labels', 'totals', 'counts'])
+
+
+def bucket_start(day, granularity):
+    """Verilen günün ait olduğu dilimin ilk günü."""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, granularity):
+    if granularity == 'week':
+        return start + timedelta(weeks=1)
+    if granularity == 'month':
+        return start + relativedelta(months=1)
+    return start + timedelta(days=1)
+
+
+def bucket_label(start, granularity):
+    """Dilim etiketi: 'Ekim 2026' (ay), '12 Eki' (gün/hafta başı)."""
+    if granularity == 'month':
+        return f"{MONTHS_TR[start.month - 1]} {start.year}"
+    return f"{start.day} {MONTHS_TR[start.month - 1][:3]}"
+
+
+def default_range(granularity, today=None):
+    """Bugünü içeren dilim dahil, son 'DEFAULT_BUCKETS' dilimlik (başlangıç, bitiş) aralığı."""
+    end = today or local_today()
+    start = bucket_start(end, granularity)
+    for _ in range(DEFAULT_BUCKETS[granularity] - 1):
+        start = bucket_start(start - timedelta(days=1), granularity)
+    return start, end
+
+
+def sales_series(granularity='month', start=None, end=None, user_id=None):
+    """
+    [start, end] yerel tarih aralığındaki satışları dilimlere ayırır (uçlar,
+    ait oldukları dilimlerin tamamını kapsayacak şekilde genişletilir).
+    'user_id' verilirse yalnızca o personelin satışları sayılır.
+    Geçersiz parametrelerde ValueError fırlatır.
+    """
+    from models import SalesDailyRollup
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Geçersiz dilim: '{granularity}' (day, week, month).")
+    if start is None or end is None:
+        default_start, default_end = default_range(granularity)
+        start, end = start or default_start, end or default_end
+    if start > end:
+        raise ValueError("Başlangıç tarihi bitiş tarihinden sonra olamaz.")
+
+    buckets = []
+    current = bucket_start(start, granularity)
+    while current <= end:
+        buckets.append(current)
+        if len(buckets) > MAX_BUCKETS:
+            raise ValueError(f"Aralık çok geniş (en fazla {MAX_BUCKETS} dilim).")
+        current = next_bucket(current, granularity)
+    range_end = current
+    index = {bucket: position for position, bucket in enumerate(buckets)}
+
+    query = db.session.query(SalesDailyRollup.day, func.sum(SalesDailyRollup.amount),
+                             func.sum(SalesDailyRollup.sale_count))\
+        .filter(SalesDailyRollup.day >= buckets[0], SalesDailyRollup.day < range_end)
+    if user_id is not None:
+        query = query.filter(SalesDailyRollup.user_id == user_id)
+
+    totals = [0.0] * len(buckets)
+    counts = [0] * len(buckets)
+    for day, total, count in query.group_by(SalesDailyRollup.day).all():
+        position = index[bucket_start(day, granularity)]
+        totals[position] += float(total or 0.0)
+        counts[position] += int(count or 0)
+
+    return SalesSeries(granularity=granularity, start=buckets[0], end=range_end - timedelta(days=1),
+                       buckets=buckets, labels=[bucket_label(bucket, granularity) for bucket in buckets],
+                       totals=[round(total, 2) for total in totals], counts=counts)
+
+
+def series_to_json(series):
+    """Chart.js'in beklediği 'labels' / 'data' alanlarıyla JSON'a uygun sözlük."""
+    return {
+        'granularity': series.granularity,
+        'timezone': 'Europe/Istanbul',
+        'start': series.start.isoformat(),
+        'end': series.end.isoformat(),
+        'buckets': [bucket.isoformat() for bucket in series.buckets],
+        'labels': series.labels,
+        'data': series.totals,
+        'counts': series.counts,
+    }
+
+
+def parse_date(value):
+    """'YYYY-MM-DD' biçimindeki parametreyi tarihe çevirir (boşsa None)."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Geçersiz tarih: '{value}' (YYYY-MM-DD bekleniyor).")
@@ -0,0 +1,331 @@
+import html
+import re
+from collections import namedtuple
+from sqlalchemy import event, text
+from extensions import db
+
+# ===================================================================
+# KUWAMEDYA - AKADEMİ TAM METİN ARAMA İNDEKSİ (search_index.py)
+# Sürüm: v7.1 (Performans Güncellemesi)
+#
+# BU DOSYA, KURSLARIN (başlık, açıklama) VE DERSLERİN (başlık, içerik)
+# TAM METİN ARAMA İNDEKSİNİ YÖNETİR.
+#
+# 1.  TEK ARAYÜZ, İKİ MOTOR:
+#     - SQLite: FTS5 sanal tablosu ('search_index'). Satır kimliği (rowid)
+#       belgeden türetilir (kurs = id*2, ders = id*2+1); güncelleme ve
+#       silme, tam tablo taraması yerine rowid ile yapılır.
+#     - PostgreSQL: 'search_document' tablosu, 'tsvector' sütunu ve GIN
+#       indeksi.
+#     - Diğer veritabanlarında indeks devre dışıdır (arama boş döner).
+#
+# 2.  SENKRONİZASYON:
+#     - 'Course' ve 'Lesson' üzerindeki ORM olayları (after_insert,
+#       after_update, after_delete) indeksi AYNI işlem (transaction)
+#       içinde günceller. ORM dışı toplu işlemlerden sonra
+#       'flask search rebuild' ile indeks yeniden oluşturulur.
+#
+# 3.  ARAMA:
+#     - Kullanıcı girdisi kelimelere bölünür ve her kelime önek (prefix)
+#       olarak aranır. Sonuçlar alaka düzeyine göre (başlık eşleşmeleri
+#       daha ağırlıklı) sıralanır ve vurgulu bir alıntı (snippet) döner.
+# ===================================================================
+
+SearchHit = namedtuple('SearchHit', ['doc_type', 'doc_id', 'course_id', 'title', 'snippet', 'rank'])
+
+MAX_QUERY_TERMS = 8
+# Alıntı vurgu işaretleri: Metin HTML'e kaçırıldıktan SONRA '<mark>' ile değiştirilir.
+_MARK_START, _MARK_END = '\x02', '\x03'
+
+_SCRIPT_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def html_to_text(value):
+    """Ders içeriğindeki HTML etiketlerini atar ve düz metin döndürür."""
+    if not value:
+        return ''
+    return _SPACE_RE.sub(' ', html.unescape(_TAG_RE.sub(' ', _SCRIPT_RE.sub(' ', value)))).strip()
+
+
+def query_terms(query):
+    """Kullanıcı girdisinden güvenli arama kelimelerini çıkarır."""
+    return _TERM_RE.findall(query or '')[:MAX_QUERY_TERMS]
+
+
+def render_snippet(snippet):
+    """Ham alıntıyı HTML'e kaçırır ve vurgu işaretlerini '<mark>' etiketine çevirir."""
+    escaped = html.escape(snippet or '')
+    return escaped.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def _course_document(course):
+    return ('course', course.id, course.id, course.title or '', html_to_text(course.description))
+
+
+def _lesson_document(lesson):
+    return ('lesson', lesson.id, lesson.course_id, lesson.title or '', html_to_text(lesson.content))
+
+
+class SqliteSearchBackend:
+    """SQLite FTS5 tabanlı arama indeksi."""
+
+    @staticmethod
+    def rowid(doc_type, doc_id):
+        return doc_id * 2 + (1 if doc_type == 'lesson' else 0)
+
+    def ensure_schema(self, connection):
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "course_id UNINDEXED, title, body, tokenize='unicode61 remove_diacritics 2')"))
+
+    def upsert(self, connection, doc_type, doc_id, course_id, title, body):
+        rowid = self.rowid(doc_type, doc_id)
+        connection.execute(text("DELETE FROM search_index WHERE rowid = :rowid"), {'rowid': rowid})
+        connection.execute(text(
+            "INSERT INTO search_index (rowid, course_id, title, body) VALUES (:rowid, :course_id, :title, :body)"),
+            {'rowid': rowid, 'course_id': course_id, 'title': title, 'body': body})
+
+    def upsert_many(self, connection, documents):
+        """(doc_type, doc_id, course_id, title, body) demetlerini toplu (executemany) yazar."""
+        rows = [{'rowid': self.rowid(doc_type, doc_id), 'course_id': course_id, 'title': title, 'body': body}
+                for doc_type, doc_id, course_id, title, body in documents]
+        if not rows:
+            return
+        connection.execute(text("DELETE FROM search_index WHERE rowid = :rowid"), [{'rowid': row['rowid']} for row in rows])
+        connection.execute(text(
+            "INSERT INTO search_index (rowid, course_id, title, body) VALUES (:rowid, :course_id, :title, :body)"), rows)
+
+    def copy_lessons(self, connection, source_course_id, target_course_id):
+        """Kopyalanan kursun ders belgelerini kaynak dersin indeks satırlarından tek sorguda üretir."""
+        connection.execute(text(
+            "INSERT INTO search_index (rowid, course_id, title, body) "
+            "SELECT new_lesson.id * 2 + 1, new_lesson.course_id, search_index.title, search_index.body "
+            "FROM lesson AS old_lesson "
+            "JOIN lesson AS new_lesson ON new_lesson.course_id = :target AND new_lesson.\"order\" = old_lesson.\"order\" "
+            "JOIN search_index ON search_index.rowid = old_lesson.id * 2 + 1 "
+            "WHERE old_lesson.course_id = :source"),
+            {'source': source_course_id, 'target': target_course_id})
+
+    def delete(self, connection, doc_type, doc_id):
+        connection.execute(text("DELETE FROM search_index WHERE rowid = :rowid"),
+                           {'rowid': self.rowid(doc_type, doc_id)})
+
+    def delete_course_lessons(self, connection, course_id):
+        """Kursun tüm ders belgelerini siler (dersler silinmeden ÖNCE çağrılmalıdır)."""
+        connection.execute(text(
+            "DELETE FROM search_index WHERE rowid IN (SELECT id * 2 + 1 FROM lesson WHERE course_id = :course_id)"),
+            {'course_id': course_id})
+
+    def clear(self, connection):
+        connection.execute(text("DELETE FROM search_index"))
+
+    def search(self, connection, terms, limit):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        rows = connection.execute(text(
+            "SELECT rowid, course_id, title, "
+            "snippet(search_index, -1, char(2), char(3), '…', 16) AS snippet, "
+            "bm25(search_index, 0.0, 10.0, 1.0) AS rank "
+            "FROM search_index WHERE search_index MATCH :match "
+            "ORDER BY rank LIMIT :limit"), {'match': match, 'limit': limit})
+        return [SearchHit('lesson' if row.rowid % 2 else 'course', row.rowid // 2,
+                          row.course_id, row.title, row.snippet, row.rank) for row in rows]
+
+
+class PostgresSearchBackend:
+    """PostgreSQL 'tsvector' + GIN tabanlı arama indeksi."""
+    config = 'simple'
+    _UPSERT_SQL = (
+        "INSERT INTO search_document (doc_type, doc_id, course_id, title, body, document) "
+        "VALUES (:doc_type, :doc_id, :course_id, :title, :body, "
+        "setweight(to_tsvector(CAST(:config AS regconfig), :title), 'A') || "
+        "setweight(to_tsvector(CAST(:config AS regconfig), :body), 'B')) "
+        "ON CONFLICT (doc_type, doc_id) DO UPDATE SET course_id = EXCLUDED.course_id, "
+        "title = EXCLUDED.title, body = EXCLUDED.body, document = EXCLUDED.document")
+
+    def ensure_schema(self, connection):
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS search_document ("
+            "doc_type VARCHAR(10) NOT NULL, doc_id INTEGER NOT NULL, course_id INTEGER NOT NULL, "
+            "title TEXT NOT NULL, body TEXT NOT NULL, document TSVECTOR NOT NULL, "
+            "PRIMARY KEY (doc_type, doc_id))"))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_search_document_document ON search_document USING GIN (document)"))
+
+    def upsert(self, connection, doc_type, doc_id, course_id, title, body):
+        self.upsert_many(connection, [(doc_type, doc_id, course_id, title, body)])
+
+    def upsert_many(self, connection, documents):
+        """(doc_type, doc_id, course_id, title, body) demetlerini toplu (executemany) yazar."""
+        rows = [{'doc_type': doc_type, 'doc_id': doc_id, 'course_id': course_id,
+                 'title': title, 'body': body, 'config': self.config}
+                for doc_type, doc_id, course_id, title, body in documents]
+        if rows:
+            connection.execute(text(self._UPSERT_SQL), rows)
+
+    def copy_lessons(self, connection, source_course_id, target_course_id):
+        """Kopyalanan kursun ders belgelerini kaynak dersin indeks satırlarından tek sorguda üretir."""
+        connection.execute(text(
+            "INSERT INTO search_document (doc_type, doc_id, course_id, title, body, document) "
+            "SELECT 'lesson', new_lesson.id, new_lesson.course_id, sd.title, sd.body, sd.document "
+            "FROM lesson AS old_lesson "
+            "JOIN lesson AS new_lesson ON new_lesson.course_id = :target AND new_lesson.\"order\" = old_lesson.\"order\" "
+            "JOIN search_document AS sd ON sd.doc_type = 'lesson' AND sd.doc_id = old_lesson.id "
+            "WHERE old_lesson.course_id = :source "
+            "ON CONFLICT (doc_type, doc_id) DO NOTHING"),
+            {'source': source_course_id, 'target': target_course_id})
+
+    def delete(self, connection, doc_type, doc_id):
+        connection.execute(text("DELETE FROM search_document WHERE doc_type = :doc_type AND doc_id = :doc_id"),
+                           {'doc_type': doc_type, 'doc_id': doc_id})
+
+    def delete_course_lessons(self, connection, course_id):
+        """Kursun tüm ders belgelerini siler (dersler silinmeden ÖNCE çağrılmalıdır)."""
+        connection.execute(text(
+            "DELETE FROM search_document WHERE doc_type = 'lesson' "
+            "AND doc_id IN (SELECT id FROM lesson WHERE course_id = :course_id)"),
+            {'course_id': course_id})
+
+    def clear(self, connection):
+        connection.execute(text("DELETE FROM search_document"))
+
+    def search(self, connection, terms, limit):
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        rows = connection.execute(text(
+            "SELECT doc_type, doc_id, course_id, title, "
+            "ts_headline(CAST(:config AS regconfig), body, q, "
+            "'StartSel=\x02, StopSel=\x03, MaxWords=30, MinWords=10') AS snippet, "
+            "ts_rank(document, q) AS rank "
+            "FROM search_document, to_tsquery(CAST(:config AS regconfig), :tsquery) AS q "
+            "WHERE document @@ q ORDER BY rank DESC LIMIT :limit"),
+            {'config': self.config, 'tsquery': tsquery, 'limit': limit})
+        return [SearchHit(row.doc_type, row.doc_id, row.course_id, row.title, row.snippet, row.rank)
+                for row in rows]
+
+
+_BACKENDS = {'sqlite': SqliteSearchBackend(), 'postgresql': PostgresSearchBackend()}
+_ready_engines = set()
+
+
+def get_backend(connection):
+    """Bağlantının veritabanına uygun arama motorunu döndürür (desteklenmiyorsa None)."""
+    backend = _BACKENDS.get(connection.dialect.name)
+    if backend is not None:
+        engine_key = str(connection.engine.url)
+        if engine_key not in _ready_engines:
+            backend.ensure_schema(connection)
+            _ready_engines.add(engine_key)
+    return backend
+
+
+def search(query, limit=20):
+    """Kurs ve derslerde tam metin araması yapar; 'SearchHit' listesi döndürür."""
+    terms = query_terms(query)
+    if not terms:
+        return []
+    connection = db.session.connection()
+    backend = get_backend(connection)
+    if backend is None:
+        return []
+    return backend.search(connection, terms, limit)
+
+
+def rebuild():
+    """İndeksi tüm kurs ve derslerden yeniden oluşturur. İndekslenen belge sayısını döndürür."""
+    from models import Course, Lesson
+    connection = db.session.connection()
+    backend = get_backend(connection)
+    if backend is None:
+        return 0
+    backend.clear(connection)
+    count = 0
+    # Yalnızca indekslenen sütunlar okunur (tam ORM nesneleri yüklenmez); 500'lük gruplar halinde yazılır
+    courses = db.session.query(Course.id, Course.title, Course.description)
+    for batch in _chunked(courses.yield_per(500), 500):
+        backend.upsert_many(connection, [_course_document(course) for course in batch])
+        count += len(batch)
+    lessons = db.session.query(Lesson.id, Lesson.course_id, Lesson.title, Lesson.content)
+    for batch in _chunked(lessons.yield_per(500), 500):
+        backend.upsert_many(connection, [_lesson_document(lesson) for lesson in batch])
+        count += len(batch)
+    return count
+
+
+def _chunked(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ===================================================================
+# ORM OLAYLARI (İNDEKS SENKRONİZASYONU)
+# ===================================================================
+def _index_changed(target, fields):
+    """Nesnenin indekslenen alanlarından biri değişti mi?"""
+    state = db.inspect(target)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+def _on_course_saved(mapper, connection, target):
+    backend = get_backend(connection)
+    if backend is not None:
+        backend.upsert(connection, *_course_document(target))
+
+
+def _on_course_updated(mapper, connection, target):
+    if _index_changed(target, ('title', 'description')):
+        _on_course_saved(mapper, connection, target)
+
+
+def _on_course_deleting(mapper, connection, target):
+    # Dersler veritabanı tarafında ('ON DELETE CASCADE') silinir, ders olayları çalışmaz
+    backend = get_backend(connection)
+    if backend is not None:
+        backend.delete_course_lessons(connection, target.id)
+
+
+def _on_course_deleted(mapper, connection, target):
+    backend = get_backend(connection)
+    if backend is not None:
+        backend.delete(connection, 'course', target.id)
+
+
+def _on_lesson_saved(mapper, connection, target):
+    backend = get_backend(connection)
+    if backend is not None:
+        backend.upsert(connection, *_lesson_document(target))
+
+
+def _on_lesson_updated(mapper, connection, target):
+    if _index_changed(target, ('title', 'content', 'course_id')):
+        _on_lesson_saved(mapper, connection, target)
+
+
+def _on_lesson_deleted(mapper, connection, target):
+    backend = get_backend(connection)
+    if backend is not None:
+        backend.delete(connection, 'lesson', target.id)
+
+
+def register_events():
+    """'Course' ve 'Lesson' ORM olaylarını indekse bağlar (birden çok çağrı güvenlidir)."""
+    from models import Course, Lesson
+    listeners = (
+        (Course, 'after_insert', _on_course_saved),
+        (Course, 'after_update', _on_course_updated),
+        (Course, 'before_delete', _on_course_deleting),
+        (Course, 'after_delete', _on_course_deleted),
+        (Lesson, 'after_insert', _on_lesson_saved),
+        (Lesson, 'after_update', _on_lesson_updated),
+        (Lesson, 'after_delete', _on_lesson_deleted),
+    )
+    for model, name, listener in listeners:
+        if not event.contains(model, name, listener):
+            event.listen(model, name, listener)
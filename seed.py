@@ -44,7 +44,7 @@ def seed_data():
     """
     # Gerekli modülleri burada import et
     from models import (User, Project, Technology, Package, Testimonial, Sale,
-                        Commission, Course, Lesson, Enrollment, Quiz, QuizAttempt, ActivityLog)
+                        Commission, Course, Lesson, Enrollment, Quiz, QuizQuestion, QuizAttempt, ActivityLog)
     from commission_engine import calculate_and_record_commission
     from flask import current_app # Loglama için
 
@@ -1159,7 +1159,7 @@ db.session.commit()</code></pre>
         db.session.commit() # Ders ID'leri alınmalı
 
         # Quizler - 20 soruluk quizler (18 doğru gerekiyor)
-        quiz1_questions = json.dumps([
+        quiz1_questions = [
             {"question": "Aşağıdakilerden hangisi On-Page SEO faktörü değildir?", "options": ["Meta Açıklama", "Başlık Etiketi (Title Tag)", "Backlink Sayısı", "İçerik Kalitesi"], "correct_index": 2},
             {"question": "Anahtar kelime yoğunluğu (keyword density) ne anlama gelir?", "options": ["Anahtar kelimenin arama hacmi", "Anahtar kelimenin metin içindeki geçme sıklığı oranı", "Anahtar kelimenin rekabet düzeyi", "Anahtar kelimenin tıklama başına maliyeti"], "correct_index": 1},
             {"question": "HTTP 301 yönlendirmesi ne için kullanılır?", "options": ["Sayfa geçici olarak taşındığında", "Sayfa kalıcı olarak taşındığında", "Sayfa bulunamadığında", "Sunucu hatası olduğunda"], "correct_index": 1},
@@ -1180,10 +1180,10 @@ db.session.commit()</code></pre>
             {"question": "Duplicate content nedir?", "options": ["Aynı içeriğin farklı URL'lerde bulunması", "Orijinal içerik", "Kısa içerik", "Uzun içerik"], "correct_index": 0},
             {"question": "404 hatası SEO için ne anlama gelir?", "options": ["Sayfa bulunamadı - SEO için zararlı", "Sayfa başarıyla yüklendi", "Yönlendirme başarılı", "SEO için faydalı"], "correct_index": 0},
             {"question": "Robots.txt dosyası ne işe yarar?", "options": ["Arama motorlarına hangi sayfaları indekslememesi gerektiğini söyler", "Sayfa hızını artırır", "Backlink oluşturur", "Meta tag ekler"], "correct_index": 0}
-        ])
-        quiz1 = Quiz(title="SEO Bilgisi", lesson=l1_6, questions=quiz1_questions)
+        ]
+        quiz1 = Quiz(title="SEO Bilgisi", lesson=l1_6, questions=QuizQuestion.from_dicts(quiz1_questions))
 
-        quiz2_questions = json.dumps([
+        quiz2_questions = [
             {"question": "Flask'te bir route tanımlamak için hangi decorator kullanılır?", "options": ["@app.route()", "@flask.route()", "@route()", "@web.route()"], "correct_index": 0},
             {"question": "Jinja2'de değişken yazdırmak için hangi sözdizimi kullanılır?", "options": ["{% variable %}", "{{ variable }}", "{ variable }", "<?php echo $variable; ?>"], "correct_index": 1},
             {"question": "Flask'te template dosyaları hangi klasörde saklanır?", "options": ["static/", "templates/", "views/", "html/"], "correct_index": 1},
@@ -1204,11 +1204,11 @@ db.session.commit()</code></pre>
             {"question": "SQLAlchemy'de sorgu yapmak için hangi metod kullanılır?", "options": [".query", ".search", ".find", ".select"], "correct_index": 0},
             {"question": "Flask'te flash mesajı göstermek için hangi fonksiyon kullanılır?", "options": ["flash()", "message()", "alert()", "notify()"], "correct_index": 0},
             {"question": "Jinja2'de filtre uygulamak için hangi sembol kullanılır?", "options": ["|", ":", ">", "<"], "correct_index": 0}
-        ])
-        quiz2 = Quiz(title="Flask ve Web Geliştirme Bilgisi", lesson=l2_8, questions=quiz2_questions)
+        ]
+        quiz2 = Quiz(title="Flask ve Web Geliştirme Bilgisi", lesson=l2_8, questions=QuizQuestion.from_dicts(quiz2_questions))
         
         # Quiz 3 - Sosyal Medya Yönetimi için
-        quiz3_questions = json.dumps([
+        quiz3_questions = [
             {"question": "Hangi sosyal medya platformu B2B pazarlama için en uygundur?", "options": ["Facebook", "LinkedIn", "TikTok", "Snapchat"], "correct_index": 1},
             {"question": "Sosyal medya içerik planlamasında en önemli faktör nedir?", "options": ["Sık paylaşım", "Tutarlılık ve kalite", "Sadece görsel", "Sadece metin"], "correct_index": 1},
             {"question": "Instagram Stories için ideal içerik süresi nedir?", "options": ["30 saniye", "15 saniye", "60 saniye", "5 dakika"], "correct_index": 1},
@@ -1229,8 +1229,8 @@ db.session.commit()</code></pre>
             {"question": "Instagram'da hashtag araştırması için hangi araç kullanılabilir?", "options": ["Sadece Instagram", "Hashtagify, RiteTag", "Sadece Google", "Sadece Facebook"], "correct_index": 1},
             {"question": "Sosyal medya içerik stratejisinde 'content pillar' nedir?", "options": ["Sosyal medya direği", "İçerik temaları/kategorileri", "Paylaşım zamanı", "Hashtag stratejisi"], "correct_index": 1},
             {"question": "Twitter'da 'thread' nedir?", "options": ["Tek bir tweet", "Birbirine bağlı birden fazla tweet", "Retweet", "Yorum"], "correct_index": 1}
-        ])
-        quiz3 = Quiz(title="Sosyal Medya Yönetimi Bilgisi", lesson=l3_4, questions=quiz3_questions)
+        ]
+        quiz3 = Quiz(title="Sosyal Medya Yönetimi Bilgisi", lesson=l3_4, questions=QuizQuestion.from_dicts(quiz3_questions))
         
         # Dersler (Course 4) - Kablosuz Ağlar
         l4_1_content = """<h3>📜 Bilgisayar Ağlarına Giriş ve Tarihçe</h3>
@@ -1461,7 +1461,7 @@ db.session.commit()</code></pre>
         db.session.commit()
         
         # Quiz 4 - Kablosuz Ağlar için 20 soru
-        quiz4_questions = json.dumps([
+        quiz4_questions = [
             {"question": "Kablosuz iletişim nedir?", "options": ["Tel kullanarak yapılan iletişim", "Tel kullanmadan yapılan iletişim", "Sadece radyo ile iletişim", "Sadece internet iletişimi"], "correct_index": 1},
             {"question": "Bluetooth hangi frekans bandında çalışır?", "options": ["5 GHz", "2.4 GHz", "900 MHz", "1.8 GHz"], "correct_index": 1},
             {"question": "WLAN'ın açılımı nedir?", "options": ["Wireless Local Area Network", "Wide Local Area Network", "Wireless Long Area Network", "Wired Local Area Network"], "correct_index": 0},
@@ -1482,8 +1482,8 @@ db.session.commit()</code></pre>
             {"question": "Broadband iletişimde ne olur?", "options": ["Aynı anda sadece tek sinyal", "Aynı anda birden fazla sinyal (farklı frekanslar)", "Sinyal gönderilmez", "Sadece dijital sinyal"], "correct_index": 1},
             {"question": "Optik fiber kablo veriyi nasıl iletir?", "options": ["Elektrik akımı ile", "Işık darbeleri ile", "Radyo dalgaları ile", "Mikrodalga ile"], "correct_index": 1},
             {"question": "Ağ güvenliği için en kritik faktör nedir?", "options": ["Hız", "Şifreleme ve Yetkilendirme", "Menzil", "Frekans"], "correct_index": 1}
-        ])
-        quiz4 = Quiz(title="Kablosuz Ağlar Bilgisi", lesson=l4_14, questions=quiz4_questions)
+        ]
+        quiz4 = Quiz(title="Kablosuz Ağlar Bilgisi", lesson=l4_14, questions=QuizQuestion.from_dicts(quiz4_questions))
         
         db.session.add_all([quiz1, quiz2, quiz3, quiz4])
         db.session.commit()
@@ -592,49 +592,77 @@ const KuwamedyaApp = {
             }
         },
 
-        // 'profile.html'deki #salesChart grafiğini çizer
+        // 'profile.html' ve 'admin_dashboard.html'deki satış grafiklerini çizer.
+        // v7.1: Veri sayfaya gömülmez; canvas görünür olduğunda 'data-sales-url'
+        // adresinden ('/admin/api/sales-series') JSON olarak çekilir.
         initSalesChart() {
-            const ctx = document.getElementById('salesChart');
-            // 'profile.html' şablonu, backend'den gelen veriyi bu 'data-sales' içine gömer
-            if (ctx && ctx.dataset.sales) {
-                console.log('Panel Modülü: Satış grafiği (Chart.js) başlatılıyor...');
-                try {
-                    const monthlySalesData = JSON.parse(ctx.dataset.sales);
-                    
-                    new Chart(ctx, {
-                        type: 'bar',
-                        data: {
-                            labels: monthlySalesData.labels,
-                            datasets: [{
-                                label: 'Aylık Satış Tutarı (₺)',
-                                data: monthlySalesData.data,
-                                backgroundColor: 'rgba(0, 168, 232, 0.6)',
-                                borderColor: 'rgba(0, 168, 232, 1)',
-                                borderWidth: 1,
-                                borderRadius: 5
-                            }]
-                        },
-                        options: {
-                            responsive: true,
-                            maintainAspectRatio: false,
-                            plugins: { legend: { display: false } },
-                            scales: {
-                                y: { 
-                                    beginAtZero: true,
-                                    ticks: { color: 'var(--text-muted)' },
-                                    grid: { color: 'var(--border-color)' }
-                                },
-                                x: {
-                                    ticks: { color: 'var(--text-muted)' },
-                                    grid: { display: false }
+            const canvases = document.querySelectorAll('canvas[data-sales-url]');
+            if (!canvases.length) return;
+            console.log('Panel Modülü: Satış grafikleri (Chart.js) hazırlanıyor...');
+
+            const load = (ctx) => this.loadSalesChart(ctx);
+            if (!('IntersectionObserver' in window)) {
+                canvases.forEach(load);
+                return;
+            }
+            const observer = new IntersectionObserver((entries) => {
+                entries.forEach(entry => {
+                    if (entry.isIntersecting) {
+                        observer.unobserve(entry.target);
+                        load(entry.target);
+                    }
+                });
+            });
+            canvases.forEach(ctx => observer.observe(ctx));
+        },
+
+        async loadSalesChart(ctx) {
+            try {
+                const response = await fetch(ctx.dataset.salesUrl, { headers: { 'Accept': 'application/json' } });
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                const series = await response.json();
+
+                new Chart(ctx, {
+                    type: 'bar',
+                    data: {
+                        labels: series.labels,
+                        datasets: [{
+                            label: ctx.dataset.salesLabel || 'Aylık Satış Tutarı (₺)',
+                            data: series.data,
+                            backgroundColor: 'rgba(0, 168, 232, 0.6)',
+                            borderColor: 'rgba(0, 168, 232, 1)',
+                            borderWidth: 1,
+                            borderRadius: 5
+                        }]
+                    },
+                    options: {
+                        responsive: true,
+                        maintainAspectRatio: false,
+                        plugins: {
+                            legend: { display: false },
+                            tooltip: {
+                                callbacks: {
+                                    // Tutarın yanında satış adedi de gösterilir
+                                    afterLabel: (item) => `${series.counts[item.dataIndex]} satış`
                                 }
                             }
+                        },
+                        scales: {
+                            y: { 
+                                beginAtZero: true,
+                                ticks: { color: 'var(--text-muted)' },
+                                grid: { color: 'var(--border-color)' }
+                            },
+                            x: {
+                                ticks: { color: 'var(--text-muted)' },
+                                grid: { display: false }
+                            }
                         }
-                    });
-                } catch (e) {
-                    console.error("Satış grafiği verisi okunamadı veya hatalı:", e);
-                    ctx.parentElement.innerHTML = '<p class="alert alert-danger text-center">Grafik yüklenirken bir hata oluştu.</p>';
-                }
+                    }
+                });
+            } catch (e) {
+                console.error("Satış grafiği verisi okunamadı veya hatalı:", e);
+                ctx.parentElement.innerHTML = '<p class="alert alert-danger text-center">Grafik yüklenirken bir hata oluştu.</p>';
             }
         }
     }, // <-- BÖLÜM 4 SONU (Panel Modülü bitti)
@@ -647,8 +675,10 @@ const KuwamedyaApp = {
      * ===================================================================
      */
     Academy: {
-        // Tüm kurs verilerini uygulama genelinde saklamak için
-        allCourseData: [],
+        // Katalog sayfalama durumu (v7.1: filtreleme/sıralama backend'de yapılır)
+        nextCursor: null,
+        isLoading: false,
+        requestSeq: 0,
 
         init() {
             // Sadece ilgili sayfalarda ilgili fonksiyonları çalıştır
@@ -670,88 +700,131 @@ const KuwamedyaApp = {
             this.grid = document.getElementById('course-grid');
             this.template = document.getElementById('course-card-template');
             this.noResults = document.getElementById('no-results');
+            this.loadMoreBtn = document.getElementById('load-more-btn');
+            this.resultCount = document.getElementById('result-count');
             
             this.searchInput = document.getElementById('search-input');
             this.categoryFilter = document.getElementById('category-filter');
             this.difficultyFilter = document.getElementById('difficulty-filter');
             this.sortBy = document.getElementById('sort-by');
             
-            // Tüm olay dinleyicilerini (arama, filtreleme, sıralama) tek seferde bağla
-            [this.searchInput, this.categoryFilter, this.difficultyFilter, this.sortBy].forEach(el => {
-                if(el) el.addEventListener('input', () => this.renderCourses());
+            // Filtre/sıralama değişince liste baştan yüklenir; arama kutusu
+            // her tuşta istek atmamak için kısa bir gecikmeyle (debounce) çalışır.
+            let searchTimer = null;
+            if (this.searchInput) {
+                this.searchInput.addEventListener('input', () => {
+                    clearTimeout(searchTimer);
+                    searchTimer = setTimeout(() => this.fetchCourseData(true), 300);
+                });
+            }
+            [this.categoryFilter, this.difficultyFilter, this.sortBy].forEach(el => {
+                if(el) el.addEventListener('change', () => this.fetchCourseData(true));
             });
 
-            // Sayfa ilk yüklendiğinde veriyi backend'den çek
-            this.fetchCourseData();
+            // Sonraki sayfa: butona tıklayınca veya buton görünür olunca yüklenir
+            if (this.loadMoreBtn) {
+                this.loadMoreBtn.addEventListener('click', () => this.fetchCourseData(false));
+                if ('IntersectionObserver' in window) {
+                    new IntersectionObserver(entries => {
+                        if (entries.some(entry => entry.isIntersecting)) this.fetchCourseData(false);
+                    }, { rootMargin: '200px' }).observe(this.loadMoreBtn);
+                }
+            }
+
+            // Sayfa ilk yüklendiğinde ilk sayfayı backend'den çek
+            this.fetchCourseData(true);
         },
 
-        // Backend'deki '/academy/data' API rotasından JSON verisini çeker
-        async fetchCourseData() {
+        // Seçili filtrelerden '/academy/data' sorgu parametrelerini oluşturur
+        buildQuery(cursor) {
+            const params = new URLSearchParams();
+            const searchTerm = this.searchInput ? this.searchInput.value.trim() : '';
+            if (searchTerm) params.set('q', searchTerm);
+            if (this.categoryFilter && this.categoryFilter.value !== 'all') params.set('category', this.categoryFilter.value);
+            if (this.difficultyFilter && this.difficultyFilter.value !== 'all') params.set('difficulty', this.difficultyFilter.value);
+            if (this.sortBy && this.sortBy.value !== 'default') params.set('sort', this.sortBy.value);
+            if (cursor) params.set('cursor', cursor);
+            return params.toString();
+        },
+
+        // Backend'deki '/academy/data' API rotasından bir sayfa kurs çeker.
+        // reset=true: liste temizlenir ve ilk sayfa yüklenir; false: sonraki sayfa eklenir.
+        async fetchCourseData(reset) {
             if (!this.grid) return;
-            this.grid.innerHTML = '<div class="col-12 text-center p-5"><div class="spinner-border text-primary" role="status"><span class="visually-hidden">Yükleniyor...</span></div></div>';
+            if (!reset && (this.isLoading || !this.nextCursor)) return;
+
+            // Eski (geç gelen) yanıtların yeni filtrelerin sonucunu ezmemesi için
+            const seq = ++this.requestSeq;
+            this.isLoading = true;
+            if (reset) {
+                this.nextCursor = null;
+                this.grid.innerHTML = '<div class="col-12 text-center p-5"><div class="spinner-border text-primary" role="status"><span class="visually-hidden">Yükleniyor...</span></div></div>';
+                this.noResults.classList.add('d-none');
+            }
+            if (this.loadMoreBtn) this.loadMoreBtn.disabled = true;
+
             try {
-                // Python'da oluşturduğumuz '/academy/data' adresine istek atıyoruz
-                // Bu URL'yi 'academy.html' şablonunda bir data-url olarak saklamak daha iyidir
-                const response = await fetch("/academy/data"); 
+                const url = this.grid.dataset.url || "/academy/data";
+                const response = await fetch(`${url}?${this.buildQuery(reset ? null : this.nextCursor)}`);
                 if (!response.ok) throw new Error(`HTTP hatası! Durum: ${response.status}`);
                 
                 const data = await response.json();
-                this.allCourseData = data; // Gelen veriyi saklıyoruz
-                
-                this.populateCategories(this.allCourseData); // Kategori filtresini dinamik olarak doldur
-                this.renderCourses(); // Sayfayı ilk kez render et (ekrana bas)
+                if (seq !== this.requestSeq) return; // Daha yeni bir istek başlatıldı
+
+                if (reset) {
+                    this.grid.innerHTML = '';
+                    this.renderFacets(data.facets);
+                    if (this.resultCount) this.resultCount.textContent = `${data.total} kurs`;
+                    this.noResults.classList.toggle('d-none', data.courses.length > 0);
+                }
+                this.renderCourses(data.courses);
+                this.nextCursor = data.next_cursor;
             } catch (error) {
+                if (seq !== this.requestSeq) return;
                 console.error("Kurs verileri alınamadı:", error);
+                this.nextCursor = null;
                 this.grid.innerHTML = `<div class="col-12 text-center p-5"><i class="fas fa-exclamation-triangle fa-3x text-danger mb-3"></i><h5 class="text-white">Kurslar yüklenemedi.</h5><p class="text-muted">Bir sorun oluştu. Lütfen daha sonra tekrar deneyin.</p></div>`;
+            } finally {
+                if (seq === this.requestSeq) {
+                    this.isLoading = false;
+                    if (this.loadMoreBtn) {
+                        this.loadMoreBtn.disabled = false;
+                        this.loadMoreBtn.classList.toggle('d-none', !this.nextCursor);
+                    }
+                }
             }
         },
 
-        // JSON verisinden kategori filtresini dinamik olarak oluşturur
-        populateCategories(courses) {
-            if (!this.categoryFilter) return;
-            const categories = [...new Set(courses.map(course => course.category))];
-            this.categoryFilter.innerHTML = '<option value="all">Tüm Kategoriler</option>';
-            categories.sort().forEach(category => {
-                const option = document.createElement('option');
-                option.value = category;
-                option.textContent = category;
-                this.categoryFilter.appendChild(option);
-            });
+        // Faset sayılarından kategori seçeneklerini (seçimi koruyarak) ve
+        // seviye seçeneklerinin sayılarını günceller
+        renderFacets(facets) {
+            if (!facets) return;
+            if (this.categoryFilter) {
+                const selected = this.categoryFilter.value;
+                const categories = Object.keys(facets.category);
+                if (selected !== 'all' && !categories.includes(selected)) categories.push(selected);
+                this.categoryFilter.innerHTML = '<option value="all">Tüm Kategoriler</option>';
+                categories.sort((a, b) => a.localeCompare(b, 'tr')).forEach(category => {
+                    const option = document.createElement('option');
+                    option.value = category;
+                    option.textContent = `${category} (${facets.category[category] || 0})`;
+                    this.categoryFilter.appendChild(option);
+                });
+                this.categoryFilter.value = selected;
+            }
+            if (this.difficultyFilter) {
+                Array.from(this.difficultyFilter.options).forEach(option => {
+                    if (option.value === 'all') return;
+                    option.textContent = `${option.value} (${facets.difficulty[option.value] || 0})`;
+                });
+            }
         },
 
-        // Kursları filtreler, sıralar ve 'academy.html' şablonuna basar
-        renderCourses() {
+        // Gelen kurs sayfasını 'academy.html' şablonuyla ızgaraya ekler
+        renderCourses(courses) {
             if (!this.grid) return;
-            
-            const searchTerm = this.searchInput.value.toLowerCase();
-            const selectedCategory = this.categoryFilter.value;
-            const selectedDifficulty = this.difficultyFilter.value;
-            const sortValue = this.sortBy.value;
-
-            // 1. FİLTRELEME
-            let filteredCourses = this.allCourseData.filter(course => {
-                const matchesSearch = course.title.toLowerCase().includes(searchTerm) || course.description.toLowerCase().includes(searchTerm);
-                const matchesCategory = selectedCategory === 'all' || course.category === selectedCategory;
-                const matchesDifficulty = selectedDifficulty === 'all' || course.difficulty === selectedDifficulty;
-                return matchesSearch && matchesCategory && matchesDifficulty;
-            });
-
-            // 2. SIRALAMA
-            filteredCourses.sort((a, b) => {
-                switch (sortValue) {
-                    case 'title-asc': return a.title.localeCompare(b.title, 'tr');
-                    case 'title-desc': return b.title.localeCompare(a.title, 'tr');
-                    case 'progress-desc': return b.enrollment.progress - a.enrollment.progress;
-                    case 'progress-asc': return a.enrollment.progress - b.enrollment.progress;
-                    default: return 0;
-                }
-            });
-
-            this.grid.innerHTML = ''; 
-            this.noResults.classList.toggle('d-none', filteredCourses.length > 0);
 
-            // 3. RENDER ETME
-            filteredCourses.forEach(course => {
+            courses.forEach(course => {
                 const card = this.template.content.cloneNode(true); // HTML şablonunu kopyala
                 
                 // Kopyalanan şablonu JSON verisiyle doldur
@@ -765,7 +838,7 @@ const KuwamedyaApp = {
                 }
                 card.querySelector('.course-category').textContent = course.category;
                 card.querySelector('.course-title').textContent = course.title;
-                card.querySelector('.course-description').textContent = course.description.substring(0, 100) + '...';
+                card.querySelector('.course-description').textContent = course.description;
                 card.querySelector('.course-difficulty').innerHTML = `<i class="fas fa-signal me-2"></i>${course.difficulty}`;
                 card.querySelector('.course-duration').innerHTML = `<i class="fas fa-clock me-2"></i>${course.duration_hours} Saat`;
                 
@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pytest
+
+# Testler bellek içi SQLite veritabanı kullanır ('config' import edilmeden önce ayarlanmalı)
+os.environ['DEV_DATABASE_URL'] = 'sqlite://'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    import search_index
+    # Her test yeni bir bellek içi veritabanı alır; arama tablosu yeniden oluşturulmalı
+    search_index._ready_engines.clear()
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False,
+                      CERTIFICATE_FOLDER=str(tmp_path / 'certificates'))
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def make_user(app):
+    """Kullanıcı oluşturan yardımcı: make_user('ali', role='Admin')."""
+    from models import User
+
+    def factory(username, role='normal'):
+        user = User(name=username.title(), username=username, email=f'{username}@example.com',
+                    password='parola123', role=role, is_active=True)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return factory
+
+
+@pytest.fixture
+def course(app):
+    """İki metin dersi ve bir quiz dersi olan kurs."""
+    from models import Course, Lesson
+    course = Course(title='Test Kursu', description='Açıklama ' * 20, category='SEO',
+                    difficulty='Başlangıç', duration_hours=2, instructor_name='Eğitmen')
+    db.session.add(course)
+    db.session.commit()
+    db.session.add_all([
+        Lesson(course_id=course.id, order=1, title='Giriş', lesson_type='Metin', content='<p>Giriş</p>'),
+        Lesson(course_id=course.id, order=2, title='Devam', lesson_type='Metin', content='<p>Devam</p>'),
+        Lesson(course_id=course.id, order=3, title='Sınav', lesson_type='Quiz', content='Quiz'),
+    ])
+    db.session.commit()
+    return course
@@ -0,0 +1,61 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from course_bundle import import_bundle, iter_bundle
+from extensions import db
+
+
+@pytest.fixture
+def bundle_bytes(course):
+    """Quizli test kursunun paketi; kurs dışa aktarıldıktan sonra silinir."""
+    from models import Course, Lesson, Quiz, QuizQuestion
+    lesson = Lesson.query.filter_by(course_id=course.id, lesson_type='Quiz').one()
+    db.session.add(Quiz(lesson_id=lesson.id, title='Sınav', questions=QuizQuestion.from_dicts([
+        {"question": "Soru 1", "options": ["a", "b", "c"], "correct_index": 2}])))
+    db.session.commit()
+    data = b''.join(iter_bundle([course.id]))
+    db.session.delete(db.session.get(Course, course.id))
+    db.session.commit()
+    return data
+
+
+def _with_correct_index(data, correct_index):
+    """Paketteki quiz sorularının 'correct_index' değerini değiştirir."""
+    target = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as source, zipfile.ZipFile(target, 'w') as bundle:
+        for name in source.namelist():
+            content = source.read(name)
+            if name == 'quizzes.ndjson':
+                records = [json.loads(line) for line in content.decode('utf-8').splitlines() if line.strip()]
+                for record in records:
+                    for question in record['questions']:
+                        question['correct_index'] = correct_index
+                content = ''.join(json.dumps(record) + '\n' for record in records).encode('utf-8')
+            bundle.writestr(name, content)
+    target.seek(0)
+    return target
+
+
+@pytest.mark.parametrize('correct_index', [3, -1, '1'])
+def test_import_rejects_invalid_correct_index(app, bundle_bytes, correct_index):
+    from models import Course, QuizQuestion
+    with pytest.raises(ValueError, match='correct_index'):
+        import_bundle(_with_correct_index(bundle_bytes, correct_index))
+
+    assert Course.query.count() == 0
+    assert QuizQuestion.query.count() == 0
+
+
+def test_import_logs_activity_in_same_transaction(app, bundle_bytes, make_user):
+    from models import ActivityLog, QuizQuestion
+    admin = make_user('yonetici', role='Admin')
+
+    result = import_bundle(io.BytesIO(bundle_bytes), user=admin)
+    db.session.rollback()  # commit edilmemiş bir kayıt kalmadığını doğrular
+
+    assert (result.courses, result.questions) == (1, 1)
+    assert [question.correct_index for question in QuizQuestion.query.all()] == [2]
+    assert [log.action for log in ActivityLog.query.filter_by(user_id=admin.id)] == ['paketten 1 kurs içe aktardı.']
@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from academy_viewmodels import build_course_detail_view
+from extensions import db
+
+# Kurs detay sayfasının sorgu bütçesi: kurs + dersler ve kayıt durumu
+QUERY_BUDGET = 2
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def enrolled_user(course, make_user):
+    from models import Enrollment, Lesson
+    user = make_user('ogrenci')
+    first = Lesson.query.filter_by(course_id=course.id).order_by(Lesson.order).first()
+    enrollment = Enrollment(user_id=user.id, course_id=course.id)
+    db.session.add(enrollment)
+    db.session.flush()
+    enrollment.add_completed_lesson(first.id)
+    db.session.commit()
+    return user
+
+
+def test_enrolled_user_stays_within_query_budget(app, course, enrolled_user):
+    course_id, user_id = course.id, enrolled_user.id
+    db.session.expire_all()
+
+    with count_queries() as statements:
+        view = build_course_detail_view(course_id, user_id)
+
+    assert len(statements) <= QUERY_BUDGET, statements
+    assert len(view.lessons) == 3
+    assert view.enrollment.completed_count == 1
+    assert view.enrollment.next_lesson.title == 'Devam'
+
+
+def test_anonymous_user_stays_within_query_budget(app, course):
+    course_id = course.id
+    db.session.expire_all()
+
+    with count_queries() as statements:
+        view = build_course_detail_view(course_id, None)
+
+    assert len(statements) <= QUERY_BUDGET, statements
+    assert len(view.lessons) == 3
+    assert view.enrollment is None
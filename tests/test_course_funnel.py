@@ -0,0 +1,47 @@
+from academy_funnel import build_course_funnel
+from extensions import db
+
+
+def _enroll_and_complete(course, user, lesson):
+    from models import Enrollment, LessonCompletion
+    db.session.add(Enrollment(user_id=user.id, course_id=course.id))
+    db.session.add(LessonCompletion(user_id=user.id, lesson_id=lesson.id, course_id=course.id))
+    db.session.commit()
+
+
+def _first_lesson(course):
+    from models import Lesson
+    return Lesson.query.filter_by(course_id=course.id).order_by(Lesson.order).first()
+
+
+def _first_step(course):
+    from models import Course
+    db.session.expire_all()
+    funnel = build_course_funnel(db.session.get(Course, course.id))
+    return funnel.enrolled, funnel.steps[0].completions, funnel.steps[0].rate
+
+
+def test_deleting_completion_decrements_funnel(app, course, make_user):
+    from models import LessonCompletion
+    lesson = _first_lesson(course)
+    for username in ('ayse', 'mehmet'):
+        _enroll_and_complete(course, make_user(username), lesson)
+    assert _first_step(course) == (2, 2, 100.0)
+
+    db.session.delete(LessonCompletion.query.first())
+    db.session.commit()
+
+    assert _first_step(course) == (2, 1, 50.0)
+
+
+def test_deleting_user_releases_funnel_completions(app, course, make_user):
+    from models import User
+    lesson = _first_lesson(course)
+    users = [make_user(username) for username in ('ayse', 'mehmet')]
+    for user in users:
+        _enroll_and_complete(course, user, lesson)
+
+    db.session.delete(db.session.get(User, users[0].id))
+    db.session.commit()
+
+    assert _first_step(course) == (1, 1, 100.0)
@@ -0,0 +1,36 @@
+from academy_cache import get_course_outline
+from extensions import db
+
+
+def _outline_titles(course_id):
+    from models import Course
+    db.session.expire_all()
+    return [entry.title for entry in get_course_outline(db.session.get(Course, course_id)).lessons]
+
+
+def _first_lesson(course_id):
+    from models import Lesson
+    return Lesson.query.filter_by(course_id=course_id).order_by(Lesson.order).first()
+
+
+def test_outline_refreshes_after_lesson_title_edit(app, course):
+    course_id = course.id
+    assert _outline_titles(course_id) == ['Giriş', 'Devam', 'Sınav']
+
+    # Başka bir süreçteki düzenleme gibi: 'invalidate_course_outline' çağrılmaz
+    _first_lesson(course_id).title = 'Başlangıç'
+    db.session.commit()
+
+    assert _outline_titles(course_id) == ['Başlangıç', 'Devam', 'Sınav']
+
+
+def test_outline_keeps_version_when_only_content_changes(app, course):
+    from models import Course
+    course_id = course.id
+    version = db.session.get(Course, course_id).updated_at
+
+    _first_lesson(course_id).content = '<p>Yeni içerik</p>'
+    db.session.commit()
+
+    db.session.expire_all()
+    assert db.session.get(Course, course_id).updated_at == version
@@ -0,0 +1,16 @@
+import grading_engine
+
+
+def test_out_of_range_correct_index_stays_invalid():
+    questions = [
+        {"question": "Soru 1", "options": ["a", "b", "c"], "correct_index": 1},
+        {"question": "Soru 2", "options": ["a", "b", "c"], "correct_index": 3},
+        {"question": "Soru 3", "options": ["a", "b", "c"], "correct_index": -1},
+        {"question": "Soru 4", "options": ["a", "b", "c"], "correct_index": "x"},
+    ]
+    answer_key = grading_engine.extract_answer_key(questions)
+
+    assert answer_key.correct.tolist() == [1] + [grading_engine.INVALID_KEY] * 3
+    # Aralık dışı anahtar hiçbir seçeneği doğru saymaz ('%' ile 'a' doğru sayılırdı)
+    selections = grading_engine.encode_submission(answer_key, ["b", "a", "c", "a"])
+    assert grading_engine.grade_submission(answer_key, selections).tolist() == [True, False, False, False]
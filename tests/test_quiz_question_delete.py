@@ -0,0 +1,70 @@
+import pytest
+
+import grading_engine
+import quiz_store
+from extensions import db
+
+QUESTIONS = [
+    {"question": "Soru 1", "options": ["a", "b", "c"], "correct_index": 0},
+    {"question": "Soru 2", "options": ["a", "b", "c"], "correct_index": 1},
+    {"question": "Soru 3", "options": ["a", "b", "c"], "correct_index": 2},
+]
+
+
+@pytest.fixture
+def quiz(course):
+    from models import Lesson, Quiz, QuizQuestion
+    lesson = Lesson.query.filter_by(course_id=course.id, lesson_type='Quiz').one()
+    quiz = Quiz(lesson_id=lesson.id, title='Sınav', questions=QuizQuestion.from_dicts(QUESTIONS))
+    db.session.add(quiz)
+    db.session.commit()
+    return quiz
+
+
+def _attempt(quiz, user, selections, score):
+    from models import QuizAttempt
+    attempt = QuizAttempt(user_id=user.id, quiz_id=quiz.id, score=score, total_questions=len(selections),
+                          answers=grading_engine.pack_answers(selections))
+    db.session.add(attempt)
+    db.session.commit()
+    return attempt.id
+
+
+def _delete_question(quiz, position):
+    from models import QuizQuestion
+    quiz_store.delete_question(QuizQuestion.query.filter_by(quiz_id=quiz.id, position=position).one())
+    db.session.commit()
+
+
+def _regrade(app):
+    result = app.test_cli_runner().invoke(args=['quizzes', 'regrade'])
+    assert result.exit_code == 0, result.output
+
+
+@pytest.mark.parametrize('selections, score, deleted, expected', [
+    ([0, 1, 2], 3, 0, (2, 2)),  # tam puan, ilk soru silinir
+    ([0, 0, 2], 2, 0, (1, 2)),  # ikinci soru yanlış, ilk soru silinir
+    ([0, 0, 2], 2, 1, (2, 2)),  # yanlış cevaplanan ortadaki soru silinir
+])
+def test_regrade_after_deleting_question(app, quiz, make_user, selections, score, deleted, expected):
+    from models import QuizAttempt
+    attempt_id = _attempt(quiz, make_user('ogrenci'), selections, score)
+
+    _delete_question(quiz, deleted)
+    _regrade(app)
+
+    attempt = db.session.get(QuizAttempt, attempt_id)
+    assert (attempt.score, attempt.total_questions) == expected
+    assert len(grading_engine.unpack_answers(attempt.answers, 2)) == 2
+
+
+def test_delete_question_keeps_answers_of_attempts_before_question_was_added(app, quiz, make_user):
+    from models import QuizAttempt
+    # Deneme yalnızca ilk iki soru varken yapılmış gibi (üçüncü soru sonradan eklendi)
+    attempt_id = _attempt(quiz, make_user('ogrenci'), [0, 1], 2)
+
+    _delete_question(quiz, 2)
+    _regrade(app)
+
+    attempt = db.session.get(QuizAttempt, attempt_id)
+    assert (attempt.score, attempt.total_questions) == (2, 2)
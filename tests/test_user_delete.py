@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from extensions import db
+
+
+def _add_sale(user, amount):
+    from models import Sale, Commission
+    sale = Sale(product_name='Web Sitesi', amount=amount, date_posted=datetime(2024, 5, 1, 9), user_id=user.id)
+    db.session.add(sale)
+    db.session.flush()
+    db.session.add(Commission(sale_id=sale.id, amount=amount * 0.1))
+    db.session.commit()
+
+
+def test_deleting_user_cascades_sales_and_logs(app, make_user):
+    from models import User, Sale, Commission, ActivityLog, SalesDailyRollup
+    ayse, mehmet = make_user('ayse'), make_user('mehmet')
+    _add_sale(ayse, 1000.0)
+    _add_sale(mehmet, 500.0)
+    db.session.add(ActivityLog(user_id=ayse.id, action='Satış eklendi'))
+    db.session.commit()
+
+    db.session.delete(db.session.get(User, ayse.id))
+    db.session.commit()
+    db.session.expire_all()
+
+    assert [sale.user_id for sale in Sale.query.all()] == [mehmet.id]
+    assert [c.sale.user_id for c in Commission.query.all()] == [mehmet.id]
+    assert ActivityLog.query.filter_by(action='Satış eklendi').count() == 0
+    rollups = SalesDailyRollup.query.all()
+    assert [(row.user_id, row.amount, row.sale_count) for row in rollups] == [(mehmet.id, 500.0, 1)]
@@ -1,5 +1,6 @@
 import os
 import secrets
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 from flask import current_app
 from extensions import db
@@ -79,6 +80,35 @@ def save_picture(form_picture, folder='profile_pics', output_size=(300, 300)):
         current_app.logger.error(f"Resim kaydetme hatası ({picture_path}): {e}")
         raise
 
+# Silinen kayıtlardan arta kalan yüklemeler arka planda temizlenir (v7.1)
+_cleanup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='upload-cleanup')
+
+def remove_uploads_later(filenames):
+    """
+    'save_picture' ile kaydedilmiş dosyaları ('courses/abc.jpg' gibi) arka planda
+    siler; istek dosya sistemini beklemez. Alt klasörde olmayan paylaşılan
+    varsayılan görsellere ('course_default.png') dokunulmaz.
+    Kayıt silme işlemi commit edildikten SONRA çağrılmalıdır.
+    """
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    logger = current_app.logger
+    paths = [os.path.join(upload_folder, *filename.split('/'))
+             for filename in filenames
+             if filename and '/' in filename and '..' not in filename.split('/')]
+    if not paths:
+        return
+
+    def _remove():
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Yükleme dosyası silinemedi ({path}): {e}")
+
+    _cleanup_executor.submit(_remove)
+
 def log_activity(user, action, target=None):
     """
     Sistemdeki önemli olayları (örn: 'admin giriş yaptı')